@@ -0,0 +1,221 @@
+"""
+벤치마크용 legacy / renew 스키마 DDL
+tables 모듈의 쿼리와 TableSpec 컬럼에 맞춘 최소 정의입니다. (실제 스키마의 PK/FK/보조 인덱스 구성을 흉내냄)
+"""
+
+# 이전(attendance-dev) 스키마
+LEGACY_TABLES = [
+    """
+    CREATE TABLE season (
+      id BIGINT NOT NULL PRIMARY KEY,
+      name VARCHAR(50) NOT NULL,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE organization (
+      id BIGINT NOT NULL PRIMARY KEY,
+      season_id BIGINT NOT NULL,
+      organization_name VARCHAR(100) NOT NULL,
+      upper_organization_id BIGINT NULL,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL,
+      KEY idx_organization_season (season_id)
+    )
+    """,
+    """
+    CREATE TABLE role (
+      id BIGINT NOT NULL PRIMARY KEY,
+      role_name VARCHAR(50) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE user (
+      id BIGINT NOT NULL PRIMARY KEY,
+      name VARCHAR(50) NOT NULL,
+      name_suffix VARCHAR(10) NULL,
+      email VARCHAR(100) NULL,
+      password VARCHAR(255) NULL,
+      gender_type VARCHAR(10) NULL,
+      birth_date DATE NULL,
+      phone_number VARCHAR(20) NULL,
+      is_new_member TINYINT NOT NULL DEFAULT 0,
+      is_long_term_absentee TINYINT NOT NULL DEFAULT 0,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE user_has_role (
+      id BIGINT NOT NULL PRIMARY KEY,
+      user_id BIGINT NOT NULL,
+      role_id BIGINT NOT NULL,
+      organization_id BIGINT NOT NULL,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL,
+      KEY idx_user_has_role_user (user_id),
+      KEY idx_user_has_role_role (role_id)
+    )
+    """,
+    """
+    CREATE TABLE activity (
+      id BIGINT NOT NULL PRIMARY KEY,
+      name VARCHAR(100) NOT NULL,
+      organization_id BIGINT NOT NULL,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL,
+      KEY idx_activity_organization (organization_id)
+    )
+    """,
+    """
+    CREATE TABLE activity_instance (
+      id BIGINT NOT NULL PRIMARY KEY,
+      activity_id BIGINT NOT NULL,
+      notes VARCHAR(255) NULL,
+      actual_location VARCHAR(100) NULL,
+      start_datetime DATETIME NOT NULL,
+      end_datetime DATETIME NOT NULL,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL,
+      KEY idx_activity_instance_activity (activity_id)
+    )
+    """,
+    """
+    CREATE TABLE attendance_status (
+      id BIGINT NOT NULL PRIMARY KEY,
+      name VARCHAR(20) NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE attendance (
+      id BIGINT NOT NULL PRIMARY KEY,
+      user_id BIGINT NOT NULL,
+      activity_instance_id BIGINT NOT NULL,
+      attendance_status_id BIGINT NOT NULL,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL,
+      KEY idx_attendance_user (user_id),
+      KEY idx_attendance_instance (activity_instance_id),
+      KEY idx_attendance_updated_at (updated_at)
+    )
+    """,
+    """
+    CREATE TABLE file (
+      id BIGINT NOT NULL PRIMARY KEY,
+      file_name VARCHAR(255) NOT NULL,
+      file_path VARCHAR(500) NOT NULL,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE activity_instance_has_file (
+      activity_instance_id BIGINT NOT NULL,
+      file_id BIGINT NOT NULL,
+      PRIMARY KEY (activity_instance_id, file_id),
+      KEY idx_activity_instance_has_file_file (file_id)
+    )
+    """,
+]
+
+# 새로운(attendance_renew) 스키마 - organization/season은 적재되어 있는 상태에서 시작합니다.
+RENEW_TABLES = [
+    """
+    CREATE TABLE season (
+      id BIGINT NOT NULL PRIMARY KEY,
+      name VARCHAR(50) NOT NULL,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE organization (
+      id BIGINT NOT NULL PRIMARY KEY,
+      season_id BIGINT NOT NULL,
+      name VARCHAR(100) NOT NULL,
+      upper_organization_id BIGINT NULL,
+      is_deleted TINYINT NOT NULL DEFAULT 0,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL,
+      CONSTRAINT fk_organization_season FOREIGN KEY (season_id) REFERENCES season (id)
+    )
+    """,
+    """
+    CREATE TABLE user (
+      id BIGINT NOT NULL PRIMARY KEY,
+      name VARCHAR(50) NOT NULL,
+      name_suffix VARCHAR(10) NULL,
+      email VARCHAR(100) NULL,
+      password VARCHAR(255) NULL,
+      gender VARCHAR(10) NULL,
+      birth_date DATE NULL,
+      phone_number VARCHAR(20) NULL,
+      is_new_member TINYINT NOT NULL DEFAULT 0,
+      is_long_term_absentee TINYINT NOT NULL DEFAULT 0,
+      is_deleted TINYINT NOT NULL DEFAULT 0,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL,
+      KEY idx_user_name (name)
+    )
+    """,
+    """
+    CREATE TABLE user_role (
+      id BIGINT NOT NULL PRIMARY KEY,
+      user_id BIGINT NOT NULL,
+      role_id BIGINT NOT NULL,
+      organization_id BIGINT NOT NULL,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL,
+      CONSTRAINT fk_user_role_user FOREIGN KEY (user_id) REFERENCES user (id),
+      CONSTRAINT fk_user_role_organization FOREIGN KEY (organization_id) REFERENCES organization (id)
+    )
+    """,
+    """
+    CREATE TABLE activity (
+      id BIGINT NOT NULL PRIMARY KEY,
+      name VARCHAR(100) NOT NULL,
+      description VARCHAR(255) NULL,
+      activity_category VARCHAR(20) NOT NULL,
+      location VARCHAR(100) NULL,
+      organization_id BIGINT NOT NULL,
+      start_time DATETIME NOT NULL,
+      end_time DATETIME NOT NULL,
+      is_deleted TINYINT NOT NULL DEFAULT 0,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL,
+      KEY idx_activity_start_time (start_time),
+      KEY idx_activity_updated_at (updated_at),
+      CONSTRAINT fk_activity_organization FOREIGN KEY (organization_id) REFERENCES organization (id)
+    )
+    """,
+    """
+    CREATE TABLE activity_image (
+      id BIGINT NOT NULL PRIMARY KEY,
+      activity_id BIGINT NOT NULL,
+      name VARCHAR(255) NOT NULL,
+      path VARCHAR(500) NOT NULL,
+      is_deleted TINYINT NOT NULL DEFAULT 0,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL,
+      CONSTRAINT fk_activity_image_activity FOREIGN KEY (activity_id) REFERENCES activity (id)
+    )
+    """,
+    """
+    CREATE TABLE attendance (
+      id BIGINT NOT NULL PRIMARY KEY,
+      user_id BIGINT NOT NULL,
+      activity_id BIGINT NOT NULL,
+      attendance_status VARCHAR(20) NOT NULL,
+      created_at DATETIME NOT NULL,
+      updated_at DATETIME NOT NULL,
+      KEY idx_attendance_status (attendance_status),
+      KEY idx_attendance_updated_at (updated_at),
+      CONSTRAINT fk_attendance_user FOREIGN KEY (user_id) REFERENCES user (id),
+      CONSTRAINT fk_attendance_activity FOREIGN KEY (activity_id) REFERENCES activity (id)
+    )
+    """,
+]
+
+# prod → dev 벤치마크에서 dev에 미리 복사해 둘 테이블 (activity/attendance의 FK 대상)
+DEV_SEED_TABLES = ["season", "organization", "user"]
@@ -0,0 +1,195 @@
+"""
+벤치마크용 legacy 스키마 합성 데이터 생성기
+attendance 행 수(scale)를 기준으로 나머지 테이블 크기를 비율로 정하고, 같은 seed면 같은 데이터를 만듭니다.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Sequence
+
+from db import DatabaseConnection
+from utils.bulk_insert import MultiRowInserter
+from utils.progress import chunked, print_progress
+
+# 한 번에 INSERT할 합성 행 수
+_CHUNK_ROWS = 5000
+
+_BASE_TIME = datetime(2023, 1, 1, 9, 0, 0)
+
+# 이전 스키마의 코드 테이블 값 (role은 user_role의 ROLE_IDS 이름 + 그 외 하나)
+ROLE_NAMES = ["그룹장", "부그룹장", "순장", "EBS", "순원"]
+ATTENDANCE_STATUS_NAMES = ["출석", "결석", "지각"]
+
+# activity.name_converter가 변환하는 이름만 사용합니다.
+ACTIVITY_NAMES = ["수요제자기도회", "현장치유팀사역"]
+
+
+@dataclass(frozen=True)
+class SyntheticScale:
+    """attendance 행 수에 맞춘 테이블별 행 수."""
+
+    attendance: int
+
+    @property
+    def organizations(self) -> int:
+        return max(10, self.attendance // 10_000)
+
+    @property
+    def users(self) -> int:
+        return max(100, self.attendance // 100)
+
+    @property
+    def activities(self) -> int:
+        return self.organizations * len(ACTIVITY_NAMES)
+
+    @property
+    def activity_instances(self) -> int:
+        return max(50, self.attendance // 200)
+
+    @property
+    def files(self) -> int:
+        return max(10, self.activity_instances // 2)
+
+    def describe(self) -> Dict[str, int]:
+        return {
+            "organization": self.organizations,
+            "user": self.users,
+            "activity": self.activities,
+            "activity_instance": self.activity_instances,
+            "file": self.files,
+            "attendance": self.attendance,
+        }
+
+
+def parse_scale(value: str) -> int:
+    """'10k', '1m', '250000' 형식의 행 수를 해석합니다."""
+    text = value.strip().lower().replace("_", "")
+    multiplier = 1
+    if text.endswith("k"):
+        multiplier, text = 1_000, text[:-1]
+    elif text.endswith("m"):
+        multiplier, text = 1_000_000, text[:-1]
+    return int(float(text) * multiplier)
+
+
+def _timestamps(rng: random.Random, days: int = 700):
+    created = _BASE_TIME + timedelta(days=rng.randrange(days), seconds=rng.randrange(86400))
+    return created, created + timedelta(days=rng.randrange(30))
+
+
+def _seasons(scale: SyntheticScale, rng: random.Random) -> Iterator[tuple]:
+    for i in (1, 2):
+        yield (i, f"{2022 + i} 시즌", _BASE_TIME, _BASE_TIME)
+
+
+def _organizations(scale: SyntheticScale, rng: random.Random) -> Iterator[tuple]:
+    for i in range(1, scale.organizations + 1):
+        upper = None if i <= 2 else rng.randint(1, 2)
+        yield (i, 1 + i % 2, f"코람데오_{i}그룹", upper, *_timestamps(rng))
+
+
+def _roles(scale: SyntheticScale, rng: random.Random) -> Iterator[tuple]:
+    for i, name in enumerate(ROLE_NAMES, start=1):
+        yield (i, name)
+
+
+def _users(scale: SyntheticScale, rng: random.Random) -> Iterator[tuple]:
+    for i in range(1, scale.users + 1):
+        birth = date(1990, 1, 1) + timedelta(days=rng.randrange(4000))
+        yield (
+            i, f"사용자{i}", rng.choice([None, "A", "B"]), f"user{i}@example.com", "x" * 60,
+            rng.choice(["M", "F"]), birth, f"010-{rng.randrange(10000):04d}-{i % 10000:04d}",
+            rng.randint(0, 1), rng.randint(0, 1), *_timestamps(rng),
+        )
+
+
+def _user_roles(scale: SyntheticScale, rng: random.Random) -> Iterator[tuple]:
+    for i in range(1, scale.users + 1):
+        yield (i, i, rng.randint(1, len(ROLE_NAMES)), rng.randint(1, scale.organizations), *_timestamps(rng))
+
+
+def _activities(scale: SyntheticScale, rng: random.Random) -> Iterator[tuple]:
+    for i in range(1, scale.activities + 1):
+        organization_id = (i - 1) // len(ACTIVITY_NAMES) + 1
+        yield (i, ACTIVITY_NAMES[(i - 1) % len(ACTIVITY_NAMES)], organization_id, *_timestamps(rng))
+
+
+def _activity_instances(scale: SyntheticScale, rng: random.Random) -> Iterator[tuple]:
+    for i in range(1, scale.activity_instances + 1):
+        start = _BASE_TIME + timedelta(days=rng.randrange(700), hours=rng.randrange(12))
+        yield (
+            i, rng.randint(1, scale.activities), rng.choice([None, f"메모 {i}"]), rng.choice(["본당", "소예배실", None]),
+            start, start + timedelta(hours=2), *_timestamps(rng),
+        )
+
+
+def _attendance_statuses(scale: SyntheticScale, rng: random.Random) -> Iterator[tuple]:
+    for i, name in enumerate(ATTENDANCE_STATUS_NAMES, start=1):
+        yield (i, name)
+
+
+def _attendances(scale: SyntheticScale, rng: random.Random) -> Iterator[tuple]:
+    for i in range(1, scale.attendance + 1):
+        yield (
+            i, rng.randint(1, scale.users), rng.randint(1, scale.activity_instances),
+            rng.randint(1, len(ATTENDANCE_STATUS_NAMES)), *_timestamps(rng),
+        )
+
+
+def _files(scale: SyntheticScale, rng: random.Random) -> Iterator[tuple]:
+    for i in range(1, scale.files + 1):
+        yield (i, f"image_{i}.jpg", f"/uploads/{i % 100:02d}/image_{i}.jpg", *_timestamps(rng))
+
+
+def _instance_files(scale: SyntheticScale, rng: random.Random) -> Iterator[tuple]:
+    # 파일마다 서로 다른 활동 하나에 연결 (file.id 기준 JOIN 결과가 1행)
+    for i in range(1, scale.files + 1):
+        yield (i * 2 - 1, i)
+
+
+# (테이블, 컬럼, 생성기) - FK 없는 legacy 스키마이므로 순서는 보기 좋게만 맞춥니다.
+LEGACY_DATA: List[tuple] = [
+    ("season", ["id", "name", "created_at", "updated_at"], _seasons),
+    ("organization", ["id", "season_id", "organization_name", "upper_organization_id", "created_at", "updated_at"], _organizations),
+    ("role", ["id", "role_name"], _roles),
+    ("user", [
+        "id", "name", "name_suffix", "email", "password", "gender_type", "birth_date",
+        "phone_number", "is_new_member", "is_long_term_absentee", "created_at", "updated_at",
+    ], _users),
+    ("user_has_role", ["id", "user_id", "role_id", "organization_id", "created_at", "updated_at"], _user_roles),
+    ("activity", ["id", "name", "organization_id", "created_at", "updated_at"], _activities),
+    ("activity_instance", [
+        "id", "activity_id", "notes", "actual_location", "start_datetime", "end_datetime", "created_at", "updated_at",
+    ], _activity_instances),
+    ("attendance_status", ["id", "name"], _attendance_statuses),
+    ("attendance", ["id", "user_id", "activity_instance_id", "attendance_status_id", "created_at", "updated_at"], _attendances),
+    ("file", ["id", "file_name", "file_path", "created_at", "updated_at"], _files),
+    ("activity_instance_has_file", ["activity_instance_id", "file_id"], _instance_files),
+]
+
+
+def _load(
+    conn: DatabaseConnection,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterator[tuple],
+    total: int,
+) -> None:
+    """내부: 합성 행을 청크 단위 multi-row INSERT로 적재합니다."""
+    inserter = MultiRowInserter(conn, table, columns, on_duplicate=None)
+    written = 0
+    for chunk in chunked(rows, _CHUNK_ROWS):
+        if inserter.write(chunk).affected is None:
+            raise RuntimeError(f"{table} 합성 데이터 적재 실패")
+        written += len(chunk)
+        print_progress(written, max(total, written), prefix=f"  {table}")
+
+
+def generate_legacy_data(conn: DatabaseConnection, scale: SyntheticScale, seed: int = 42) -> None:
+    """비어 있는 legacy 스키마에 scale 크기의 합성 데이터를 채웁니다."""
+    sizes = scale.describe()
+    print(f"🧪 합성 데이터 생성: {sizes}")
+    for table, columns, generator in LEGACY_DATA:
+        rng = random.Random(f"{seed}:{table}")
+        _load(conn, table, columns, generator(scale, rng), sizes.get(table, 0))
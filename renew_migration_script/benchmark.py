@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+마이그레이션 벤치마크
+로컬 MySQL/MariaDB에 legacy / renew 스키마를 만들고 합성 데이터로 마이그레이션 전체를 실행해
+처리량(rows/sec)과 최대 메모리(peak RSS)를 기록합니다.
+
+로컬 인스턴스 예시:
+    docker run -d --name migration-bench -p 3307:3306 -e MYSQL_ROOT_PASSWORD=bench mysql:8.0 --local-infile=1
+    python benchmark.py --scale 10k 100k 1m --mode all
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+# 벤치마크는 SSH 터널(DB_*)이 아니라 BENCH_DB_* 로컬 인스턴스에 연결합니다.
+# (자식 프로세스도 같은 환경 변수를 물려받도록 db 모듈을 쓰기 전에 덮어씁니다.)
+for _key in ("HOST", "PORT", "USER", "PASSWORD"):
+    if os.getenv(f"BENCH_DB_{_key}"):
+        os.environ[f"DB_{_key}"] = os.environ[f"BENCH_DB_{_key}"]
+
+from bench.schema import DEV_SEED_TABLES, LEGACY_TABLES, RENEW_TABLES
+from bench.synthetic import SyntheticScale, generate_legacy_data, parse_scale
+from db import DatabaseConnection, create_database_connection, get_transport_profile
+from tables.organization import migrate_organization_table
+from utils.server_copy import is_server_copy_enabled
+
+# 실수로 실제 스키마를 지우지 않도록 벤치마크 스키마 이름은 이 접두어로 시작해야 합니다.
+SCHEMA_PREFIX = "bench_"
+
+LEGACY_SCHEMA = os.getenv("BENCH_LEGACY_SCHEMA", "bench_legacy")
+RENEW_SCHEMA = os.getenv("BENCH_RENEW_SCHEMA", "bench_renew")
+DEV_SCHEMA = os.getenv("BENCH_DEV_SCHEMA", "bench_renew_dev")
+
+# 모드별 적재 결과를 셀 타겟 테이블
+RESULT_TABLES = {
+    "legacy": ["user", "activity", "activity_image", "attendance", "user_role"],
+    "prod": ["activity", "attendance"],
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="마이그레이션 벤치마크")
+    parser.add_argument(
+        "--scale",
+        nargs="+",
+        default=["10k"],
+        help="attendance 행 수 (예: 10k 100k 1m 10m). 나머지 테이블은 비율로 정해집니다.",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["legacy", "prod", "all"],
+        default="all",
+        help="legacy: migrate_data(legacy → renew), prod: migrate_prod_to_dev(renew → dev), all: 둘 다",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="합성 데이터 seed")
+    parser.add_argument("--keep", action="store_true", help="끝난 뒤 벤치마크 스키마를 남겨 둡니다.")
+    return parser.parse_args()
+
+
+def _connect(schema: str) -> DatabaseConnection:
+    conn = create_database_connection(schema)
+    if not conn.connect():
+        raise ConnectionError(f"{schema} 스키마 연결 실패")
+    return conn
+
+
+def recreate_schema(schema: str, ddl: List[str]) -> None:
+    """벤치마크 스키마를 지우고 ddl로 다시 만듭니다."""
+    if not schema.startswith(SCHEMA_PREFIX):
+        raise ValueError(f"벤치마크 스키마 이름은 {SCHEMA_PREFIX}로 시작해야 합니다: {schema}")
+    server = _connect("information_schema")
+    try:
+        for statement in (
+            f"DROP DATABASE IF EXISTS `{schema}`",
+            f"CREATE DATABASE `{schema}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci",
+        ):
+            if not server.execute_command(statement):
+                raise RuntimeError(f"{schema} 스키마 생성 실패")
+    finally:
+        server.disconnect()
+
+    conn = _connect(schema)
+    try:
+        for statement in ddl:
+            if not conn.execute_command(statement):
+                raise RuntimeError(f"{schema} 테이블 생성 실패")
+    finally:
+        conn.disconnect()
+
+
+def drop_schema(schema: str) -> None:
+    if not schema.startswith(SCHEMA_PREFIX):
+        return
+    try:
+        server = _connect("information_schema")
+    except ConnectionError as e:
+        print(f"⚠️ {schema} 스키마를 정리하지 못했습니다: {e}")
+        return
+    try:
+        server.execute_command(f"DROP DATABASE IF EXISTS `{schema}`")
+    finally:
+        server.disconnect()
+
+
+def prepare_legacy(scale: SyntheticScale, seed: int) -> None:
+    """legacy 스키마에 합성 데이터를, renew 스키마에 season/organization을 미리 적재합니다."""
+    recreate_schema(LEGACY_SCHEMA, LEGACY_TABLES)
+    recreate_schema(RENEW_SCHEMA, RENEW_TABLES)
+
+    legacy = _connect(LEGACY_SCHEMA)
+    renew = _connect(RENEW_SCHEMA)
+    try:
+        generate_legacy_data(legacy, scale, seed)
+        # 실제 renew 스키마처럼 organization(과 FK 대상 season)은 마이그레이션 전에 적재되어 있는 상태로 만듭니다.
+        renew.execute_command(f"INSERT INTO season SELECT * FROM `{LEGACY_SCHEMA}`.season")
+        if not migrate_organization_table(legacy, renew):
+            raise RuntimeError("renew organization 사전 적재 실패")
+    finally:
+        legacy.disconnect()
+        renew.disconnect()
+
+
+def prepare_dev() -> None:
+    """renew 스키마를 prod로 보고, dev 스키마에 FK 대상 테이블만 복사해 둡니다."""
+    recreate_schema(DEV_SCHEMA, RENEW_TABLES)
+    dev = _connect(DEV_SCHEMA)
+    try:
+        for table in DEV_SEED_TABLES:
+            if not dev.execute_command(f"INSERT INTO `{table}` SELECT * FROM `{RENEW_SCHEMA}`.`{table}`"):
+                raise RuntimeError(f"dev {table} 사전 적재 실패")
+    finally:
+        dev.disconnect()
+
+
+def _count_rows(schema: str, tables: List[str]) -> Dict[str, int]:
+    """타겟 테이블별 적재된 행 수."""
+    conn = _connect(schema)
+    try:
+        counts = {}
+        for table in tables:
+            result = conn.execute_query(f"SELECT COUNT(*) AS cnt FROM `{table}`")
+            if result is None:
+                raise RuntimeError(f"{schema}.{table} 행 수 조회 실패")
+            counts[table] = result[0]["cnt"]
+        return counts
+    finally:
+        conn.disconnect()
+
+
+def _peak_rss_mb() -> float:
+    """이 프로세스와 기다린 자식 프로세스(파티션 워커) 중 가장 큰 최대 RSS(MB). Linux는 KB 단위입니다."""
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return round(peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024), 1)
+
+
+def _run_migration(mode: str) -> Dict[str, Any]:
+    """새 프로세스에서 마이그레이션 한 번을 실행합니다. (데이터 생성 메모리가 RSS 측정에 섞이지 않도록)"""
+    import migration
+
+    if mode == "legacy":
+        os.environ["SOURCE_SCHEMA"], os.environ["TARGET_SCHEMA"] = LEGACY_SCHEMA, RENEW_SCHEMA
+        run = migration.migrate_legacy_to_renew
+    else:
+        os.environ["SOURCE_SCHEMA"], os.environ["TARGET_SCHEMA"] = RENEW_SCHEMA, DEV_SCHEMA
+        run = migration.migrate_prod_to_dev
+    started = time.perf_counter()
+    success = run()
+    return {"success": bool(success), "seconds": time.perf_counter() - started, "peak_rss_mb": _peak_rss_mb()}
+
+
+def measure(mode: str) -> Dict[str, Any]:
+    """마이그레이션을 실행하고 적재 행 수, 처리량, 최대 RSS를 반환합니다."""
+    # 파티션 워커를 다시 띄울 수 있도록 데몬이 아닌 ProcessPoolExecutor 워커를 사용합니다.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        result = pool.submit(_run_migration, mode).result()
+    target = RENEW_SCHEMA if mode == "legacy" else DEV_SCHEMA
+    rows = _count_rows(target, RESULT_TABLES[mode])
+    total = sum(rows.values())
+    result.update({
+        "mode": mode,
+        "rows": rows,
+        "total_rows": total,
+        "rows_per_sec": round(total / result["seconds"], 1) if result["seconds"] else None,
+        "seconds": round(result["seconds"], 3),
+    })
+    return result
+
+
+def write_benchmark_report(results: List[Dict[str, Any]]) -> str:
+    """벤치마크 결과를 RUN_REPORT_DIR에 JSON으로 기록합니다. (회귀 비교 기준)"""
+    report_dir = os.getenv("RUN_REPORT_DIR", "reports")
+    os.makedirs(report_dir, exist_ok=True)
+    path = os.path.join(report_dir, f"benchmark_{datetime.now().strftime('%Y%m%d%H%M%S')}.json")
+    settings = {
+        key: os.getenv(key)
+        for key in (
+            "MIGRATION_WORKERS", "PARTITION_WORKERS", "BATCH_SIZE", "BATCH_ADAPTIVE", "BULK_LOAD", "PRE_DIFF",
+            "ASYNC_IN_FLIGHT", "COMMIT_BATCHES", "COMMIT_SECONDS",
+        )
+    }
+    # .env 기본값이 달라도 비교할 수 있도록 적재 경로를 정하는 설정은 실제로 적용된 값을 기록합니다.
+    settings.update({
+        "LOAD_MODE": os.getenv("LOAD_MODE", "insert"),
+        "SERVER_COPY": "1" if is_server_copy_enabled() else "0",
+        "TRANSPORT_PROFILE": get_transport_profile().name,
+    })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"settings": settings, "results": results}, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def main():
+    args = parse_args()
+    modes = ["legacy", "prod"] if args.mode == "all" else [args.mode]
+    results: List[Dict[str, Any]] = []
+
+    try:
+        for value in args.scale:
+            scale = SyntheticScale(parse_scale(value))
+            print(f"\n🏁 벤치마크 scale={scale.attendance} (attendance 행 수)")
+            prepare_legacy(scale, args.seed)
+            for mode in modes:
+                if mode == "prod":
+                    if "legacy" not in modes:
+                        # renew 스키마(prod 역할)를 먼저 채웁니다.
+                        measure("legacy")
+                    prepare_dev()
+                result = measure(mode)
+                result["scale"] = scale.attendance
+                results.append(result)
+                print(
+                    f"📊 {mode} scale={scale.attendance}: {result['total_rows']}행 / {result['seconds']}초 "
+                    f"= {result['rows_per_sec']}행/s, peak RSS {result['peak_rss_mb']}MB"
+                )
+    except Exception as e:
+        print(f"❌ 벤치마크 중 오류 발생: {e}")
+        return False
+    finally:
+        if not args.keep:
+            for schema in (LEGACY_SCHEMA, RENEW_SCHEMA, DEV_SCHEMA):
+                drop_schema(schema)
+
+    print(f"\n📝 벤치마크 결과: {write_benchmark_report(results)}")
+    print(f"{'mode':<8}{'scale':>12}{'rows':>12}{'seconds':>10}{'rows/s':>12}{'RSS(MB)':>10}")
+    for result in results:
+        print(
+            f"{result['mode']:<8}{result['scale']:>12}{result['total_rows']:>12}"
+            f"{result['seconds']:>10}{result['rows_per_sec']:>12}{result['peak_rss_mb']:>10}"
+        )
+    return all(result["success"] for result in results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,26 +1,121 @@
 import mysql.connector
 from mysql.connector import Error
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
 # .env 파일 로드
 load_dotenv()
 
+
+@dataclass(frozen=True)
+class TransportProfile:
+    """연결의 전송 방식 묶음. (SSH 터널처럼 대역폭이 좁은 구간에서 차이가 큼)
+
+    Attributes:
+        name: 프로필 이름 (TRANSPORT_PROFILE 값).
+        compress: MySQL 프로토콜 압축(zlib) 사용 여부.
+        prepared: 반복되는 multi-row INSERT를 prepared statement(바이너리 프로토콜)로 실행할지 여부.
+        use_pure: True면 순수 파이썬 구현, False면 C 확장(_mysql_connector)을 사용합니다.
+    """
+
+    name: str
+    compress: bool = False
+    prepared: bool = False
+    use_pure: bool = False
+
+
+# TRANSPORT_PROFILE로 고를 수 있는 프로필 (auto: utils.transport의 측정으로 선택)
+TRANSPORT_PROFILES: Dict[str, TransportProfile] = {
+    profile.name: profile
+    for profile in (
+        TransportProfile("default"),
+        TransportProfile("compressed", compress=True),
+        TransportProfile("prepared", prepared=True),
+        TransportProfile("compressed_prepared", compress=True, prepared=True),
+        TransportProfile("pure", use_pure=True),
+    )
+}
+
+
+def get_transport_profile() -> TransportProfile:
+    """TRANSPORT_PROFILE 환경 변수(기본 default)의 프로필. 아직 측정하지 않은 auto는 default로 봅니다.
+
+    Raises:
+        ValueError: 알 수 없는 프로필 이름인 경우.
+    """
+    name = os.getenv('TRANSPORT_PROFILE', 'default')
+    if name == 'auto':
+        name = 'default'
+    if name not in TRANSPORT_PROFILES:
+        raise ValueError(f"알 수 없는 TRANSPORT_PROFILE입니다: {name} ({', '.join(TRANSPORT_PROFILES)}, auto)")
+    return TRANSPORT_PROFILES[name]
+
+
+def is_c_extension_required() -> bool:
+    """REQUIRE_C_EXTENSION 환경 변수(기본 0). 1이면 C 확장을 쓸 수 없을 때 연결하지 않습니다."""
+    return os.getenv('REQUIRE_C_EXTENSION', '0') == '1'
+
+
+def has_c_extension() -> bool:
+    """mysql-connector의 C 확장을 사용할 수 있는지 여부."""
+    return bool(getattr(mysql.connector, 'HAVE_CEXT', False))
+
+
+def _param_bytes(params: Sequence[Any]) -> int:
+    """내부: prepared statement로 보낸 파라미터의 대략적인 바이트 수 (전송량 계측용 추정치)."""
+    return sum(
+        len(value) if isinstance(value, (bytes, bytearray)) else len(str(value).encode('utf-8'))
+        for value in params if value is not None
+    )
+
+
 class DatabaseConnection:
     """로컬 포트(SSH 터널)로 MySQL 데이터베이스 연결을 관리하는 클래스"""
     
-    def __init__(self, host: str, port: int, user: str, password: str, database: str):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        database: str,
+        allow_local_infile: bool = False,
+        session_setup: Sequence[str] = (),
+        bulk_load: bool = False,
+        transport: Optional[TransportProfile] = None,
+        require_c_extension: bool = False,
+    ):
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.database = database
+        self.allow_local_infile = allow_local_infile
+        # 연결(재연결 포함) 직후 매번 실행할 세션 설정 SQL
+        self.session_setup = list(session_setup)
+        # 대량 적재 세션 프로필 사용 여부 (재연결 시에도 다시 적용)
+        self.bulk_load = bulk_load
+        # 전송 방식(압축/prepared/C 확장)과 C 확장 강제 여부
+        self.transport = transport or TRANSPORT_PROFILES['default']
+        self.require_c_extension = require_c_extension
         self.connection: Optional[mysql.connector.MySQLConnection] = None
         self.cursor = None
+        # SQL별 prepared statement 커서 (연결마다 다시 준비)
+        self._prepared_cursors: Dict[str, Any] = {}
+        # 마지막 적재 커밋에 걸린 시간(초) - 스테이지 계측용
+        self.last_commit_seconds = 0.0
     
     def connect(self):
         """로컬 포트(SSH 터널)로 데이터베이스에 연결합니다."""
+        if self.require_c_extension and (self.transport.use_pure or not has_c_extension()):
+            print(f"❌ C 확장을 사용할 수 없어 {self.database} 스키마에 연결하지 않습니다. (REQUIRE_C_EXTENSION=1, 프로필 {self.transport.name})")
+            return False
         try:
             self.connection = mysql.connector.connect(
                 host=self.host,
@@ -32,23 +127,88 @@ class DatabaseConnection:
                 collation='utf8mb4_unicode_ci',
                 autocommit=False,
                 use_unicode=True,
-                connection_timeout=60
+                connection_timeout=60,
+                allow_local_infile=self.allow_local_infile,
+                compress=self.transport.compress,
+                use_pure=self.transport.use_pure,
             )
             self.cursor = self.connection.cursor(dictionary=True)
-            print(f"✅ {self.database} 스키마에 성공적으로 연결되었습니다.")
+            self._prepared_cursors = {}
+            for statement in self.session_setup:
+                self.cursor.execute(statement)
+            if self.bulk_load:
+                self.cursor.execute(self._bulk_load_sql(True))
+            print(f"✅ {self.database} 스키마에 성공적으로 연결되었습니다. ({self.describe_transport()})")
             return True
         except Exception as e:
             print(f"❌ 데이터베이스 연결 실패: {e}")
             return False
     
+    def describe_transport(self) -> str:
+        """실제로 사용 중인 전송 방식 설명. (예: 'compressed: C 확장, 압축')"""
+        implementation = "C 확장" if type(self.connection).__name__.startswith("CMySQL") else "순수 파이썬"
+        options = [implementation]
+        if self.transport.compress:
+            options.append("압축")
+        if self.transport.prepared:
+            options.append("prepared INSERT")
+        return f"{self.transport.name}: {', '.join(options)}"
+
     def disconnect(self):
         """데이터베이스 연결을 종료합니다."""
+        # prepared statement는 연결을 닫으면 서버에서 함께 해제됩니다.
+        self._prepared_cursors = {}
         if self.cursor:
             self.cursor.close()
         if self.connection and self.connection.is_connected():
             self.connection.close()
             print(f"🔌 {self.database} 스키마 연결이 종료되었습니다.")
 
+    def reconnect(self) -> bool:
+        """끊어진 연결(SSH 터널 끊김 등)을 정리하고 다시 연결합니다."""
+        try:
+            if self.connection:
+                self.connection.close()
+        except Error:
+            pass
+        return self.connect()
+
+    def ping(self) -> bool:
+        """연결이 살아 있는지 확인합니다. (자동 재연결 없음)"""
+        if not self.connection:
+            return False
+        try:
+            self.connection.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    @staticmethod
+    def _bulk_load_sql(enabled: bool) -> str:
+        value = "0" if enabled else "DEFAULT"
+        return f"SET SESSION foreign_key_checks = {value}, unique_checks = {value}"
+
+    def set_bulk_load(self, enabled: bool) -> bool:
+        """대량 적재 세션 프로필을 켜거나 끕니다.
+
+        켜면 이 세션에서 행마다 하던 FK/UNIQUE 검사를 생략합니다. (적재 후 일괄 점검 필요)
+        끄면 서버 기본값으로 되돌립니다. 세션 설정이라 연결을 닫으면 함께 사라집니다.
+        """
+        try:
+            self.cursor.execute(self._bulk_load_sql(enabled))
+            self.bulk_load = enabled
+            return True
+        except Error as e:
+            print(f"❌ 대량 적재 세션 설정 실패: {e}")
+            return False
+
+    def reset_session(self) -> None:
+        """풀 반납 전 읽지 않은 결과와 커밋되지 않은 트랜잭션을 정리합니다."""
+        if self.connection.unread_result:
+            self.connection.consume_results()
+        if self.connection.in_transaction:
+            self.connection.rollback()
+
     def execute_query(self, query: str, params=None):
         """쿼리를 실행합니다."""
         try:
@@ -61,6 +221,61 @@ class DatabaseConnection:
             print(f"❌ 쿼리 실행 실패: {e}")
             print(f"쿼리: {query}")
             return None
+
+    def stream_query(self, query: str, params=None, fetch_size: int = 1000, dictionary: bool = True) -> Iterator[Any]:
+        """쿼리 결과를 비버퍼(unbuffered) 커서로 fetch_size 단위씩 읽어 한 행씩 반환합니다.
+
+        - 결과 전체를 메모리에 올리지 않으므로 테이블 크기와 무관하게 메모리 사용량이 일정합니다.
+        - 스트리밍 중에는 같은 연결로 다른 쿼리를 실행할 수 없습니다.
+        - 실패 시 빈 결과와 구분할 수 있도록 예외를 그대로 전달합니다.
+
+        Args:
+            query: 실행할 SELECT 쿼리.
+            params: 쿼리 파라미터.
+            fetch_size: fetchmany 한 번에 가져올 행 수.
+            dictionary: False면 행을 dict 대신 SELECT 순서의 tuple로 반환합니다.
+
+        Yields:
+            결과 행(dict 또는 tuple).
+        """
+        cursor = self.connection.cursor(dictionary=dictionary, buffered=False)
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield from rows
+        except Error as e:
+            print(f"❌ 스트리밍 쿼리 실행 실패: {e}")
+            print(f"쿼리: {query}")
+            raise
+        finally:
+            # 중간에 소비를 멈춘 경우 남은 결과를 비워야 커서를 닫을 수 있습니다.
+            if self.connection.unread_result:
+                self.connection.consume_results()
+            cursor.close()
+
+    def get_result_columns(self, query: str, params=None) -> List[str]:
+        """쿼리 결과의 컬럼 이름을 SELECT 순서대로 조회합니다. (쿼리는 LIMIT 0 등으로 행이 없게 만들어 전달)"""
+        cursor = self.connection.cursor(buffered=True)
+        try:
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            cursor.fetchall()
+            return list(cursor.column_names)
+        finally:
+            cursor.close()
+
+    def count_query(self, query: str, params=None) -> int:
+        """SELECT 쿼리의 결과 행 수를 조회합니다. (프로그레스 바 total 용도)"""
+        result = self.execute_query(f"SELECT COUNT(*) AS cnt FROM ({query}) AS counted", params)
+        return result[0]['cnt'] if result else 0
     
     def execute_insert(self, query: str, params=None):
         """INSERT 쿼리를 실행합니다."""
@@ -77,6 +292,21 @@ class DatabaseConnection:
             self.connection.rollback()
             return None
     
+    def execute_command(self, query: str, params=None) -> bool:
+        """DDL/DML 문을 실행하고 커밋합니다. 성공 여부를 반환합니다."""
+        try:
+            if params:
+                self.cursor.execute(query, params)
+            else:
+                self.cursor.execute(query)
+            self.connection.commit()
+            return True
+        except Error as e:
+            print(f"❌ 쿼리 실행 실패: {e}")
+            print(f"쿼리: {query}")
+            self.connection.rollback()
+            return False
+
     def execute_many(self, query: str, data_list):
         """여러 개의 데이터를 한번에 INSERT합니다."""
         try:
@@ -88,7 +318,119 @@ class DatabaseConnection:
             print(f"쿼리: {query}")
             self.connection.rollback()
             return None
-    
+
+    def _timed_commit(self) -> None:
+        """내부: 커밋하고 걸린 시간을 last_commit_seconds에 남깁니다."""
+        started = time.perf_counter()
+        self.connection.commit()
+        self.last_commit_seconds = time.perf_counter() - started
+
+    def _prepared_cursor(self, query: str):
+        """내부: query를 한 번만 준비(PREPARE)해 두고 재사용하는 바이너리 프로토콜 커서."""
+        cursor = self._prepared_cursors.get(query)
+        if cursor is None:
+            cursor = self.connection.cursor(prepared=True)
+            self._prepared_cursors[query] = cursor
+        return cursor
+
+    def execute_statements(
+        self,
+        statements: List[Tuple[str, Sequence[Any]]],
+        commit: bool = True,
+        prepared: Optional[str] = None,
+    ) -> Tuple[Optional[int], int]:
+        """여러 SQL 문을 하나의 트랜잭션으로 실행한 뒤 커밋합니다.
+
+        commit=False 이면 열려 있는 트랜잭션 안에서 SAVEPOINT로 감싸 실행하고 커밋하지 않습니다.
+        실패하면 이 문장들만 SAVEPOINT까지 되돌리므로 앞서 쌓인(아직 커밋 전인) 배치는 유지됩니다.
+        prepared와 같은 SQL은 prepared statement로 실행해 SQL 텍스트 없이 바이너리 파라미터만 보냅니다.
+
+        Returns:
+            (영향받은 행 수, 전송한 SQL 바이트 수). 실패 시 롤백하고 영향받은 행 수는 None.
+        """
+        affected = 0
+        bytes_sent = 0
+        try:
+            if not commit:
+                self.cursor.execute("SAVEPOINT batch_start")
+            for query, params in statements:
+                if query == prepared:
+                    cursor = self._prepared_cursor(query)
+                    cursor.execute(query, params)
+                    affected += cursor.rowcount
+                    bytes_sent += _param_bytes(params)
+                    continue
+                self.cursor.execute(query, params)
+                affected += self.cursor.rowcount
+                bytes_sent += len((self.cursor.statement or query).encode('utf-8'))
+            if commit:
+                self._timed_commit()
+            else:
+                self.cursor.execute("RELEASE SAVEPOINT batch_start")
+            return affected, bytes_sent
+        except Error as e:
+            print(f"❌ Multi-row INSERT 실행 실패: {e}")
+            if commit:
+                self.connection.rollback()
+            else:
+                self._rollback_to_savepoint()
+            return None, bytes_sent
+
+    def _rollback_to_savepoint(self) -> None:
+        """내부: 실패한 배치만 되돌립니다. SAVEPOINT가 없어졌으면(연결 끊김 등) 트랜잭션 전체를 롤백합니다."""
+        try:
+            self.cursor.execute("ROLLBACK TO SAVEPOINT batch_start")
+        except Error:
+            self.connection.rollback()
+
+    def commit(self) -> bool:
+        """열려 있는 트랜잭션을 커밋합니다. 실패 시 롤백하고 False를 반환합니다."""
+        try:
+            self._timed_commit()
+            return True
+        except Error as e:
+            print(f"❌ 커밋 실패: {e}")
+            self.connection.rollback()
+            return False
+
+    def get_max_allowed_packet(self) -> int:
+        """서버의 max_allowed_packet(바이트)을 조회합니다. 조회 실패 시 MySQL 기본값(4MB)을 사용합니다."""
+        result = self.execute_query("SELECT @@max_allowed_packet AS max_allowed_packet")
+        if result:
+            return int(result[0]['max_allowed_packet'])
+        return 4 * 1024 * 1024
+
+    def supports_local_infile(self) -> bool:
+        """클라이언트/서버 모두 LOAD DATA LOCAL INFILE을 허용하는지 확인합니다."""
+        if not self.allow_local_infile:
+            return False
+        result = self.execute_query("SELECT @@local_infile AS local_infile")
+        return bool(result) and int(result[0]['local_infile']) == 1
+
+    def execute_load_data(self, file_path: str, table: str, columns: Sequence[str]) -> Optional[int]:
+        """TSV 파일을 LOAD DATA LOCAL INFILE로 적재하고 커밋합니다.
+
+        - IGNORE: 이미 존재하는 PK는 건너뜁니다. (ON DUPLICATE KEY UPDATE id=id 와 동일)
+        - 파일 형식: 탭 구분, 백슬래시 이스케이프, NULL은 \\N
+
+        Returns:
+            적재된 행 수. 실패 시 롤백하고 None.
+        """
+        query = (
+            f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {table} CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+            f"({', '.join(columns)})"
+        )
+        try:
+            self.cursor.execute(query, (file_path,))
+            self._timed_commit()
+            return self.cursor.rowcount
+        except Error as e:
+            print(f"❌ LOAD DATA 실행 실패: {e}")
+            print(f"쿼리: {query}")
+            self.connection.rollback()
+            return None
+
     def get_table_list(self):
         """데이터베이스의 테이블 목록을 가져옵니다."""
         query = "SHOW TABLES"
@@ -104,8 +446,18 @@ class DatabaseConnection:
         return self.execute_query(query)
 
 
-def create_database_connection(schema_name: str) -> DatabaseConnection:
-    """환경 변수를 사용하여 데이터베이스 연결 객체를 생성합니다."""
+def create_database_connection(
+    schema_name: str,
+    session_setup: Sequence[str] = (),
+    bulk_load: bool = False,
+    transport: Optional[TransportProfile] = None,
+) -> DatabaseConnection:
+    """환경 변수를 사용하여 데이터베이스 연결 객체를 생성합니다.
+
+    LOAD_MODE=infile 이면 LOAD DATA LOCAL INFILE을 허용하는 연결을 만듭니다.
+    bulk_load=True 이면 연결마다 대량 적재 세션 프로필을 적용합니다.
+    transport를 주지 않으면 TRANSPORT_PROFILE 프로필을, REQUIRE_C_EXTENSION=1 이면 C 확장을 강제합니다.
+    """
     host = os.getenv('DB_HOST', 'localhost')
     port = int(os.getenv('DB_PORT', 13306))
     user = os.getenv('DB_USER')
@@ -114,7 +466,16 @@ def create_database_connection(schema_name: str) -> DatabaseConnection:
     if not all([host, user, password]):
         raise ValueError("데이터베이스 연결 정보가 완전하지 않습니다. .env 파일을 확인해주세요.")
     
-    return DatabaseConnection(host, port, user, password, schema_name)
+    allow_local_infile = os.getenv('LOAD_MODE', 'insert') == 'infile'
+    
+    return DatabaseConnection(
+        host, port, user, password, schema_name,
+        allow_local_infile=allow_local_infile,
+        session_setup=session_setup,
+        bulk_load=bulk_load,
+        transport=transport or get_transport_profile(),
+        require_c_extension=is_c_extension_required(),
+    )
 
 
 def test_connection(db_connection: DatabaseConnection) -> bool:
@@ -125,3 +486,94 @@ def test_connection(db_connection: DatabaseConnection) -> bool:
         db_connection.disconnect()
         return result is not None
     return False
+
+
+class ConnectionPool:
+    """같은 스키마에 대한 DatabaseConnection을 재사용하는 스레드 안전 커넥션 풀.
+
+    - checkout 시 ping으로 상태를 확인하고, 끊긴 연결은 다시 연결합니다.
+    - 최대 size개까지만 연결을 만들고, 모두 사용 중이면 반납될 때까지 기다립니다.
+    - 새 연결마다 session_setup SQL을 실행합니다.
+    - bulk_load=True 이면 모든 연결에 대량 적재 세션 프로필을 적용합니다.
+    """
+
+    def __init__(self, schema_name: str, size: int = 4, session_setup: Sequence[str] = (), bulk_load: bool = False):
+        if size <= 0:
+            raise ValueError("size must be positive")
+        self.schema_name = schema_name
+        self.size = size
+        self.session_setup = list(session_setup)
+        self.bulk_load = bulk_load
+        self._idle: "queue.LifoQueue[DatabaseConnection]" = queue.LifoQueue()
+        self._all: List[DatabaseConnection] = []
+        self._lock = threading.Lock()
+
+    def _create(self) -> Optional[DatabaseConnection]:
+        """내부: 풀 한도 안이면 새 연결을 만들어 반환합니다."""
+        with self._lock:
+            if len(self._all) >= self.size:
+                return None
+            conn = create_database_connection(self.schema_name, session_setup=self.session_setup, bulk_load=self.bulk_load)
+            self._all.append(conn)
+        if not conn.connect():
+            with self._lock:
+                self._all.remove(conn)
+            raise ConnectionError(f"{self.schema_name} 스키마 연결 실패")
+        return conn
+
+    def checkout(self, timeout: Optional[float] = None) -> DatabaseConnection:
+        """상태가 확인된 연결을 하나 빌립니다.
+
+        Raises:
+            ConnectionError: 연결/재연결에 실패한 경우.
+            queue.Empty: timeout 안에 반납된 연결이 없는 경우.
+        """
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._create() or self._idle.get(timeout=timeout)
+
+        if not conn.ping() and not conn.reconnect():
+            with self._lock:
+                self._all.remove(conn)
+            raise ConnectionError(f"{self.schema_name} 스키마 재연결 실패")
+        return conn
+
+    def checkin(self, conn: DatabaseConnection) -> None:
+        """빌린 연결을 정리해서 풀에 반납합니다. 정리에 실패한 연결은 버립니다."""
+        try:
+            conn.reset_session()
+        except Error:
+            conn.disconnect()
+            with self._lock:
+                self._all.remove(conn)
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[DatabaseConnection]:
+        """with 블록 동안 연결을 빌리고 끝나면 반납합니다."""
+        conn = self.checkout()
+        try:
+            yield conn
+        finally:
+            self.checkin(conn)
+
+    def close_all(self) -> None:
+        """풀의 모든 연결을 종료합니다."""
+        with self._lock:
+            connections, self._all = self._all, []
+        for conn in connections:
+            conn.disconnect()
+
+
+def create_connection_pool(schema_name: str, size: Optional[int] = None, bulk_load: bool = False) -> ConnectionPool:
+    """환경 변수를 사용하여 커넥션 풀을 생성합니다.
+
+    - DB_POOL_SIZE: 스키마당 최대 연결 수 (기본 4)
+    - DB_SESSION_SETUP: 연결마다 실행할 세션 설정 SQL (세미콜론으로 구분)
+    """
+    if size is None:
+        size = int(os.getenv('DB_POOL_SIZE', 4))
+    session_setup = [stmt.strip() for stmt in os.getenv('DB_SESSION_SETUP', '').split(';') if stmt.strip()]
+    return ConnectionPool(schema_name, size=size, session_setup=session_setup, bulk_load=bulk_load)
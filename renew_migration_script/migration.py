@@ -4,43 +4,102 @@
 attendance-dev 스키마의 데이터를 attendance_renew_dev 스키마로 이전합니다.
 """
 
+import argparse
 import os
 import sys
+from datetime import datetime
 from dotenv import load_dotenv
-from db import create_database_connection, test_connection
-from tables.user import migrate_user_table
-from tables.image import migrate_image_table
+from db import create_connection_pool
+from tables.user import USER_SPEC, USER_TASK
+from tables.image import IMAGE_SPEC, IMAGE_TASK
 from tables.organization import migrate_organization_table
-from tables.activity import migrate_activity_table, migrate_activity_prod_to_dev
-from tables.attendance import migrate_attendance_table, migrate_attendance_prod_to_dev
-from tables.user_role import migrate_user_role_table
-from tables.test import test
+from tables.activity import ACTIVITY_SPEC, ACTIVITY_TASK, PROD_ACTIVITY_QUERY, migrate_activity_prod_to_dev
+from tables.attendance import ATTENDANCE_SPEC, ATTENDANCE_TASK, PROD_ATTENDANCE_QUERY, migrate_attendance_prod_to_dev
+from tables.user_role import USER_ROLE_SPEC, USER_ROLE_TASK
+from tables.test import TEST_TASK
+from utils.bulk_session import bulk_load_tables
+from utils.checkpoint import start_run
+from utils.fanout import fan_out, get_fan_out_targets
+from utils.metrics import write_run_report
+from utils.scheduler import run_task_graph
+from utils.snapshot import SnapshotSource, export_snapshot, get_snapshot_dir, latest_snapshot_path
+from utils.transport import select_transport_profile
+from utils.verify import verify_tables
 
 # .env 파일 로드
 load_dotenv()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="데이터베이스 마이그레이션 스크립트")
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const="latest",
+        default=None,
+        metavar="RUN_ID",
+        help="중단된 실행을 마지막 체크포인트부터 재개합니다. (RUN_ID 생략 시 가장 최근 실행)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "prod → dev 동기화 시 지난 동기화 이후 변경된 행만 upsert 합니다. "
+            "변경은 updated_at으로 찾으므로 prod는 soft delete(is_deleted)를 포함한 모든 수정에서 updated_at을 갱신해야 합니다."
+        ),
+    )
+    parser.add_argument(
+        "--snapshot",
+        metavar="PATH",
+        default=None,
+        help="스냅샷 파일 경로. (내보내기 기본: SNAPSHOT_DIR/<스키마>_<시각>.msnap, 가져오기 기본: 가장 최근 파일)",
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     
-    available_options = ["1", "2"]
+    available_options = ["1", "2", "3", "4", "5"]
     
-    option = input("1. renew 테이블로 마이그레이션\n2. prod db의 전체 데이터를 dev db로 마이그레이션\n")
+    option = input(
+        "1. renew 테이블로 마이그레이션\n2. prod db의 전체 데이터를 dev db로 마이그레이션\n"
+        "3. renew 마이그레이션 결과 검증 (구간 체크섬)\n"
+        "4. prod db를 스냅샷 파일로 내보내기\n5. 스냅샷 파일을 dev db로 가져오기\n"
+    )
     
     if option not in available_options:
         print("❌ 잘못된 옵션입니다.")
         return False
     
+    if option == "3":
+        return verify_legacy_to_renew()
+    if option == "4":
+        return export_prod_snapshot(args.snapshot)
+    
+    # 대량 적재하는 옵션(1, 2, 5)만 전송 프로필을 정합니다. (TRANSPORT_PROFILE=auto면 실행당 한 번 측정)
+    # 모든 스키마가 같은 터널을 지나므로 타겟 스키마 하나로 측정합니다.
+    select_transport_profile(os.getenv('TARGET_SCHEMA', 'attendance_renew_dev'))
+    
     """마이그레이션 메인 함수"""
     print("🚀 데이터베이스 마이그레이션을 시작합니다...")
     
     if option == "1":
-        migrate_legacy_to_renew()
+        migrate_legacy_to_renew(resume=args.resume)
     elif option == "2":
-        migrate_prod_to_dev()
+        fan_out_targets = get_fan_out_targets()
+        if len(fan_out_targets) > 1:
+            if args.incremental:
+                print("⚠️ 팬아웃 모드는 전체 동기화만 지원해 --incremental을 무시합니다.")
+            migrate_prod_to_targets(fan_out_targets, resume=args.resume)
+        else:
+            migrate_prod_to_dev(resume=args.resume, incremental=args.incremental)
+    elif option == "5":
+        return import_snapshot_to_dev(args.snapshot, resume=args.resume)
     
     return True
 
 
-def migrate_legacy_to_renew():
+def migrate_legacy_to_renew(resume=None):
     # 환경 변수에서 스키마 이름 가져오기
     source_schema = os.getenv('SOURCE_SCHEMA', 'attendance-dev')
     target_schema = os.getenv('TARGET_SCHEMA', 'attendance_renew_dev')
@@ -48,32 +107,34 @@ def migrate_legacy_to_renew():
     print(f"📋 소스 스키마: {source_schema}")
     print(f"📋 타겟 스키마: {target_schema}")
     
+    # 이전 데이터가 담겨있는 스키마 (before) / 새로 적재할 스키마 (after) 커넥션 풀
+    # 여기서 검증한 연결은 풀에 반납되어 테이블 작업에서 그대로 재사용됩니다.
+    # BULK_LOAD=1 이면 타겟 연결마다 FK/UNIQUE 검사를 끄고 적재 후 일괄 점검합니다. (빈 스키마 최초 적재용)
+    bulk_load = os.getenv('BULK_LOAD', '0') == '1'
+    source_pool = create_connection_pool(source_schema)
+    target_pool = create_connection_pool(target_schema, bulk_load=bulk_load)
+    
     try:
-        # 이전 데이터가 담겨있는 스키마 연결 (before)
-        print(f"\n🔗 {source_schema} 스키마 연결 중...")
-        before = create_database_connection(source_schema)
-        
-        # 새로 적재할 스키마 연결 (after)
-        print(f"🔗 {target_schema} 스키마 연결 중...")
-        after = create_database_connection(target_schema)
-        
-        # 연결 테스트
+        # 연결 테스트 (checkout 시 ping으로 상태 확인)
         print("\n🧪 데이터베이스 연결 테스트 중...")
         
-        if not test_connection(before):
+        try:
+            print(f"\n🔗 {source_schema} 스키마 연결 중...")
+            before = source_pool.checkout()
+        except ConnectionError:
             print(f"❌ {source_schema} 스키마 연결 실패")
             return False
         
-        if not test_connection(after):
+        try:
+            print(f"🔗 {target_schema} 스키마 연결 중...")
+            after = target_pool.checkout()
+        except ConnectionError:
             print(f"❌ {target_schema} 스키마 연결 실패")
+            source_pool.checkin(before)
             return False
         
         print("✅ 모든 데이터베이스 연결이 성공했습니다!")
         
-        # 실제 연결 수행
-        before.connect()
-        after.connect()
-        
         # 소스 스키마의 테이블 목록 확인
         print(f"\n📊 {source_schema} 스키마의 테이블 목록:")
         source_tables = before.get_table_list()
@@ -86,11 +147,23 @@ def migrate_legacy_to_renew():
         for table in target_tables:
             print(f"  - {table}")
         
+        # 실행 ID 결정 (체크포인트는 타겟 스키마에 기록)
+        start_run(after, resume)
+        
+        source_pool.checkin(before)
+        target_pool.checkin(after)
+        
         print(f"\n✨ 마이그레이션 준비가 완료되었습니다!")
         print(f"📝 소스 테이블 수: {len(source_tables)}")
         print(f"📝 타겟 테이블 수: {len(target_tables)}")
         
-        migrate_data(before, after)
+        if bulk_load:
+            print("🚚 대량 적재 모드: FK/UNIQUE 검사를 끄고 적재한 뒤 일괄 점검합니다.")
+            drop_indexes = os.getenv('BULK_DROP_INDEXES', '0') == '1'
+            with bulk_load_tables(target_pool, BULK_LOAD_TABLES, drop_indexes=drop_indexes):
+                migrate_data(source_pool, target_pool)
+        else:
+            migrate_data(source_pool, target_pool)
         
     except Exception as e:
         print(f"❌ 마이그레이션 중 오류 발생: {e}")
@@ -99,47 +172,68 @@ def migrate_legacy_to_renew():
     finally:
         # 연결 종료
         print("\n🔌 데이터베이스 연결을 종료합니다...")
-        if 'before' in locals():
-            before.disconnect()
-        if 'after' in locals():
-            after.disconnect()
+        source_pool.close_all()
+        target_pool.close_all()
+        # 테이블별 스테이지 계측 결과를 JSON으로 남깁니다. (실패한 실행도 비교할 수 있도록)
+        write_run_report("legacy_to_renew")
             
     return True
 
 
-def migrate_data(before, after):
+# renew 마이그레이션 작업 목록 (선행 작업은 각 tables 모듈의 Task 선언 참고)
+# organization은 타겟에 이미 적재되어 있어 제외합니다.
+LEGACY_TO_RENEW_TASKS = [TEST_TASK, USER_TASK, IMAGE_TASK, ACTIVITY_TASK, ATTENDANCE_TASK, USER_ROLE_TASK]
+
+# 대량 적재 모드에서 인덱스 재생성/ANALYZE/무결성 점검 대상 타겟 테이블
+BULK_LOAD_TABLES = ["user", "activity", "activity_image", "attendance", "user_role"]
+
+
+def migrate_data(source_pool, target_pool):
     print("\n🔄 데이터 마이그레이션을 시작합니다...")
     
-    test_result = test(before, after)
-    if not test_result:
-        print("❌ Test 테이블 마이그레이션 실패")
+    # 각 워커는 풀에서 자기 전용 source/target 연결을 빌려 사용합니다.
+    max_workers = int(os.getenv('MIGRATION_WORKERS', 4))
+    print(f"⚙️ 최대 {max_workers}개 테이블을 동시에 마이그레이션합니다.")
     
-    user_result = migrate_user_table(before, after)
-    if not user_result:
-        print("❌ User 테이블 마이그레이션 실패")
+    results = run_task_graph(LEGACY_TO_RENEW_TASKS, source_pool, target_pool, max_workers=max_workers)
     
-    image_result = migrate_image_table(before, after)
-    if not image_result:
-        print("❌ Image 테이블 마이그레이션 실패")
-        
-    # organization_result = migrate_organization_table(before, after)
-    # if not organization_result:
-    #     print("❌ Organization 테이블 마이그레이션 실패")
+    for name, success in results.items():
+        if not success:
+            print(f"❌ {name} 테이블 마이그레이션 실패")
+
 
-    activity_result = migrate_activity_table(before, after)
-    if not activity_result:
-        print("❌ Activity 테이블 마이그레이션 실패")
+# 체크섬 검증 대상 (소스 쿼리 결과를 각 TableSpec 매핑대로 타겟과 비교)
+VERIFY_SPECS = [USER_SPEC, IMAGE_SPEC, ACTIVITY_SPEC, ATTENDANCE_SPEC, USER_ROLE_SPEC]
 
-    attendance_result = migrate_attendance_table(before, after)
-    if not attendance_result:
-        print("❌ Attendance 테이블 마이그레이션 실패")
 
-    user_role_result = migrate_user_role_table(before, after)
-    if not user_role_result:
-        print("❌ UserRole 테이블 마이그레이션 실패")
+def verify_legacy_to_renew():
+    # 환경 변수에서 스키마 이름 가져오기
+    source_schema = os.getenv('SOURCE_SCHEMA', 'attendance-dev')
+    target_schema = os.getenv('TARGET_SCHEMA', 'attendance_renew_dev')
+    
+    print(f"📋 소스 스키마: {source_schema}")
+    print(f"📋 타겟 스키마: {target_schema}")
+    
+    # 테이블마다 소스/타겟 체크섬을 동시에 계산하므로 각 풀에서 테이블당 연결 하나씩 사용합니다.
+    source_pool = create_connection_pool(source_schema)
+    target_pool = create_connection_pool(target_schema)
+    
+    try:
+        max_workers = int(os.getenv('MIGRATION_WORKERS', 4))
+        return verify_tables(source_pool, target_pool, VERIFY_SPECS, max_workers=max_workers)
+    
+    except Exception as e:
+        print(f"❌ 검증 중 오류 발생: {e}")
+        return False
+    
+    finally:
+        # 연결 종료
+        print("\n🔌 데이터베이스 연결을 종료합니다...")
+        source_pool.close_all()
+        target_pool.close_all()
 
 
-def migrate_prod_to_dev():
+def migrate_prod_to_dev(resume=None, incremental=False):
     # 환경 변수에서 스키마 이름 가져오기
     source_schema = os.getenv('SOURCE_SCHEMA', 'attendance_renew')
     target_schema = os.getenv('TARGET_SCHEMA', 'attendance_renew_dev')
@@ -147,38 +241,39 @@ def migrate_prod_to_dev():
     print(f"📋 소스 스키마: {source_schema}")
     print(f"📋 타겟 스키마: {target_schema}")
     
+    # prod 데이터가 담겨있는 스키마 (prod) / dev 적재할 스키마 (dev) 커넥션 풀
+    prod_pool = create_connection_pool(source_schema)
+    dev_pool = create_connection_pool(target_schema)
+    
     try:
-        # prod 데이터가 담겨있는 스키마 연결 (prod)
-        print(f"\n🔗 {source_schema} 스키마 연결 중...")
-        prod = create_database_connection(source_schema)
-        
-        # dev 적재할 스키마 연결 (dev)
-        print(f"🔗 {target_schema} 스키마 연결 중...")
-        dev = create_database_connection(target_schema)
-        
-        # 연결 테스트
+        # 연결 테스트 (checkout 시 ping으로 상태 확인, 검증한 연결을 그대로 사용)
         print("\n🧪 데이터베이스 연결 테스트 중...")
         
-        if not test_connection(prod):
+        try:
+            print(f"\n🔗 {source_schema} 스키마 연결 중...")
+            prod = prod_pool.checkout()
+        except ConnectionError:
             print(f"❌ {source_schema} 스키마 연결 실패")
             return False
         
-        if not test_connection(dev):
+        try:
+            print(f"🔗 {target_schema} 스키마 연결 중...")
+            dev = dev_pool.checkout()
+        except ConnectionError:
             print(f"❌ {target_schema} 스키마 연결 실패")
             return False
         
         print("✅ 모든 데이터베이스 연결이 성공했습니다!")
         
-        # 실제 연결 수행
-        prod.connect()
-        dev.connect()
+        # 실행 ID 결정 (체크포인트는 dev 스키마에 기록)
+        start_run(dev, resume)
         print(f"\n✨ 마이그레이션 준비가 완료되었습니다!")
         
-        activity_migration_result = migrate_activity_prod_to_dev(prod, dev)
+        activity_migration_result = migrate_activity_prod_to_dev(prod, dev, incremental=incremental)
         if not activity_migration_result:
             print("❌ Activity 테이블 마이그레이션 실패")
         
-        attendance_migration_result = migrate_attendance_prod_to_dev(prod, dev)
+        attendance_migration_result = migrate_attendance_prod_to_dev(prod, dev, incremental=incremental)
         if not attendance_migration_result:
             print("❌ Attendance 테이블 마이그레이션 실패")
         
@@ -189,14 +284,153 @@ def migrate_prod_to_dev():
     finally:
         # 연결 종료
         print("\n🔌 데이터베이스 연결을 종료합니다...")
-        if 'prod' in locals():
-            prod.disconnect()
-        if 'dev' in locals():
-            dev.disconnect()
+        prod_pool.close_all()
+        dev_pool.close_all()
+        write_run_report("prod_to_dev")
             
     return True
 
 
+# prod → dev 테이블 순서 (attendance 고아 행 필터링이 dev.activity를 참조하므로 activity 먼저)
+PROD_TO_DEV_TABLES = [
+    ("activity", PROD_ACTIVITY_QUERY, migrate_activity_prod_to_dev),
+    ("attendance", PROD_ATTENDANCE_QUERY, migrate_attendance_prod_to_dev),
+]
+
+
+def migrate_prod_to_targets(target_schemas, resume=None):
+    """prod 테이블을 한 번씩만 읽어 여러 dev 스키마(FAN_OUT_TARGETS)에 동시에 적재합니다."""
+    source_schema = os.getenv('SOURCE_SCHEMA', 'attendance_renew')
+    
+    print(f"📋 소스 스키마: {source_schema}")
+    print(f"📋 타겟 스키마: {', '.join(target_schemas)}")
+    
+    prod_pool = create_connection_pool(source_schema, size=1)
+    target_pools = [create_connection_pool(schema, size=1) for schema in target_schemas]
+    results = {schema: True for schema in target_schemas}
+    
+    try:
+        print("\n🧪 데이터베이스 연결 테스트 중...")
+        try:
+            print(f"\n🔗 {source_schema} 스키마 연결 중...")
+            prod = prod_pool.checkout()
+            targets = []
+            for schema, pool in zip(target_schemas, target_pools):
+                print(f"🔗 {schema} 스키마 연결 중...")
+                targets.append(pool.checkout())
+        except ConnectionError as e:
+            print(f"❌ 연결 실패: {e}")
+            return False
+        
+        print("✅ 모든 데이터베이스 연결이 성공했습니다!")
+        
+        # 실행 ID는 첫 타겟 기준으로 정하고 모든 타겟이 같은 ID로 체크포인트를 기록합니다.
+        start_run(targets[0], resume)
+        
+        for name, query, migrate in PROD_TO_DEV_TABLES:
+            print(f"\n📡 {name}: prod에서 한 번 읽어 {len(targets)}개 스키마로 분배합니다.")
+            for schema, success in zip(target_schemas, fan_out(prod, query, targets, migrate)):
+                if not success:
+                    print(f"❌ {schema}: {name} 테이블 마이그레이션 실패")
+                    results[schema] = False
+        
+    except Exception as e:
+        print(f"❌ 마이그레이션 중 오류 발생: {e}")
+        return False
+    
+    finally:
+        print("\n🔌 데이터베이스 연결을 종료합니다...")
+        prod_pool.close_all()
+        for pool in target_pools:
+            pool.close_all()
+        write_run_report("prod_to_targets")
+    
+    print("\n📊 타겟별 결과:")
+    for schema, success in results.items():
+        print(f"  {'✅' if success else '❌'} {schema}")
+    return all(results.values())
+
+
+# 스냅샷으로 내보낼 prod 테이블 (가져올 때는 같은 쿼리로 tables/* 의 prod → dev 매핑을 그대로 사용)
+SNAPSHOT_TABLES = [(name, query) for name, query, _ in PROD_TO_DEV_TABLES]
+
+
+def export_prod_snapshot(path=None):
+    source_schema = os.getenv('SOURCE_SCHEMA', 'attendance_renew')
+    path = path or os.path.join(get_snapshot_dir(), f"{source_schema}_{datetime.now().strftime('%Y%m%d%H%M%S')}.msnap")
+    
+    print(f"📋 소스 스키마: {source_schema}")
+    print(f"📋 스냅샷 파일: {path}")
+    
+    prod_pool = create_connection_pool(source_schema, size=1)
+    try:
+        try:
+            print(f"\n🔗 {source_schema} 스키마 연결 중...")
+            prod = prod_pool.checkout()
+        except ConnectionError:
+            print(f"❌ {source_schema} 스키마 연결 실패")
+            return False
+        
+        export_snapshot(prod, path, SNAPSHOT_TABLES)
+        prod_pool.checkin(prod)
+        return True
+    
+    except Exception as e:
+        print(f"❌ 스냅샷 내보내기 중 오류 발생: {e}")
+        return False
+    
+    finally:
+        print("\n🔌 데이터베이스 연결을 종료합니다...")
+        prod_pool.close_all()
+
+
+def import_snapshot_to_dev(path=None, resume=None):
+    target_schema = os.getenv('TARGET_SCHEMA', 'attendance_renew_dev')
+    path = path or latest_snapshot_path()
+    if not path:
+        print(f"❌ {get_snapshot_dir()}에 스냅샷 파일이 없습니다. --snapshot으로 경로를 지정해주세요.")
+        return False
+    
+    try:
+        snapshot = SnapshotSource(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ 스냅샷 파일을 열 수 없습니다: {e}")
+        return False
+    
+    print(f"📋 스냅샷: {path} - {snapshot.describe()}")
+    print(f"📋 타겟 스키마: {target_schema}")
+    
+    dev_pool = create_connection_pool(target_schema)
+    try:
+        try:
+            print(f"🔗 {target_schema} 스키마 연결 중...")
+            dev = dev_pool.checkout()
+        except ConnectionError:
+            print(f"❌ {target_schema} 스키마 연결 실패")
+            return False
+        
+        # 실행 ID 결정 (체크포인트는 dev 스키마에 기록)
+        start_run(dev, resume)
+        
+        # prod → dev와 같은 매핑/고아 행 필터링을 스냅샷 소스로 실행합니다.
+        if not migrate_activity_prod_to_dev(snapshot, dev):
+            print("❌ Activity 테이블 가져오기 실패")
+        if not migrate_attendance_prod_to_dev(snapshot, dev):
+            print("❌ Attendance 테이블 가져오기 실패")
+        
+    except Exception as e:
+        print(f"❌ 스냅샷 가져오기 중 오류 발생: {e}")
+        return False
+    
+    finally:
+        print("\n🔌 데이터베이스 연결을 종료합니다...")
+        dev_pool.close_all()
+        snapshot.close()
+        write_run_report("snapshot_to_dev")
+    
+    return True
+
+
 if __name__ == "__main__":
     success = main()
     if success:
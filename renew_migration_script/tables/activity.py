@@ -1,43 +1,14 @@
 from db import DatabaseConnection
-from utils.progress import chunked, print_progress
-from typing import List, Dict, Any
-from datetime import datetime
+from utils.engine import migrate_spec, migrate_table
+from utils.extract import KeysetQuery
+from utils.key_index import get_key_index, invalidate_key_index
+from utils.scheduler import MigrationTask
+from utils.spec import TableSpec, ValueMap
+from utils.watermark import DeltaTracker, plan_delta
+from typing import List
 
-def name_converter(name: str) -> str:
-    if name == '수요제자기도회':
-        return '수요청년예배'
-    elif name == '현장치유팀사역':
-        return '금요청년예배'
-
-def map_activity_data(old_activity: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    이전 image 테이블 데이터를 새로운 image 테이블 구조에 맞게 변환합니다.
-    """
-    
-    mapped_data = {
-      'id': old_activity['id'],
-      'name': name_converter(old_activity['name']),
-      'description': old_activity['description'],
-      'activity_category': '예배',
-      'location': old_activity['location'],
-      'organization_id': old_activity['organization_id'],
-      'start_time': old_activity['start_time'],
-      'end_time': old_activity['end_time'],
-      'is_deleted': 0,
-      'created_at': old_activity['created_at'],
-      'updated_at': old_activity['updated_at']
-    }
-    
-    return mapped_data
-  
-def migrate_activity_table(before: DatabaseConnection, after: DatabaseConnection):
-    """
-    이전 activity 테이블 데이터를 새로운 activity 테이블로 마이그레이션합니다.
-    """
-    try:
-        before_activity_data = before.execute_query(
-        """
-        SELECT
+LEGACY_ACTIVITY_QUERY = KeysetQuery(
+    columns="""
           activity_instance.id as id,
           activity.name as name,
           activity_instance.notes as description,
@@ -47,98 +18,119 @@ def migrate_activity_table(before: DatabaseConnection, after: DatabaseConnection
           activity_instance.end_datetime as end_time,
           activity_instance.created_at as created_at,
           activity_instance.updated_at as updated_at
-        FROM activity_instance
+    """,
+    source="""
+        activity_instance
         INNER JOIN activity
         ON activity_instance.activity_id = activity.id
-        """
-        )
-        
-        if not before_activity_data:
-            print("⚠️ 이전 activity 테이블에 데이터가 없습니다.")
-            return True
-        
-        mapped_activities = list(map(map_activity_data, before_activity_data))
-        
-        insert_query = """
-        INSERT INTO activity (
-          id, name, description, activity_category, location, organization_id, start_time, end_time, is_deleted, created_at, updated_at
-        ) VALUES (
-          %(id)s, %(name)s, %(description)s, %(activity_category)s, %(location)s, %(organization_id)s, %(start_time)s, %(end_time)s, %(is_deleted)s, %(created_at)s, %(updated_at)s
-        ) ON DUPLICATE KEY UPDATE id=id
-        """
-        
-        total = len(mapped_activities)
-        affected_total = 0
-        batch_size = 1000
-        processed = 0
-        for batch in chunked(mapped_activities, batch_size):
-            affected = after.execute_many(insert_query, batch) or 0
-            affected_total += affected
-            processed += len(batch)
-            print_progress(processed, total, prefix="activity")
-        
-        if affected_total:
-            print(f"✅ {affected_total}개의 activity 레코드가 성공적으로 마이그레이션되었습니다.")
-            return True
-        else:
-            print("영향받은 레코드가 없습니다.")
-            return False
-        
-    except Exception as e:
-        print(f"❌ activity 테이블 마이그레이션 중 오류 발생: {e}")
-        return False
+    """,
+    key="activity_instance.id",
+)
 
+PROD_ACTIVITY_QUERY = KeysetQuery(
+    columns="id, name, description, activity_category, organization_id, start_time, end_time, is_deleted, created_at, updated_at",
+    source="activity",
+    key="id",
+)
 
-def migrate_activity_prod_to_dev(prod: DatabaseConnection, dev: DatabaseConnection):
+ACTIVITY_COLUMNS = [
+    "id", "name", "description", "activity_category", "location",
+    "organization_id", "start_time", "end_time", "is_deleted", "created_at",
+    "updated_at",
+]
+
+PROD_ACTIVITY_COLUMNS = [
+    "id", "name", "description", "activity_category", "organization_id",
+    "start_time", "end_time", "is_deleted", "created_at", "updated_at",
+]
+
+# 이전 활동 이름 → 새로운 활동 이름 (그 외는 None)
+name_converter = ValueMap({
+    '수요제자기도회': '수요청년예배',
+    '현장치유팀사역': '금요청년예배',
+})
+
+# 이전 activity_instance(+activity) → 새로운 activity
+ACTIVITY_SPEC = TableSpec(
+    name="activity",
+    query=LEGACY_ACTIVITY_QUERY,
+    target="activity",
+    columns=tuple(ACTIVITY_COLUMNS),
+    constants={"activity_category": '예배', "is_deleted": 0},
+    converters={"name": name_converter},
+)
+
+# prod.activity → dev.activity (1:1 복사)
+PROD_ACTIVITY_SPEC = TableSpec(
+    name="activity(prod->dev)",
+    query=PROD_ACTIVITY_QUERY,
+    target="activity",
+    columns=tuple(PROD_ACTIVITY_COLUMNS),
+)
+
+
+def migrate_activity_table(before: DatabaseConnection, after: DatabaseConnection):
+    """
+    이전 activity 테이블 데이터를 새로운 activity 테이블로 마이그레이션합니다.
+    """
+    return migrate_table(before, after, ACTIVITY_SPEC)
+
+
+def migrate_activity_prod_to_dev(prod: DatabaseConnection, dev: DatabaseConnection, incremental: bool = False):
     """
     prod.activity의 모든 데이터를 dev.activity로 마이그레이션.
     - prod/dev 스키마 동일, 필드 1:1 복사
     - dev.organization에 없는 organization_id는 스킵
+    - incremental=True 이면 지난 동기화 이후 updated_at이 바뀐 행만 읽어 upsert(갱신 포함)
+    - prod 대신 RowSource(스냅샷 파일, 팬아웃 분배)를 넘기면 그 소스에서 읽음
     """
     try:
-        # dev 조직 존재 목록 수집
-        dev_org_rows = dev.execute_query("SELECT id FROM organization") or []
-        dev_org_ids = {row['id'] for row in dev_org_rows}
+        # dev 조직 존재 목록 (실행 중 한 번만 로드)
+        dev_org_ids = get_key_index(dev, "organization")
         
-        # 전체 데이터 조회
-        prod_activities = prod.execute_query(
-            """
-            SELECT id, name, description, activity_category, organization_id, start_time, end_time, is_deleted, created_at, updated_at
-            FROM activity
-            ORDER BY id
-            """
-        ) or []
+        query = PROD_ACTIVITY_QUERY
+        delta = None
+        if incremental:
+            delta = plan_delta(prod, dev, "activity", PROD_ACTIVITY_QUERY)
+            query = delta.query
         
-        to_insert: List[Dict[str, Any]] = []
         skipped_no_org = 0
-        for a in prod_activities:
-            if a['organization_id'] not in dev_org_ids:
-                skipped_no_org += 1
-                continue
-            to_insert.append(a)
+        org_position = PROD_ACTIVITY_SPEC.position("organization_id")
+        # 증분 동기화면 적재한 행의 updated_at과 스킵한 행의 키를 모아 워터마크/재확인 목록에 반영합니다.
+        tracker = DeltaTracker(
+            PROD_ACTIVITY_SPEC.position("updated_at"), PROD_ACTIVITY_SPEC.position("id"),
+        ) if delta else None
+        
+        def filter_orphans(batch: List[tuple]) -> List[tuple]:
+            # 변환 스레드에서 실행되며, 스킵 건수는 파이프라인이 끝난 뒤에 읽습니다.
+            nonlocal skipped_no_org
+            has_org = dev_org_ids.contains_many([a[org_position] for a in batch])
+            to_insert = [a for a, ok in zip(batch, has_org) if ok]
+            skipped_no_org += len(batch) - len(to_insert)
+            if tracker:
+                tracker.observe(to_insert, [a for a, ok in zip(batch, has_org) if not ok])
+            return to_insert
         
-        if not to_insert:
+        # 전체 데이터는 PK 페이지 단위로 조회
+        counts = migrate_spec(prod, dev, PROD_ACTIVITY_SPEC, query=query, row_filter=filter_orphans, upsert=incremental)
+        affected_total = counts['affected']
+        inserted_total = counts['inserted']
+        # dev.activity가 바뀌었으므로 attendance 필터링 전에 다시 읽게 합니다.
+        invalidate_key_index(dev, "activity")
+        
+        # 실패한 배치가 있으면 올리지 않고, 스킵한 행은 키만 남겨 다음 동기화에서 그 행만 다시 읽게 합니다.
+        if delta:
+            delta.commit({**counts, **tracker.counts()})
+        
+        if not inserted_total:
             print("ℹ️ 마이그레이션할 activity 데이터가 없습니다.")
             return True
         
-        insert_sql = """
-        INSERT INTO activity (
-            id, name, description, activity_category, organization_id, start_time, end_time, is_deleted, created_at, updated_at
-        ) VALUES (
-            %(id)s, %(name)s, %(description)s, %(activity_category)s, %(organization_id)s, %(start_time)s, %(end_time)s, %(is_deleted)s, %(created_at)s, %(updated_at)s
-        ) ON DUPLICATE KEY UPDATE id=id
-        """
-        total = len(to_insert)
-        affected_total = 0
-        batch_size = 1000
-        processed = 0
-        for batch in chunked(to_insert, batch_size):
-            affected = dev.execute_many(insert_sql, batch) or 0
-            affected_total += affected
-            processed += len(batch)
-            print_progress(processed, total, prefix="activity(prod->dev)")
         print(f"✅ activity 마이그레이션 완료: 삽입/갱신 {affected_total}건, 조직 미존재로 스킵 {skipped_no_org}건")
         return True
     except Exception as e:
         print(f"❌ activity prod->dev 마이그레이션 오류: {e}")
         return False
+
+
+ACTIVITY_TASK = MigrationTask("activity", migrate_activity_table)
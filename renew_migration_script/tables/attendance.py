@@ -1,137 +1,189 @@
 from db import DatabaseConnection
-from utils.progress import chunked, print_progress
+from utils.engine import migrate_spec, report_migration
+from utils.extract import KeysetQuery, RowSource
+from utils.key_index import KeyIndex, get_key_index
+from utils.partition import get_partition_workers, run_partitioned
+from utils.scheduler import MigrationTask
+from utils.spec import Lookup, TableSpec
+from utils.watermark import DeltaTracker, plan_delta
 from typing import List, Dict, Any
-from datetime import datetime
 
-def map_attendance_data(old_attendance: Dict[str, Any]) -> Dict[str, Any]:
+# attendance_status는 JOIN하지 않고 ATTENDANCE_SPEC의 코드 테이블 조회로 이름을 채웁니다. (PK 구간만 읽는 단순 스캔)
+LEGACY_ATTENDANCE_QUERY = KeysetQuery(
+    columns="""
+          id, user_id, activity_instance_id as activity_id, attendance_status_id,
+          created_at, updated_at
+    """,
+    source="attendance",
+    key="id",
+)
+
+PROD_ATTENDANCE_QUERY = KeysetQuery(
+    columns="id, user_id, activity_id, attendance_status, created_at, updated_at",
+    source="attendance",
+    key="id",
+)
+
+ATTENDANCE_COLUMNS = [
+    "id", "user_id", "activity_id", "attendance_status", "created_at",
+    "updated_at",
+]
+
+# 이전 attendance → 새로운 attendance (attendance_status_id → attendance_status.name)
+ATTENDANCE_SPEC = TableSpec(
+    name="attendance",
+    query=LEGACY_ATTENDANCE_QUERY,
+    target="attendance",
+    columns=tuple(ATTENDANCE_COLUMNS),
+    renames={"attendance_status": "attendance_status_id"},
+    lookups={"attendance_status": Lookup("attendance_status", value="name")},
+)
+
+# prod.attendance → dev.attendance (1:1 복사)
+PROD_ATTENDANCE_SPEC = TableSpec(
+    name="attendance(prod->dev)",
+    query=PROD_ATTENDANCE_QUERY,
+    target="attendance",
+    columns=tuple(ATTENDANCE_COLUMNS),
+)
+
+
+def migrate_attendance_range(
+    before: DatabaseConnection,
+    after: DatabaseConnection,
+    start_after: Any = None,
+    end_at: Any = None,
+    show_progress: bool = True,
+) -> Dict[str, int]:
     """
-    이전 image 테이블 데이터를 새로운 image 테이블 구조에 맞게 변환합니다.
+    이전 attendance 테이블의 (start_after, end_at] 키 구간을 새로운 attendance 테이블로 옮깁니다.
+    파티션 워커 프로세스에서도 호출되므로 모듈 최상위 함수로 둡니다.
     """
-    
-    mapped_data = {
-      'id': old_attendance['id'],
-      'user_id': old_attendance['user_id'],
-      'activity_id': old_attendance['activity_id'],
-      'attendance_status': old_attendance['attendance_status'],
-      'created_at': old_attendance['created_at'],
-      'updated_at': old_attendance['updated_at']
-    }
-    
-    return mapped_data
-  
+    return migrate_spec(before, after, ATTENDANCE_SPEC, start_after=start_after, end_at=end_at, show_progress=show_progress)
+
+
 def migrate_attendance_table(before: DatabaseConnection, after: DatabaseConnection):
     """
     이전 attendance 테이블 데이터를 새로운 attendance 테이블로 마이그레이션합니다.
+    PARTITION_WORKERS > 1 이면 키 구간을 나눠 여러 프로세스에서 동시에 옮깁니다.
     """
     try:
-        before_attendance_data = before.execute_query(
-        """
-        SELECT
-          attendance.id as id,
-          attendance.user_id as user_id,
-          attendance.activity_instance_id as activity_id,
-          attendance_status.name as attendance_status,
-          attendance.created_at as created_at,
-          attendance.updated_at as updated_at
-        FROM attendance
-        INNER JOIN attendance_status
-        ON attendance.attendance_status_id = attendance_status.id
-        """
-        )
-        
-        if not before_attendance_data:
-            print("⚠️ 이전 attendance 테이블에 데이터가 없습니다.")
-            return True
-        
-        mapped_attendances = list(map(map_attendance_data, before_attendance_data))
-        
-        insert_query = """
-        INSERT INTO attendance (
-          id, user_id, activity_id, attendance_status, created_at, updated_at
-        ) VALUES (
-          %(id)s, %(user_id)s, %(activity_id)s, %(attendance_status)s, %(created_at)s, %(updated_at)s
-        ) ON DUPLICATE KEY UPDATE id=id
-        """
-        
-        total = len(mapped_attendances)
-        affected_total = 0
-        batch_size = 1000
-        processed = 0
-        for batch in chunked(mapped_attendances, batch_size):
-            affected = after.execute_many(insert_query, batch) or 0
-            affected_total += affected
-            processed += len(batch)
-            print_progress(processed, total, prefix="attendance")
-        
-        if affected_total:
-            print(f"✅ {affected_total}개의 attendance 레코드가 성공적으로 마이그레이션되었습니다.")
-            return True
+        workers = get_partition_workers()
+        if workers > 1:
+            counts = run_partitioned(migrate_attendance_range, before, after, LEGACY_ATTENDANCE_QUERY, workers)
         else:
-            print("영향받은 레코드가 없습니다.")
-            return False
+            counts = migrate_attendance_range(before, after)
+        
+        return report_migration("attendance", counts)
         
     except Exception as e:
         print(f"❌ attendance 테이블 마이그레이션 중 오류 발생: {e}")
         return False
 
 
-def migrate_attendance_prod_to_dev(prod: DatabaseConnection, dev: DatabaseConnection):
+def migrate_attendance_prod_to_dev_range(
+    prod: DatabaseConnection,
+    dev: DatabaseConnection,
+    start_after: Any,
+    end_at: Any,
+    dev_user_ids: KeyIndex,
+    dev_activity_ids: KeyIndex,
+    query: KeysetQuery = PROD_ATTENDANCE_QUERY,
+    upsert: bool = False,
+    show_progress: bool = True,
+) -> Dict[str, Any]:
+    """
+    prod.attendance의 (start_after, end_at] 키 구간을 dev.attendance로 옮깁니다.
+    dev에 없는 user_id / activity_id를 참조하는 행은 스킵하고 건수를 집계합니다.
+    증분 동기화에서는 변경분 조건이 붙은 query와 upsert=True로 호출됩니다.
+    """
+    skipped_no_user = 0
+    skipped_no_activity = 0
+    user_position = PROD_ATTENDANCE_SPEC.position("user_id")
+    activity_position = PROD_ATTENDANCE_SPEC.position("activity_id")
+    # 증분 동기화(upsert)면 적재한 행의 updated_at과 스킵한 행의 키를 모아 워터마크/재확인 목록에 반영합니다.
+    tracker = DeltaTracker(
+        PROD_ATTENDANCE_SPEC.position("updated_at"), PROD_ATTENDANCE_SPEC.position("id"),
+    ) if upsert else None
+    
+    def filter_orphans(batch: List[tuple]) -> List[tuple]:
+        # 변환 스레드에서 실행되며, 스킵 건수는 파이프라인이 끝난 뒤에 읽습니다.
+        nonlocal skipped_no_user, skipped_no_activity
+        has_user = dev_user_ids.contains_many([r[user_position] for r in batch])
+        has_activity = dev_activity_ids.contains_many([r[activity_position] for r in batch])
+        to_insert: List[tuple] = []
+        skipped: List[tuple] = []
+        for r, user_ok, activity_ok in zip(batch, has_user, has_activity):
+            if not user_ok:
+                skipped_no_user += 1
+                skipped.append(r)
+            elif not activity_ok:
+                skipped_no_activity += 1
+                skipped.append(r)
+            else:
+                to_insert.append(r)
+        if tracker:
+            tracker.observe(to_insert, skipped)
+        return to_insert
+    
+    counts = migrate_spec(
+        prod, dev, PROD_ATTENDANCE_SPEC, query=query, row_filter=filter_orphans, upsert=upsert,
+        start_after=start_after, end_at=end_at, show_progress=show_progress,
+    )
+    counts['skipped_no_user'] = skipped_no_user
+    counts['skipped_no_activity'] = skipped_no_activity
+    if tracker:
+        counts.update(tracker.counts())
+    return counts
+
+
+def migrate_attendance_prod_to_dev(prod: DatabaseConnection, dev: DatabaseConnection, incremental: bool = False):
     """
     prod.attendance의 모든 데이터를 dev.attendance로 마이그레이션.
     - prod/dev 스키마 동일, 필드 1:1 복사
     - dev.user에 없는 user_id는 스킵
     - dev.activity에 없는 activity_id는 스킵 (activity 스킵 시 해당 attendance도 모두 스킵)
+    - PARTITION_WORKERS > 1 이면 키 구간을 나눠 여러 프로세스에서 동시에 옮김
+    - incremental=True 이면 지난 동기화 이후 updated_at이 바뀐 행만 읽어 upsert(갱신 포함)
+    - prod 대신 RowSource(스냅샷 파일, 팬아웃 분배)를 넘기면 그 소스에서 읽음
     """
     try:
-        dev_user_rows = dev.execute_query("SELECT id FROM user") or []
-        dev_user_ids = {row['id'] for row in dev_user_rows}
+        # dev 키 목록은 실행 중 한 번만 로드하고, 파티션 워커에는 압축된 형태 그대로 전달
+        dev_user_ids = get_key_index(dev, "user")
+        dev_activity_ids = get_key_index(dev, "activity")
         
-        dev_activity_rows = dev.execute_query("SELECT id FROM activity") or []
-        dev_activity_ids = {row['id'] for row in dev_activity_rows}
+        query = PROD_ATTENDANCE_QUERY
+        delta = None
+        if incremental:
+            delta = plan_delta(prod, dev, "attendance", PROD_ATTENDANCE_QUERY)
+            query = delta.query
         
-        prod_attendances = prod.execute_query(
-            """
-            SELECT id, user_id, activity_id, attendance_status, created_at, updated_at
-            FROM attendance
-            ORDER BY id
-            """
-        ) or []
+        # 스냅샷/팬아웃 소스는 워커 프로세스에서 다시 열 수 없으므로 한 프로세스에서 읽습니다.
+        workers = get_partition_workers() if not isinstance(prod, RowSource) else 1
+        if workers > 1:
+            counts = run_partitioned(
+                migrate_attendance_prod_to_dev_range, prod, dev, query, workers,
+                dev_user_ids, dev_activity_ids, query, incremental,
+            )
+        else:
+            counts = migrate_attendance_prod_to_dev_range(
+                prod, dev, None, None, dev_user_ids, dev_activity_ids, query, incremental,
+            )
         
-        to_insert: List[Dict[str, Any]] = []
-        skipped_no_user = 0
-        skipped_no_activity = 0
-        for r in prod_attendances:
-            if r['user_id'] not in dev_user_ids:
-                skipped_no_user += 1
-                continue
-            if r['activity_id'] not in dev_activity_ids:
-                skipped_no_activity += 1
-                continue
-            to_insert.append(r)
+        # 실패한 배치가 있으면 올리지 않고, 스킵한 행은 키만 남겨 다음 동기화에서 그 행만 다시 읽게 합니다.
+        if delta:
+            delta.commit(counts)
         
-        if not to_insert:
+        if not counts.get('inserted'):
             print("ℹ️ 마이그레이션할 attendance 데이터가 없습니다.")
             return True
         
-        insert_sql = """
-        INSERT INTO attendance (
-            id, user_id, activity_id, attendance_status, created_at, updated_at
-        ) VALUES (
-            %(id)s, %(user_id)s, %(activity_id)s, %(attendance_status)s, %(created_at)s, %(updated_at)s
-        ) ON DUPLICATE KEY UPDATE id=id
-        """
-        total = len(to_insert)
-        affected_total = 0
-        batch_size = 1000
-        processed = 0
-        for batch in chunked(to_insert, batch_size):
-            affected = dev.execute_many(insert_sql, batch) or 0
-            affected_total += affected
-            processed += len(batch)
-            print_progress(processed, total, prefix="attendance(prod->dev)")
-        print(f"✅ attendance 마이그레이션 완료: 삽입/갱신 {affected_total}건, 사용자 미존재 스킵 {skipped_no_user}건, 활동 미존재 스킵 {skipped_no_activity}건")
+        print(f"✅ attendance 마이그레이션 완료: 삽입/갱신 {counts.get('affected', 0)}건, 사용자 미존재 스킵 {counts.get('skipped_no_user', 0)}건, 활동 미존재 스킵 {counts.get('skipped_no_activity', 0)}건")
         return True
     except Exception as e:
         print(f"❌ attendance prod->dev 마이그레이션 오류: {e}")
         return False
-        
\ No newline at end of file
+
+
+# attendance.user_id → user, attendance.activity_id → activity
+ATTENDANCE_TASK = MigrationTask("attendance", migrate_attendance_table, depends_on=("user", "activity"))
@@ -1,4 +1,5 @@
 from db import DatabaseConnection
+from utils.scheduler import MigrationTask
 from typing import List, Dict, Any
 from datetime import datetime
 
@@ -13,3 +14,6 @@ def test(before: DatabaseConnection, after: DatabaseConnection):
     print(f"❌ 테스트 실패: {e}")
     return False
   return True
+
+
+TEST_TASK = MigrationTask("test", test)
@@ -0,0 +1,99 @@
+import os
+import threading
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 측정값 지수 이동 평균 가중치 (최근 배치 반영 비율)
+_SMOOTHING = 0.3
+
+# 한 번에 바꿀 수 있는 배치 크기 배율 (급격한 진동 방지)
+_MAX_STEP = 2.0
+
+
+class AdaptiveBatchSizer:
+    """배치 적재 시간이 목표 시간에 수렴하도록 배치 크기를 조절합니다.
+
+    - 쓰기 단계가 배치마다 observe(행 수, 전송 바이트, 소요 시간)를 알려주면
+      행당 시간/바이트의 이동 평균으로 다음 배치 크기를 계산합니다.
+    - 목표 크기 = target_seconds / 행당 시간, 단 한 배치가 max_batch_bytes(패킷 한도)를
+      넘지 않도록 제한하고, 한 번에 최대 2배까지만 늘리거나 줄입니다.
+    - 읽기 스레드는 batches()로 매번 현재 크기만큼 잘라 갑니다.
+    """
+
+    def __init__(
+        self,
+        initial: int = 1000,
+        target_seconds: float = 0.5,
+        min_size: int = 100,
+        max_size: int = 20000,
+        max_batch_bytes: Optional[int] = None,
+        enabled: bool = True,
+    ):
+        self.initial = initial
+        self.target_seconds = target_seconds
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_batch_bytes = max_batch_bytes
+        self.enabled = enabled
+        self._size = initial
+        self._seconds_per_row: Optional[float] = None
+        self._bytes_per_row: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def batches(self, rows: Iterable[T]) -> Iterator[List[T]]:
+        """이터러블을 현재 배치 크기만큼씩 잘라 반환합니다."""
+        iterator = iter(rows)
+        while True:
+            batch = list(islice(iterator, self._size))
+            if not batch:
+                return
+            yield batch
+
+    def observe(self, rows: int, bytes_sent: int, seconds: float) -> None:
+        """한 배치의 적재 결과를 반영해 다음 배치 크기를 조정합니다."""
+        if not self.enabled or rows <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            self._seconds_per_row = _ewma(self._seconds_per_row, seconds / rows)
+            if bytes_sent:
+                self._bytes_per_row = _ewma(self._bytes_per_row, bytes_sent / rows)
+
+            ideal = self.target_seconds / self._seconds_per_row
+            if self.max_batch_bytes and self._bytes_per_row:
+                ideal = min(ideal, self.max_batch_bytes / self._bytes_per_row)
+            ideal = min(max(ideal, self._size / _MAX_STEP), self._size * _MAX_STEP)
+            self._size = int(min(max(ideal, self.min_size), self.max_size))
+
+    def describe(self) -> str:
+        """조정 결과 요약 문자열."""
+        if not self.enabled:
+            return f"배치 크기 {self._size} (고정)"
+        return f"배치 크기 {self.initial} → {self._size} (목표 {self.target_seconds}초/배치)"
+
+
+def _ewma(previous: Optional[float], value: float) -> float:
+    return value if previous is None else previous + _SMOOTHING * (value - previous)
+
+
+def create_batch_sizer(max_batch_bytes: Optional[int] = None) -> AdaptiveBatchSizer:
+    """환경 변수로 배치 크기 조절기를 만듭니다.
+
+    - BATCH_SIZE: 시작 배치 크기 (기본 1000)
+    - BATCH_ADAPTIVE: 0이면 BATCH_SIZE로 고정 (기본 1)
+    - BATCH_TARGET_SECONDS: 배치 하나의 목표 적재 시간 (기본 0.5)
+    - BATCH_MIN_SIZE / BATCH_MAX_SIZE: 배치 크기 범위 (기본 100 / 20000)
+    """
+    return AdaptiveBatchSizer(
+        initial=int(os.getenv("BATCH_SIZE", 1000)),
+        target_seconds=float(os.getenv("BATCH_TARGET_SECONDS", 0.5)),
+        min_size=int(os.getenv("BATCH_MIN_SIZE", 100)),
+        max_size=int(os.getenv("BATCH_MAX_SIZE", 20000)),
+        max_batch_bytes=max_batch_bytes,
+        enabled=os.getenv("BATCH_ADAPTIVE", "1") != "0",
+    )
@@ -0,0 +1,242 @@
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from db import DatabaseConnection
+
+# 문자열 값 중 커넥터가 백슬래시로 이스케이프하는 문자
+_ESCAPED_CHARS = ("\\", "'", '"', "\n", "\r", "\x00", "\x1a")
+
+# max_allowed_packet 중 실제로 사용할 비율 (값 크기 추정 오차 여유분)
+DEFAULT_PACKET_RATIO = 0.9
+
+# prepared statement 한 문장에 넣을 수 있는 최대 파라미터 수 (MySQL 제한)
+MAX_PREPARED_PARAMS = 65535
+
+
+@dataclass
+class InsertStats:
+    """multi-row INSERT 실행 결과.
+
+    Attributes:
+        rows: 전송한 행 수.
+        statements: 실행한 INSERT 문 수(= 왕복 횟수).
+        bytes_sent: 서버로 전송한 SQL 바이트 수.
+        affected: 영향받은 행 수(실패 시 None).
+        commit_seconds: 전송 시간 중 커밋에 걸린 시간(초).
+        committed_rows: 이번 호출에서 커밋된 행 수(묶음 커밋이면 앞선 배치 포함).
+    """
+
+    rows: int = 0
+    statements: int = 0
+    bytes_sent: int = 0
+    affected: Optional[int] = 0
+    commit_seconds: float = 0.0
+    committed_rows: int = 0
+
+
+def _estimate_value_size(value: Any) -> int:
+    """내부: 값 하나가 SQL 리터럴로 변환됐을 때의 바이트 수를 추정합니다."""
+    if value is None:
+        return 4
+    if isinstance(value, str):
+        escapes = sum(value.count(ch) for ch in _ESCAPED_CHARS)
+        return len(value.encode("utf-8")) + escapes + 2
+    if isinstance(value, (bytes, bytearray)):
+        return len(value) * 2 + 2
+    if isinstance(value, (datetime, date)):
+        return 28
+    return len(str(value)) + 2
+
+
+def upsert_clause(columns: Sequence[str], key: str = "id") -> str:
+    """키 충돌 시 나머지 컬럼을 새 값으로 덮어쓰는 ON DUPLICATE KEY UPDATE 절을 만듭니다."""
+    return ", ".join(f"{column}=VALUES({column})" for column in columns if column != key)
+
+
+class MultiRowInserter:
+    """행들을 max_allowed_packet 크기에 맞춘 multi-row INSERT 문으로 묶어 전송합니다.
+
+    executemany + dict 파라미터 대신 `INSERT ... VALUES (...), (...), ...` 문을 직접 만들어
+    배치당 왕복 횟수를 명시적으로 제어하고, 배치별 문장 수/전송 바이트를 집계합니다.
+
+    커밋은 commit_batches개 배치 또는 commit_seconds초마다 한 번 묶어서 합니다.
+    (commit_batches=1: 배치마다, 0: finish에서 한 번 = 테이블/파티션당 트랜잭션 하나)
+    묶는 동안 배치마다 SAVEPOINT를 두므로 실패한 배치만 되돌아갑니다.
+
+    연결의 전송 프로필이 prepared면 배치를 PREPARED_STATEMENT_ROWS행(기본 500)씩 같은 모양의 문장으로
+    나눠 한 번 준비한 INSERT를 반복 실행하고, 크기가 다른 나머지 행만 텍스트 프로토콜로 보냅니다.
+    """
+
+    def __init__(
+        self,
+        conn: DatabaseConnection,
+        table: str,
+        columns: Sequence[str],
+        on_duplicate: Optional[str] = "id=id",
+        packet_ratio: float = DEFAULT_PACKET_RATIO,
+        commit_batches: int = 1,
+        commit_seconds: float = 0.0,
+    ):
+        self.conn = conn
+        self.table = table
+        self.columns = list(columns)
+        self.on_duplicate = on_duplicate
+        self.max_statement_bytes = int(conn.get_max_allowed_packet() * packet_ratio)
+        self.commit_batches = commit_batches
+        self.commit_seconds = commit_seconds
+        self.commits = 0
+
+        self._prefix = f"INSERT INTO {table} ({', '.join(self.columns)}) VALUES "
+        self._row_placeholder = "(" + ", ".join(["%s"] * len(self.columns)) + ")"
+        self._suffix = f" ON DUPLICATE KEY UPDATE {on_duplicate}" if on_duplicate else ""
+        self._fixed_bytes = len(self._prefix.encode("utf-8")) + len(self._suffix.encode("utf-8"))
+
+        # prepared: 고정 행 수 문장 하나만 준비해 재사용합니다.
+        self.statement_rows = 0
+        self._prepared_sql: Optional[str] = None
+        if conn.transport.prepared:
+            rows = int(os.getenv("PREPARED_STATEMENT_ROWS", 500))
+            self.statement_rows = max(1, min(rows, MAX_PREPARED_PARAMS // len(self.columns)))
+            self._prepared_sql = self._render(self.statement_rows, [])[0]
+
+        self.totals = InsertStats()
+
+        # 묶음 커밋 대기 상태 (아직 커밋되지 않은 배치)
+        self._pending_rows = 0
+        self._pending_batches = 0
+        self._pending_affected = 0
+        self._last_commit = time.monotonic()
+
+    @property
+    def grouped(self) -> bool:
+        """배치마다 커밋하지 않고 묶어서 커밋하는지 여부."""
+        return self.commit_batches != 1 or self.commit_seconds > 0
+
+    def build_statements(self, rows: List[Sequence[Any]]) -> List[Tuple[str, List[Any]]]:
+        """행 목록을 패킷 한도 안에 들어가는 (SQL, 파라미터) 목록으로 묶습니다.
+
+        각 행은 columns 순서의 값 tuple입니다. (TableSpec.compile 결과)
+
+        한 행이 한도를 넘더라도 단독 문장으로 보내 서버가 오류를 판단하게 합니다.
+        prepared 프로필이면 statement_rows행씩 먼저 나눈 뒤 각 묶음을 같은 방식으로 묶습니다.
+        """
+        if self.statement_rows:
+            statements: List[Tuple[str, List[Any]]] = []
+            for start in range(0, len(rows), self.statement_rows):
+                statements.extend(self._build_by_bytes(rows[start:start + self.statement_rows]))
+            return statements
+        return self._build_by_bytes(rows)
+
+    def _build_by_bytes(self, rows: List[Sequence[Any]]) -> List[Tuple[str, List[Any]]]:
+        """내부: 패킷 한도를 넘지 않게 행을 순서대로 채워 문장을 나눕니다."""
+        statements: List[Tuple[str, List[Any]]] = []
+        params: List[Any] = []
+        row_count = 0
+        statement_bytes = self._fixed_bytes
+
+        row_overhead = 2 * len(self.columns) + 2
+        for row in rows:
+            # 값 + 구분자(", ") + 괄호
+            row_bytes = sum(map(_estimate_value_size, row)) + row_overhead
+            if row_count and statement_bytes + row_bytes > self.max_statement_bytes:
+                statements.append(self._render(row_count, params))
+                params = []
+                row_count = 0
+                statement_bytes = self._fixed_bytes
+            params.extend(row)
+            row_count += 1
+            statement_bytes += row_bytes
+
+        if row_count:
+            statements.append(self._render(row_count, params))
+        return statements
+
+    def _render(self, row_count: int, params: List[Any]) -> Tuple[str, List[Any]]:
+        values_sql = ", ".join([self._row_placeholder] * row_count)
+        return f"{self._prefix}{values_sql}{self._suffix}", params
+
+    def write(self, rows: List[Sequence[Any]]) -> InsertStats:
+        """한 배치를 multi-row INSERT 문들로 전송하고 커밋 정책에 맞춰 커밋합니다.
+
+        Returns:
+            배치 실행 결과(InsertStats). 실패 시 affected는 None이며 이 배치만 롤백됩니다.
+            묶음 커밋이면 affected는 이번에 커밋된 묶음 전체의 영향 행 수(커밋 전이면 0)입니다.
+        """
+        statements = self.build_statements(rows)
+        affected, bytes_sent = self.conn.execute_statements(
+            statements, commit=not self.grouped, prepared=self._prepared_sql,
+        )
+        stats = InsertStats(rows=len(rows), statements=len(statements), bytes_sent=bytes_sent, affected=affected)
+        self.totals.rows += stats.rows
+        self.totals.statements += stats.statements
+        self.totals.bytes_sent += stats.bytes_sent
+        if affected is None:
+            return stats
+
+        if not self.grouped:
+            stats.commit_seconds = self.conn.last_commit_seconds
+            stats.committed_rows = len(rows)
+            self.commits += 1
+            self.totals.affected += affected
+            return stats
+
+        self._pending_rows += len(rows)
+        self._pending_batches += 1
+        self._pending_affected += affected
+        stats.affected = 0
+        if self._commit_due():
+            committed = self._commit_pending()
+            stats.affected = committed.affected
+            stats.commit_seconds = committed.commit_seconds
+            stats.committed_rows = committed.committed_rows
+        return stats
+
+    def _commit_due(self) -> bool:
+        if self.commit_batches > 0 and self._pending_batches >= self.commit_batches:
+            return True
+        return self.commit_seconds > 0 and time.monotonic() - self._last_commit >= self.commit_seconds
+
+    def _commit_pending(self) -> InsertStats:
+        """내부: 쌓인 배치를 커밋합니다. 실패하면 묶음 전체가 롤백되므로 affected=None."""
+        stats = InsertStats(committed_rows=self._pending_rows)
+        if self.conn.commit():
+            stats.affected = self._pending_affected
+            stats.commit_seconds = self.conn.last_commit_seconds
+            self.commits += 1
+            self.totals.affected += self._pending_affected
+        else:
+            print(f"❌ {self.table}: 배치 {self._pending_batches}개({self._pending_rows}행) 묶음 커밋 실패")
+            stats.affected = None
+            stats.committed_rows = 0
+        self._pending_rows = 0
+        self._pending_batches = 0
+        self._pending_affected = 0
+        self._last_commit = time.monotonic()
+        return stats
+
+    @property
+    def batch_bytes_limit(self) -> Optional[int]:
+        """배치 하나를 INSERT 문 하나로 보낼 수 있는 최대 바이트 수(배치 크기 조절용)."""
+        return self.max_statement_bytes
+
+    @property
+    def pending_rows(self) -> int:
+        """전송했지만 아직 커밋되지 않은 행 수. (배치마다 커밋하면 항상 0)"""
+        return self._pending_rows
+
+    def finish(self) -> InsertStats:
+        """커밋을 기다리는 배치가 있으면 커밋합니다."""
+        if not self._pending_batches:
+            return InsertStats()
+        return self._commit_pending()
+
+    def print_report(self, prefix: str) -> None:
+        """누적 전송 통계를 출력합니다."""
+        megabytes = self.totals.bytes_sent / (1024 * 1024)
+        print(
+            f"📦 {prefix}: {self.totals.rows}행 → INSERT 문 {self.totals.statements}개, "
+            f"커밋 {self.commits}회, 전송 {megabytes:.2f}MB"
+        )
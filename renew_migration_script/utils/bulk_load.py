@@ -0,0 +1,160 @@
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Union
+
+from db import DatabaseConnection
+from utils.bulk_insert import InsertStats, MultiRowInserter, upsert_clause
+
+# LOAD DATA 기본 이스케이프 규칙(ESCAPED BY '\\')에 맞춘 변환표
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r", "\x00": "\\0"})
+
+# 스풀 파일 하나에 담을 최대 행 수 (디스크 사용량/트랜잭션 크기 제한)
+DEFAULT_ROWS_PER_FILE = 200_000
+
+
+def _to_tsv_field(value: Any) -> bytes:
+    """내부: 값 하나를 LOAD DATA용 TSV 필드 바이트로 변환합니다."""
+    if value is None:
+        return b"\\N"
+    if isinstance(value, bool):
+        return b"1" if value else b"0"
+    if isinstance(value, (bytes, bytearray)):
+        return (
+            bytes(value)
+            .replace(b"\\", b"\\\\")
+            .replace(b"\t", b"\\t")
+            .replace(b"\n", b"\\n")
+            .replace(b"\r", b"\\r")
+            .replace(b"\x00", b"\\0")
+        )
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ").encode("ascii")
+    if isinstance(value, date):
+        return value.isoformat().encode("ascii")
+    return str(value).translate(_TSV_ESCAPES).encode("utf-8")
+
+
+class InfileLoader:
+    """변환된 행을 로컬 TSV 스풀 파일에 쓰고 LOAD DATA LOCAL INFILE로 적재합니다.
+
+    MultiRowInserter와 같은 write/finish/print_report 인터페이스를 가지므로
+    마이그레이션 루프에서 그대로 바꿔 쓸 수 있습니다.
+    스풀 파일 하나가 트랜잭션 하나이므로 커밋 묶음 크기는 rows_per_file로 정해집니다.
+    중복 PK는 IGNORE로 건너뛰어 기존 `ON DUPLICATE KEY UPDATE id=id` 동작과 같습니다.
+    """
+
+    def __init__(
+        self,
+        conn: DatabaseConnection,
+        table: str,
+        columns: Sequence[str],
+        rows_per_file: int = DEFAULT_ROWS_PER_FILE,
+        spool_dir: Optional[str] = None,
+    ):
+        self.conn = conn
+        self.table = table
+        self.columns = list(columns)
+        self.rows_per_file = rows_per_file
+        self.spool_dir = spool_dir or os.getenv("SPOOL_DIR") or None
+        self.files_loaded = 0
+        self.totals = InsertStats()
+
+        self._spool = None
+        self._spool_rows = 0
+
+    def _open_spool(self) -> None:
+        self._spool = tempfile.NamedTemporaryFile(
+            mode="wb", prefix=f"{self.table}_", suffix=".tsv", dir=self.spool_dir, delete=False
+        )
+        self._spool_rows = 0
+
+    def _load_spool(self) -> InsertStats:
+        """내부: 현재 스풀 파일을 적재하고 삭제합니다."""
+        path = self._spool.name
+        self._spool.close()
+        self._spool = None
+        try:
+            stats = InsertStats(rows=self._spool_rows, statements=1, bytes_sent=os.path.getsize(path))
+            stats.affected = self.conn.execute_load_data(path, self.table, self.columns)
+            if stats.affected is not None:
+                stats.commit_seconds = self.conn.last_commit_seconds
+                stats.committed_rows = stats.rows
+        finally:
+            os.remove(path)
+
+        self.files_loaded += 1
+        self.totals.statements += stats.statements
+        self.totals.bytes_sent += stats.bytes_sent
+        self.totals.affected += stats.affected or 0
+        return stats
+
+    def write(self, rows: List[Sequence[Any]]) -> InsertStats:
+        """columns 순서의 값 tuple 행들을 스풀 파일에 기록합니다. 파일이 가득 차면 그 자리에서 적재합니다.
+
+        Returns:
+            이번 호출에서 서버로 적재한 결과(적재가 없었다면 affected=0).
+        """
+        if self._spool is None:
+            self._open_spool()
+        write_line = self._spool.write
+        for row in rows:
+            write_line(b"\t".join(map(_to_tsv_field, row)) + b"\n")
+        self._spool_rows += len(rows)
+        self.totals.rows += len(rows)
+
+        if self._spool_rows >= self.rows_per_file:
+            return self._load_spool()
+        return InsertStats()
+
+    @property
+    def batch_bytes_limit(self) -> Optional[int]:
+        """스풀 파일로 모아 보내므로 배치 크기에 패킷 제한이 없습니다."""
+        return None
+
+    @property
+    def pending_rows(self) -> int:
+        """스풀 파일에 쌓여 아직 적재되지 않은 행 수."""
+        return self._spool_rows if self._spool is not None else 0
+
+    def finish(self) -> InsertStats:
+        """남아 있는 스풀 파일을 적재합니다."""
+        if self._spool is None:
+            return InsertStats()
+        if not self._spool_rows:
+            self._spool.close()
+            os.remove(self._spool.name)
+            self._spool = None
+            return InsertStats()
+        return self._load_spool()
+
+    def print_report(self, prefix: str) -> None:
+        """누적 적재 통계를 출력합니다."""
+        megabytes = self.totals.bytes_sent / (1024 * 1024)
+        print(f"📦 {prefix}: {self.totals.rows}행 → LOAD DATA 파일 {self.files_loaded}개, 전송 {megabytes:.2f}MB")
+
+
+TableWriter = Union[MultiRowInserter, InfileLoader]
+
+
+def create_table_writer(conn: DatabaseConnection, table: str, columns: Sequence[str], upsert: bool = False) -> TableWriter:
+    """LOAD_MODE 환경 변수에 맞는 적재기를 생성합니다.
+
+    - LOAD_MODE=insert (기본): multi-row INSERT
+    - LOAD_MODE=infile: LOAD DATA LOCAL INFILE. 서버의 local_infile이 꺼져 있으면 INSERT로 대체합니다.
+    - upsert=True: 이미 있는 행도 새 값으로 갱신합니다. (LOAD DATA는 IGNORE만 지원하므로 항상 INSERT)
+    - COMMIT_BATCHES / COMMIT_SECONDS: INSERT 방식의 커밋 묶음 (기본 1 / 0 = 배치마다 커밋).
+      COMMIT_BATCHES=0 이면 테이블(파티션 워커는 자기 구간)당 트랜잭션 하나로 적재합니다.
+    """
+    commit_batches = int(os.getenv("COMMIT_BATCHES", 1))
+    commit_seconds = float(os.getenv("COMMIT_SECONDS", 0))
+    if upsert:
+        return MultiRowInserter(
+            conn, table, columns, on_duplicate=upsert_clause(columns),
+            commit_batches=commit_batches, commit_seconds=commit_seconds,
+        )
+    if os.getenv("LOAD_MODE", "insert") == "infile":
+        if conn.supports_local_infile():
+            return InfileLoader(conn, table, columns)
+        print(f"⚠️ {conn.database} 서버에서 local_infile이 비활성화되어 {table} 테이블은 INSERT 방식으로 적재합니다.")
+    return MultiRowInserter(conn, table, columns, commit_batches=commit_batches, commit_seconds=commit_seconds)
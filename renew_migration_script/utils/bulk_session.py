@@ -0,0 +1,179 @@
+from contextlib import contextmanager
+from itertools import groupby
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from db import ConnectionPool, DatabaseConnection
+
+# 인덱스 정의 조회 (PRIMARY 제외)
+_INDEX_SQL = """
+    SELECT INDEX_NAME AS index_name, NON_UNIQUE AS non_unique, SEQ_IN_INDEX AS seq,
+           COLUMN_NAME AS column_name, SUB_PART AS sub_part, INDEX_TYPE AS index_type
+    FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME <> 'PRIMARY'
+    ORDER BY INDEX_NAME, SEQ_IN_INDEX
+"""
+
+# FK 정의 조회
+_FOREIGN_KEY_SQL = """
+    SELECT CONSTRAINT_NAME AS name, COLUMN_NAME AS column_name,
+           REFERENCED_TABLE_NAME AS ref_table, REFERENCED_COLUMN_NAME AS ref_column
+    FROM information_schema.KEY_COLUMN_USAGE
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND REFERENCED_TABLE_NAME IS NOT NULL
+    ORDER BY CONSTRAINT_NAME, ORDINAL_POSITION
+"""
+
+# 테이블별로 삭제했다가 다시 만들 인덱스: {table: [(index_name, index_columns_sql), ...]}
+DroppedIndexes = Dict[str, List[Tuple[str, str]]]
+
+
+def _indexes(conn: DatabaseConnection, table: str) -> List[dict]:
+    """내부: 보조 인덱스 목록 [{'name', 'unique', 'type', 'columns': [(column, sub_part)]}]."""
+    rows = conn.execute_query(_INDEX_SQL, (table,)) or []
+    indexes = []
+    for name, parts in groupby(rows, key=lambda row: row["index_name"]):
+        parts = list(parts)
+        indexes.append({
+            "name": name,
+            "unique": not parts[0]["non_unique"],
+            "type": parts[0]["index_type"],
+            "columns": [(part["column_name"], part["sub_part"]) for part in parts],
+        })
+    return indexes
+
+
+def _foreign_keys(conn: DatabaseConnection, table: str) -> List[dict]:
+    """내부: FK 목록 [{'name', 'columns', 'ref_table', 'ref_columns'}]."""
+    rows = conn.execute_query(_FOREIGN_KEY_SQL, (table,)) or []
+    foreign_keys = []
+    for name, parts in groupby(rows, key=lambda row: row["name"]):
+        parts = list(parts)
+        foreign_keys.append({
+            "name": name,
+            "columns": [part["column_name"] for part in parts],
+            "ref_table": parts[0]["ref_table"],
+            "ref_columns": [part["ref_column"] for part in parts],
+        })
+    return foreign_keys
+
+
+def _index_columns_sql(columns: Sequence[Tuple[str, int]]) -> str:
+    return ", ".join(f"`{column}`({sub_part})" if sub_part else f"`{column}`" for column, sub_part in columns)
+
+
+def drop_secondary_indexes(conn: DatabaseConnection, tables: Sequence[str]) -> DroppedIndexes:
+    """적재 전에 다시 만들 수 있는 보조 인덱스를 삭제하고 그 정의를 반환합니다.
+
+    UNIQUE 인덱스(중복 데이터가 있으면 재생성이 실패), FK가 사용하는 인덱스,
+    FULLTEXT/SPATIAL 인덱스는 그대로 둡니다.
+    """
+    dropped: DroppedIndexes = {}
+    for table in tables:
+        fk_columns = {fk["columns"][0] for fk in _foreign_keys(conn, table)}
+        candidates = [
+            (index["name"], _index_columns_sql(index["columns"]))
+            for index in _indexes(conn, table)
+            if not index["unique"] and index["type"] == "BTREE" and index["columns"][0][0] not in fk_columns
+        ]
+        if not candidates:
+            continue
+        drop_sql = ", ".join(f"DROP INDEX `{name}`" for name, _ in candidates)
+        if conn.execute_command(f"ALTER TABLE `{table}` {drop_sql}"):
+            dropped[table] = candidates
+            print(f"🗑️ {table}: 보조 인덱스 {len(candidates)}개 삭제 ({', '.join(name for name, _ in candidates)})")
+    # 중간에 프로세스가 죽어도 수동으로 복구할 수 있도록 재생성 DDL을 남깁니다.
+    for table, indexes in dropped.items():
+        print(f"   ↩️ 복구 DDL: {_rebuild_sql(table, indexes)};")
+    return dropped
+
+
+def _rebuild_sql(table: str, indexes: List[Tuple[str, str]]) -> str:
+    add_sql = ", ".join(f"ADD INDEX `{name}` ({columns})" for name, columns in indexes)
+    return f"ALTER TABLE `{table}` {add_sql}"
+
+
+def rebuild_indexes(conn: DatabaseConnection, dropped: DroppedIndexes) -> bool:
+    """삭제했던 인덱스를 테이블마다 ALTER 한 번으로 다시 만듭니다."""
+    success = True
+    for table, indexes in dropped.items():
+        if conn.execute_command(_rebuild_sql(table, indexes)):
+            print(f"🔧 {table}: 보조 인덱스 {len(indexes)}개 재생성")
+        else:
+            success = False
+            print(f"❌ {table}: 인덱스 재생성 실패. 복구 DDL: {_rebuild_sql(table, indexes)};")
+    return success
+
+
+def analyze_tables(conn: DatabaseConnection, tables: Sequence[str]) -> None:
+    """적재 후 옵티마이저 통계를 갱신합니다."""
+    if tables:
+        conn.execute_query(f"ANALYZE TABLE {', '.join(f'`{table}`' for table in tables)}")
+        print(f"📈 ANALYZE TABLE 완료: {', '.join(tables)}")
+
+
+def check_integrity(conn: DatabaseConnection, tables: Sequence[str]) -> List[Tuple[str, int]]:
+    """FK/UNIQUE 검사를 끄고 적재한 테이블을 일괄 점검합니다.
+
+    Returns:
+        [(점검 항목, 위반 행 수)] - FK 고아 행 수와 UNIQUE 중복 그룹 수.
+    """
+    results: List[Tuple[str, int]] = []
+    for table in tables:
+        for fk in _foreign_keys(conn, table):
+            join_on = " AND ".join(f"p.`{ref}` = c.`{col}`" for col, ref in zip(fk["columns"], fk["ref_columns"]))
+            not_null = " AND ".join(f"c.`{col}` IS NOT NULL" for col in fk["columns"])
+            result = conn.execute_query(
+                f"SELECT COUNT(*) AS cnt FROM `{table}` c LEFT JOIN `{fk['ref_table']}` p ON {join_on} "
+                f"WHERE {not_null} AND p.`{fk['ref_columns'][0]}` IS NULL"
+            )
+            label = f"{table}.{','.join(fk['columns'])} → {fk['ref_table']}.{','.join(fk['ref_columns'])}"
+            results.append((label, result[0]["cnt"] if result else -1))
+
+        for index in _indexes(conn, table):
+            if not index["unique"]:
+                continue
+            columns = [column for column, _ in index["columns"]]
+            group_by = ", ".join(f"`{column}`" for column in columns)
+            not_null = " AND ".join(f"`{column}` IS NOT NULL" for column in columns)
+            result = conn.execute_query(
+                f"SELECT COUNT(*) AS cnt FROM (SELECT 1 FROM `{table}` WHERE {not_null} "
+                f"GROUP BY {group_by} HAVING COUNT(*) > 1) AS duplicated"
+            )
+            results.append((f"{table} UNIQUE {index['name']}({', '.join(columns)})", result[0]["cnt"] if result else -1))
+    return results
+
+
+def print_integrity_report(results: List[Tuple[str, int]]) -> bool:
+    """무결성 점검 결과를 출력하고 위반이 없으면 True를 반환합니다."""
+    print("\n🔍 적재 후 무결성 점검:")
+    ok = True
+    for label, violations in results:
+        if violations == 0:
+            print(f"  ✅ {label}")
+        else:
+            ok = False
+            detail = "점검 실패" if violations < 0 else f"위반 {violations}건"
+            print(f"  ❌ {label}: {detail}")
+    if not results:
+        print("  (점검할 FK/UNIQUE 제약이 없습니다)")
+    return ok
+
+
+@contextmanager
+def bulk_load_tables(pool: ConnectionPool, tables: Sequence[str], drop_indexes: bool = False) -> Iterator[None]:
+    """with 블록 동안 tables를 대량 적재 모드로 다룹니다.
+
+    - 들어갈 때: (선택) 보조 인덱스 삭제
+    - 나올 때(실패해도): 인덱스 재생성 → ANALYZE TABLE → FK/UNIQUE 일괄 점검 리포트
+    FK/UNIQUE 검사 해제는 세션 설정이므로 pool을 bulk_load=True로 만들어 적용합니다.
+    """
+    dropped: DroppedIndexes = {}
+    if drop_indexes:
+        with pool.connection() as conn:
+            dropped = drop_secondary_indexes(conn, tables)
+    try:
+        yield
+    finally:
+        with pool.connection() as conn:
+            rebuild_indexes(conn, dropped)
+            analyze_tables(conn, tables)
+            print_integrity_report(check_integrity(conn, tables))
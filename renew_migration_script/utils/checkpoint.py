@@ -0,0 +1,247 @@
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from db import DatabaseConnection, create_database_connection
+
+# 타겟 스키마에 만드는 체크포인트 관리 테이블
+CHECKPOINT_TABLE = "migration_checkpoint"
+# 실행별 파티션 키 구간 (재개할 때 같은 구간을 다시 쓰기 위해 기록)
+PARTITION_PLAN_TABLE = "migration_partition_plan"
+
+# 실행 ID를 워커 스레드/프로세스와 공유하기 위한 환경 변수
+RUN_ID_ENV = "MIGRATION_RUN_ID"
+
+
+class CheckpointStore:
+    """타겟 스키마의 관리 테이블에 실행(run)·작업·키 구간별 커밋 완료 위치(high-water PK)를 기록합니다.
+
+    체크포인트는 적재 연결과 분리된 전용 연결로 기록합니다. 적재 연결에서 커밋하면 묶음 커밋(COMMIT_BATCHES)
+    중인 배치까지 함께 커밋되거나, 기록이 실패했을 때 쌓여 있던 배치가 롤백되기 때문입니다.
+    같은 프로세스의 작업 스레드가 한 저장소(연결)를 공유하므로 호출은 잠금으로 직렬화합니다.
+    """
+
+    def __init__(self, schema_name: str):
+        self.schema_name = schema_name
+        self.conn = create_database_connection(schema_name)
+        self._lock = threading.Lock()
+        self.available = self.conn.connect() and self.conn.execute_command(
+            f"""
+            CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+              run_id VARCHAR(32) NOT NULL,
+              name VARCHAR(64) NOT NULL,
+              range_key VARCHAR(64) NOT NULL,
+              high_water BIGINT NULL,
+              completed TINYINT NOT NULL DEFAULT 0,
+              updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+              PRIMARY KEY (run_id, name, range_key)
+            )
+            """
+        ) and self.conn.execute_command(
+            f"""
+            CREATE TABLE IF NOT EXISTS {PARTITION_PLAN_TABLE} (
+              run_id VARCHAR(32) NOT NULL,
+              name VARCHAR(64) NOT NULL,
+              key_ranges TEXT NOT NULL,
+              created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+              PRIMARY KEY (run_id, name)
+            )
+            """
+        )
+        if not self.available:
+            print(f"⚠️ {CHECKPOINT_TABLE} 테이블을 만들 수 없어 체크포인트 없이 진행합니다.")
+
+    def latest_run_id(self) -> Optional[str]:
+        """가장 최근에 기록된 실행 ID를 조회합니다."""
+        if not self.available:
+            return None
+        with self._lock:
+            result = self.conn.execute_query(
+                    f"SELECT run_id FROM {CHECKPOINT_TABLE} ORDER BY updated_at DESC, run_id DESC LIMIT 1"
+            )
+        return result[0]["run_id"] if result else None
+
+    def load(self, run_id: str, name: str, range_key: str) -> Optional[dict]:
+        """저장된 위치({'high_water', 'completed'})를 조회합니다."""
+        if not self.available:
+            return None
+        with self._lock:
+            result = self.conn.execute_query(
+                f"SELECT high_water, completed FROM {CHECKPOINT_TABLE} WHERE run_id = %s AND name = %s AND range_key = %s",
+                (run_id, name, range_key),
+            )
+        return result[0] if result else None
+
+    def save(self, run_id: str, name: str, range_key: str, high_water: Any, completed: bool) -> None:
+        """위치를 기록(upsert)하고 커밋합니다."""
+        if not self.available:
+            return
+        with self._lock:
+            self.conn.execute_command(
+                f"""
+                INSERT INTO {CHECKPOINT_TABLE} (run_id, name, range_key, high_water, completed)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE high_water = VALUES(high_water), completed = VALUES(completed)
+                """,
+                (run_id, name, range_key, high_water, int(completed)),
+            )
+
+    def load_ranges(self, run_id: str, name: str) -> Optional[List[Tuple[Any, Any]]]:
+        """run_id 실행에서 name 작업에 나눠 둔 파티션 키 구간 목록. 없으면 None."""
+        if not self.available:
+            return None
+        with self._lock:
+            result = self.conn.execute_query(
+                f"SELECT key_ranges FROM {PARTITION_PLAN_TABLE} WHERE run_id = %s AND name = %s",
+                (run_id, name),
+            )
+        return [tuple(key_range) for key_range in json.loads(result[0]["key_ranges"])] if result else None
+
+    def save_ranges(self, run_id: str, name: str, key_ranges: List[Tuple[Any, Any]]) -> None:
+        """파티션 키 구간 목록을 기록합니다. (실행·작업마다 처음 나눈 구간만 남깁니다)"""
+        if not self.available:
+            return
+        with self._lock:
+            self.conn.execute_command(
+                f"INSERT IGNORE INTO {PARTITION_PLAN_TABLE} (run_id, name, key_ranges) VALUES (%s, %s, %s)",
+                (run_id, name, json.dumps([list(key_range) for key_range in key_ranges])),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.disconnect()
+
+
+# 프로세스마다 스키마별로 하나씩 여는 체크포인트 저장소 (관리 테이블 생성도 한 번만)
+_STORES: Dict[str, CheckpointStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_checkpoint_store(schema_name: str) -> CheckpointStore:
+    """schema_name의 체크포인트 저장소. 이 프로세스에서 처음 요청될 때 전용 연결을 열고 관리 테이블을 만듭니다."""
+    with _STORES_LOCK:
+        store = _STORES.get(schema_name)
+        if store is None:
+            store = CheckpointStore(schema_name)
+            _STORES[schema_name] = store
+        return store
+
+
+def close_checkpoint_stores() -> None:
+    """열어 둔 체크포인트 전용 연결을 모두 닫습니다. (프로세스 종료 시 자동 호출)"""
+    with _STORES_LOCK:
+        stores = list(_STORES.values())
+        _STORES.clear()
+    for store in stores:
+        store.close()
+
+
+atexit.register(close_checkpoint_stores)
+
+
+class Checkpoint:
+    """한 작업(키 구간)의 진행 위치.
+
+    - advance: 커밋이 끝난 배치의 마지막 키로 위치를 올립니다. (저장은 최대 interval초마다)
+    - freeze: 실패한 배치가 생기면 이후로는 위치를 올리지 않아 재개 시 실패 지점부터 다시 읽습니다.
+    - complete: 작업이 끝나면 완료로 기록합니다.
+    """
+
+    def __init__(
+        self,
+        store: CheckpointStore,
+        run_id: str,
+        name: str,
+        range_key: str,
+        high_water: Any = None,
+        completed: bool = False,
+        interval: float = 5.0,
+    ):
+        self.store = store
+        self.run_id = run_id
+        self.name = name
+        self.range_key = range_key
+        self.high_water = high_water
+        self.completed = completed
+        self.interval = interval
+        self._frozen = False
+        self._last_saved = time.monotonic()
+
+    def advance(self, key: Any) -> None:
+        if self._frozen:
+            return
+        self.high_water = key
+        if time.monotonic() - self._last_saved >= self.interval:
+            self.store.save(self.run_id, self.name, self.range_key, self.high_water, False)
+            self._last_saved = time.monotonic()
+
+    def freeze(self) -> None:
+        if not self._frozen:
+            self._frozen = True
+            self.store.save(self.run_id, self.name, self.range_key, self.high_water, False)
+
+    def complete(self) -> None:
+        if self._frozen:
+            return
+        self.completed = True
+        self.store.save(self.run_id, self.name, self.range_key, self.high_water, True)
+
+
+def _new_run_id() -> str:
+    return datetime.now().strftime("%Y%m%d%H%M%S")
+
+
+def start_run(conn: DatabaseConnection, resume: Optional[str] = None) -> str:
+    """이번 실행의 ID를 정하고 환경 변수로 공유합니다.
+
+    Args:
+        conn: 타겟 스키마 연결(체크포인트 테이블 위치, 기록은 같은 스키마의 전용 연결로 합니다).
+        resume: None이면 새 실행, 'latest'면 가장 최근 실행, 그 외에는 해당 실행 ID를 이어서 진행.
+
+    Returns:
+        사용할 실행 ID.
+    """
+    run_id = None
+    if resume == "latest":
+        run_id = get_checkpoint_store(conn.database).latest_run_id()
+        if run_id is None:
+            print("ℹ️ 재개할 이전 실행 기록이 없어 새로 시작합니다.")
+    elif resume:
+        run_id = resume
+
+    if run_id:
+        print(f"🔖 실행 {run_id}을(를) 마지막 체크포인트부터 재개합니다.")
+    else:
+        run_id = _new_run_id()
+        print(f"🔖 실행 ID: {run_id} (중단 시 --resume 으로 이어서 진행할 수 있습니다)")
+    os.environ[RUN_ID_ENV] = run_id
+    return run_id
+
+
+def current_run_id() -> str:
+    """현재 실행 ID. start_run 없이 호출되면 새로 만들어 환경 변수로 공유합니다."""
+    run_id = os.getenv(RUN_ID_ENV)
+    if not run_id:
+        run_id = _new_run_id()
+        os.environ[RUN_ID_ENV] = run_id
+    return run_id
+
+
+def open_checkpoint(conn: DatabaseConnection, name: str, start_after: Any = None, end_at: Any = None) -> Checkpoint:
+    """현재 실행의 작업/키 구간 체크포인트를 엽니다. 이전 기록이 있으면 그 위치부터 시작합니다.
+
+    conn은 스키마를 정하는 데만 쓰고, 기록은 get_checkpoint_store의 전용 연결로 합니다.
+    """
+    run_id = current_run_id()
+    range_key = f"{'' if start_after is None else start_after}:{'' if end_at is None else end_at}"
+    interval = float(os.getenv("CHECKPOINT_INTERVAL", 5))
+
+    store = get_checkpoint_store(conn.database)
+    saved = store.load(run_id, name, range_key)
+    if saved:
+        return Checkpoint(store, run_id, name, range_key, saved["high_water"], bool(saved["completed"]), interval)
+    return Checkpoint(store, run_id, name, range_key, interval=interval)
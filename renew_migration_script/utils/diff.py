@@ -0,0 +1,161 @@
+import os
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional, Sequence, Tuple
+
+from db import DatabaseConnection, create_database_connection
+from utils.extract import KeysetQuery, iter_keyset_rows
+from utils.key_index import KeyIndex
+
+
+@dataclass
+class DiffRange:
+    """타겟과 달라서 다시 옮겨야 하는 (start_after, end_at] 키 구간.
+
+    Attributes:
+        start_after, end_at: 키 구간.
+        source_rows: 구간의 소스 고유 키 수.
+        present: 타겟에 이미 있는 키(없으면 None = 구간 전체가 비어 있음).
+    """
+
+    start_after: Any
+    end_at: Any
+    source_rows: int
+    present: Optional[KeyIndex] = None
+
+
+@dataclass
+class DiffStats:
+    """사전 비교 집계. iter_diff_ranges가 구간을 읽어 나가며 채웁니다."""
+
+    windows: int = 0
+    rows_to_read: int = 0
+    rows_skipped: int = 0
+
+
+def get_diff_window() -> int:
+    """PRE_DIFF_WINDOW 환경 변수(기본 10000): 소스/타겟 요약을 비교할 구간 크기(키)."""
+    return max(1, int(os.getenv("PRE_DIFF_WINDOW", 10000)))
+
+
+def is_pre_diff_enabled() -> bool:
+    """PRE_DIFF 환경 변수(기본 0, 1이면 사용)."""
+    return os.getenv("PRE_DIFF", "0") == "1"
+
+
+def _range_conditions(key: str, start_after: Any, end_at: Any) -> Tuple[str, Tuple[Any, ...]]:
+    conditions, params = [f"{key} <= %s"], [end_at]
+    if start_after is not None:
+        conditions.insert(0, f"{key} > %s")
+        params.insert(0, start_after)
+    return " AND ".join(conditions), tuple(params)
+
+
+def _target_summary(target: DatabaseConnection, table: str, key: str, start_after: Any, end_at: Any) -> Tuple[int, int]:
+    """내부: 타겟의 (start_after, end_at] 구간 행 수와 키 CRC32의 XOR."""
+    where, params = _range_conditions(key, start_after, end_at)
+    result = target.execute_query(
+        f"SELECT COUNT(*) AS cnt, COALESCE(BIT_XOR(CRC32({key})), 0) AS key_hash FROM {table} WHERE {where}",
+        params,
+    )
+    if not result:
+        raise RuntimeError(f"{table} 타겟 구간 요약 조회 실패")
+    return result[0]["cnt"], int(result[0]["key_hash"])
+
+
+def _source_summary(source: DatabaseConnection, query: KeysetQuery, joins: str, start_after: Any, end_at: Any) -> Tuple[int, int]:
+    """내부: 코드 테이블 JOIN(lookups)으로 빠지는 행을 뺀 소스 구간의 고유 키 수와 키 CRC32의 XOR."""
+    inner, params = query.range_sql(start_after, end_at)
+    result = source.execute_query(
+        "SELECT COUNT(*) AS cnt, COALESCE(BIT_XOR(CRC32(k)), 0) AS key_hash "
+        f"FROM (SELECT DISTINCT src.`{query.key_alias}` AS k FROM ({inner}) AS src{joins}) AS kept_keys",
+        params,
+    )
+    if not result:
+        raise RuntimeError(f"{query.key} 소스 구간 요약 조회 실패")
+    return result[0]["cnt"], int(result[0]["key_hash"])
+
+
+def _target_keys(target: DatabaseConnection, table: str, key: str, start_after: Any, end_at: Any) -> KeyIndex:
+    """내부: 타겟 구간에 이미 있는 키 목록."""
+    where, params = _range_conditions(key, start_after, end_at)
+    rows = target.stream_query(
+        f"SELECT {key} FROM {table} WHERE {where} ORDER BY {key}",
+        params, fetch_size=10000, dictionary=False,
+    )
+    return KeyIndex((row[0] for row in rows), presorted=True)
+
+
+def iter_diff_ranges(
+    source: DatabaseConnection,
+    target: DatabaseConnection,
+    query: KeysetQuery,
+    target_table: str,
+    start_after: Any = None,
+    end_at: Any = None,
+    window: Optional[int] = None,
+    joins: str = "",
+    stats: Optional[DiffStats] = None,
+) -> Iterator[DiffRange]:
+    """소스와 타겟을 키 구간 요약(고유 키 수 + 키 CRC32의 XOR)으로 비교해 옮길 구간만 차례로 반환합니다.
+
+    - 구간마다 소스/타겟에 집계 쿼리 한 번씩만 보내므로 데이터는 전송하지 않습니다.
+    - 요약이 같은 구간은 이미 모두 옮겨진 것으로 보고 건너뜁니다.
+    - 다른 구간은 타겟에 있는 키 목록을 받아 함께 반환하므로, 메모리에는 지금 구간의 키만 둡니다.
+    - joins(TableSpec.sql_projection의 코드 테이블 JOIN)를 주면 변환에서 빠지는 소스 행은 빼고 요약합니다.
+    - 이미 있는 행은 ON DUPLICATE KEY UPDATE id=id로 어차피 바뀌지 않으므로 키 존재 여부만 비교합니다.
+      (갱신이 필요한 upsert 모드에서는 사용하지 않습니다.)
+    - 파이프라인 읽기 스레드에서 소비되므로 적재 중인 target 연결 대신 비교 전용 연결을 따로 엽니다.
+    """
+    window = window or get_diff_window()
+    stats = stats if stats is not None else DiffStats()
+    key = query.key_alias
+    compare = create_database_connection(target.database)
+    if not compare.connect():
+        raise ConnectionError(f"{target.database} 사전 비교 연결 실패")
+    try:
+        last_key = start_after
+        while True:
+            sql, params = query.window_sql(last_key, end_at, window)
+            result = source.execute_query(sql, params)
+            if not result:
+                raise RuntimeError(f"{target_table} 소스 구간 요약 조회 실패")
+            source_count, source_hash, window_end = result[0]["cnt"], int(result[0]["key_hash"]), result[0]["last_key"]
+            if not source_count:
+                return
+            stats.windows += 1
+            if joins:
+                source_count, source_hash = _source_summary(source, query, joins, last_key, window_end)
+
+            target_count, target_hash = _target_summary(compare, target_table, key, last_key, window_end)
+            if (target_count, target_hash) == (source_count, source_hash):
+                stats.rows_skipped += source_count
+            else:
+                present = _target_keys(compare, target_table, key, last_key, window_end) if target_count else None
+                stats.rows_to_read += source_count
+                yield DiffRange(last_key, window_end, source_count, present)
+            last_key = window_end
+    finally:
+        compare.disconnect()
+
+
+def iter_missing_rows(
+    source: DatabaseConnection,
+    query: KeysetQuery,
+    ranges: Iterable[DiffRange],
+    columns: Sequence[str],
+    page_size: int = 1000,
+) -> Iterator[tuple]:
+    """옮길 구간의 소스 행 중 타겟에 없는 키의 행만 반환합니다."""
+    key_position = list(columns).index(query.key_alias)
+    for diff_range in ranges:
+        rows = iter_keyset_rows(
+            source, query, page_size=page_size,
+            start_after=diff_range.start_after, end_at=diff_range.end_at, columns=columns,
+        )
+        present = diff_range.present
+        if present is None:
+            yield from rows
+            continue
+        for row in rows:
+            if row[key_position] not in present:
+                yield row
@@ -0,0 +1,331 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from db import DatabaseConnection
+from utils.async_db import AsyncInsertPool, get_async_in_flight, iterate_in_thread, open_insert_pool, run_in_flight
+from utils.batch_size import AdaptiveBatchSizer, create_batch_sizer
+from utils.bulk_insert import InsertStats, MultiRowInserter
+from utils.bulk_load import TableWriter, create_table_writer
+from utils.checkpoint import Checkpoint, open_checkpoint
+from utils.diff import DiffStats, is_pre_diff_enabled, iter_diff_ranges, iter_missing_rows
+from utils.extract import KeysetQuery, RowSource, count_keyset_rows, iter_keyset_rows, resolve_columns
+from utils.lookup import compile_spec
+from utils.metrics import TableMetrics, register_table_metrics
+from utils.pipeline import pipelined
+from utils.progress import print_progress
+from utils.server_copy import (
+    can_server_copy, is_server_copy_enabled, overridden_settings, plan_server_copy, same_server, server_copy_rows,
+)
+from utils.spec import TableSpec
+
+# 배치 단위 변환 함수: 소스 tuple 행 목록 → 타겟에 적재할 tuple 행 목록 (스킵된 행은 빠질 수 있음)
+BatchTransform = Callable[[List[tuple]], List[tuple]]
+
+
+def copy_rows(
+    source: Union[DatabaseConnection, RowSource],
+    query: KeysetQuery,
+    writer: TableWriter,
+    transform: BatchTransform,
+    name: str,
+    source_columns: Sequence[str],
+    sizer: Optional[AdaptiveBatchSizer] = None,
+    start_after: Any = None,
+    end_at: Any = None,
+    show_progress: bool = True,
+    pre_diff: bool = False,
+    in_flight: Optional[int] = None,
+    diff_joins: str = "",
+) -> Dict[str, int]:
+    """소스 쿼리의 (start_after, end_at] 구간을 tuple 행으로 읽어 변환한 뒤 writer로 적재합니다.
+
+    - 읽기/변환/적재는 pipelined로 겹쳐 실행합니다.
+    - 커밋이 끝난 배치의 마지막 키를 체크포인트(실행 ID·name·구간별)로 기록하고,
+      같은 실행을 재개하면 그 다음 키부터 읽습니다. 이미 완료된 구간은 건너뜁니다.
+    - 실패한 배치가 있으면 그 이후로는 체크포인트를 올리지 않습니다.
+    - 배치 크기는 sizer(기본: create_batch_sizer)가 적재 시간/바이트를 보고 조절합니다.
+    - pre_diff=True 면 키 구간마다 요약을 비교해 타겟에 없는 행만 읽어서 보냅니다. (구간은 읽으면서 하나씩 비교,
+      diff_joins는 코드 테이블 조회로 빠지는 행을 요약에서 빼기 위한 JOIN 절)
+    - source가 RowSource(스냅샷 파일, 팬아웃 분배)면 DB 대신 그 소스에서 같은 쿼리의 행을 읽습니다.
+    - 배치마다 읽기/변환/적재/커밋 시간을 TableMetrics로 기록해 실행 리포트에 모읍니다.
+    - in_flight(기본: ASYNC_IN_FLIGHT)가 2 이상이면 타겟 연결을 그만큼 더 열어 배치 여러 개를 asyncio로
+      동시에 적재합니다. 배치가 끝나는 순서는 달라도 체크포인트는 앞 배치가 모두 끝난 위치까지만 올립니다.
+
+    Returns:
+        {'total', 'processed', 'affected', 'inserted', 'failed_batches', 'resumed', 'skipped_existing'} 건수 집계.
+    """
+    checkpoint = open_checkpoint(writer.conn, name, start_after, end_at)
+    counts = {
+        'total': 0, 'processed': 0, 'affected': 0, 'inserted': 0,
+        'failed_batches': 0, 'resumed': 0, 'skipped_existing': 0,
+    }
+    if checkpoint.completed:
+        print(f"⏭️ {name}: 실행 {checkpoint.run_id}에서 이미 완료된 구간이라 건너뜁니다.")
+        counts['resumed'] = 1
+        return counts
+    if checkpoint.high_water is not None:
+        print(f"⏩ {name}: 체크포인트 키 {checkpoint.high_water} 이후부터 이어서 진행합니다.")
+        start_after = checkpoint.high_water
+        counts['resumed'] = 1
+
+    sizer = sizer or create_batch_sizer(writer.batch_bytes_limit)
+    key_position = list(source_columns).index(query.key_alias)
+    diff: Optional[DiffStats] = None
+    if isinstance(source, RowSource):
+        total = source.count_rows(query, start_after, end_at)
+        counts['total'] = total
+        source_rows = source.iter_rows(query, start_after, end_at)
+    elif pre_diff:
+        total = count_keyset_rows(source, query, start_after, end_at)
+        counts['total'] = total
+        diff = DiffStats()
+        ranges = iter_diff_ranges(
+            source, writer.conn, query, writer.table, start_after, end_at, joins=diff_joins, stats=diff,
+        )
+        source_rows = iter_missing_rows(source, query, ranges, source_columns, page_size=sizer.initial)
+    else:
+        total = count_keyset_rows(source, query, start_after, end_at)
+        counts['total'] = total
+        source_rows = iter_keyset_rows(
+            source, query, page_size=sizer.initial, start_after=start_after, end_at=end_at, columns=source_columns,
+        )
+    if not counts['total']:
+        checkpoint.complete()
+        return counts
+
+    metrics = TableMetrics(name, start_after, end_at)
+    metrics.total = total
+    in_flight = in_flight or get_async_in_flight()
+    if in_flight > 1 and not (isinstance(writer, MultiRowInserter) and not writer.grouped):
+        print(f"⚠️ {name}: 동시 적재(ASYNC_IN_FLIGHT)는 배치마다 커밋하는 INSERT 방식에서만 사용해 순차 적재합니다.")
+        in_flight = 1
+    reporter: Any = writer
+    last_key = None
+    try:
+        batches = pipelined(metrics.timed_batches(sizer.batches(source_rows)), metrics.timed_transform(transform))
+        if in_flight > 1:
+            reporter = asyncio.run(_write_batches_async(
+                batches, writer, in_flight, checkpoint, counts, metrics, sizer, key_position, name, total, show_progress,
+            ))
+        else:
+            for source_batch, batch in batches:
+                if batch:
+                    started = time.perf_counter()
+                    stats = writer.write(batch)
+                    _apply_write(counts, metrics, sizer, checkpoint, batch, stats, time.perf_counter() - started)
+                last_key = source_batch[-1][key_position]
+                # 스풀에 남은 행이 없을 때만(= 여기까지 모두 커밋됨) 위치를 올립니다.
+                if not writer.pending_rows:
+                    checkpoint.advance(last_key)
+                _count_processed(counts, metrics, source_batch, name, total, show_progress)
+    except Exception:
+        # 중단 직전까지 커밋된 위치를 남겨 두고 오류를 그대로 전달합니다.
+        checkpoint.freeze()
+        metrics.finish("failed")
+        register_table_metrics([metrics.summary()])
+        raise
+
+    started = time.perf_counter()
+    final = writer.finish()
+    if final.statements or final.committed_rows:
+        _record_write(metrics, final, time.perf_counter() - started)
+    if final.affected is None:
+        counts['failed_batches'] += 1
+        checkpoint.freeze()
+    counts['affected'] += final.affected or 0
+    if last_key is not None:
+        checkpoint.advance(last_key)
+    checkpoint.complete()
+    counts['skipped_existing'] = counts['total'] - counts['processed'] if pre_diff else 0
+    metrics.finish("failed" if counts['failed_batches'] else "completed")
+    register_table_metrics([metrics.summary()])
+    if show_progress:
+        if counts['processed'] < total:
+            print_progress(total, total, prefix=name)
+        if diff is not None:
+            print(f"🔎 {name}: {diff.windows}개 구간 비교, {diff.rows_skipped}키 일치로 건너뜀, {diff.rows_to_read}키 구간만 읽었습니다.")
+        reporter.print_report(name)
+        print(f"📏 {name}: {sizer.describe()}")
+        metrics.print_report()
+    return counts
+
+
+def _apply_write(
+    counts: Dict[str, int],
+    metrics: TableMetrics,
+    sizer: AdaptiveBatchSizer,
+    checkpoint: Checkpoint,
+    batch: List[tuple],
+    stats: InsertStats,
+    elapsed: float,
+) -> None:
+    """내부: 적재한 배치 하나의 결과를 계측/배치 크기/건수/체크포인트에 반영합니다."""
+    _record_write(metrics, stats, elapsed)
+    # 스풀만 한 경우(LOAD DATA)는 이번 배치의 적재 시간이 아니므로 반영하지 않습니다.
+    if stats.rows == len(batch):
+        sizer.observe(stats.rows, stats.bytes_sent, elapsed)
+    if stats.affected is None:
+        counts['failed_batches'] += 1
+        checkpoint.freeze()
+    counts['affected'] += stats.affected or 0
+    counts['inserted'] += len(batch)
+
+
+def _count_processed(
+    counts: Dict[str, int],
+    metrics: TableMetrics,
+    source_batch: List[tuple],
+    name: str,
+    total: int,
+    show_progress: bool,
+) -> None:
+    """내부: 처리한 소스 행 수를 집계하고 진행 상황을 표시합니다."""
+    counts['processed'] += len(source_batch)
+    metrics.processed = counts['processed']
+    if show_progress:
+        print_progress(counts['processed'], total, prefix=name, detail=metrics.progress_detail())
+
+
+async def _write_batches_async(
+    batches: Iterable[Tuple[List[tuple], List[tuple]]],
+    writer: MultiRowInserter,
+    in_flight: int,
+    checkpoint: Checkpoint,
+    counts: Dict[str, int],
+    metrics: TableMetrics,
+    sizer: AdaptiveBatchSizer,
+    key_position: int,
+    name: str,
+    total: int,
+    show_progress: bool,
+) -> AsyncInsertPool:
+    """내부: 변환된 배치를 타겟 연결 in_flight개로 동시에 적재합니다.
+
+    writer의 연결은 체크포인트 기록에만 쓰고, 적재는 같은 타겟에 새로 연 연결들이 나눠 맡습니다.
+    배치 결과는 이벤트 루프 스레드에서만 반영하므로 counts/체크포인트에 잠금이 필요 없습니다.
+    """
+    pool = await open_insert_pool(writer.conn, writer.table, writer.columns, writer.on_duplicate, in_flight)
+    # 순번 → 마지막 키. 앞 순번이 모두 끝난 배치까지만 체크포인트를 올립니다.
+    finished: Dict[int, Any] = {}
+    next_seq = 0
+
+    async def write(seq: int, item: Tuple[List[tuple], List[tuple]]) -> None:
+        nonlocal next_seq
+        source_batch, batch = item
+        if batch:
+            stats, elapsed = await pool.write(batch)
+            _apply_write(counts, metrics, sizer, checkpoint, batch, stats, elapsed)
+        finished[seq] = source_batch[-1][key_position]
+        while next_seq in finished:
+            checkpoint.advance(finished.pop(next_seq))
+            next_seq += 1
+        _count_processed(counts, metrics, source_batch, name, total, show_progress)
+
+    try:
+        await run_in_flight(iterate_in_thread(batches), write, in_flight)
+    finally:
+        await pool.close()
+    return pool
+
+
+def _record_write(metrics: TableMetrics, stats: InsertStats, seconds: float) -> None:
+    """내부: writer 호출 시간을 전송(insert)과 커밋(commit)으로 나눠 기록합니다.
+
+    스풀 파일에만 쓴 호출(LOAD DATA 대기)은 전송으로, 묶음 커밋만 한 호출(finish)은 커밋으로만 기록합니다.
+    """
+    if stats.statements or not stats.committed_rows:
+        metrics.record("insert", max(seconds - stats.commit_seconds, 0.0), stats.rows, stats.bytes_sent)
+    if stats.committed_rows:
+        metrics.record("commit", stats.commit_seconds, stats.committed_rows)
+
+
+def migrate_spec(
+    source: Union[DatabaseConnection, RowSource],
+    target: DatabaseConnection,
+    spec: TableSpec,
+    query: Optional[KeysetQuery] = None,
+    row_filter: Optional[BatchTransform] = None,
+    upsert: bool = False,
+    start_after: Any = None,
+    end_at: Any = None,
+    show_progress: bool = True,
+) -> Dict[str, int]:
+    """TableSpec 하나를 실행합니다: 소스 컬럼 확인 → 변환 컴파일(코드 테이블 조회 포함) → copy_rows.
+
+    SERVER_COPY=1(기본 꺼짐)이고 소스와 타겟이 같은 서버이며 변환을 모두 SQL로 옮길 수 있으면
+    copy_rows 대신 utils.server_copy의 키 구간별 INSERT … SELECT로 실행합니다.
+
+    Args:
+        source: 소스 연결(또는 RowSource).
+        target: 타겟 연결.
+        spec: 테이블 정의.
+        query: spec.query 대신 사용할 쿼리(증분 동기화 조건을 더한 경우 등).
+        row_filter: 변환된 tuple 배치에서 적재하지 않을 행을 걸러내는 함수(선택). 주면 서버 내 복사를 쓰지 않습니다.
+        upsert: True면 이미 있는 행도 갱신합니다.
+        start_after, end_at: 처리할 키 구간.
+        show_progress: 진행 표시 여부.
+    """
+    query = query or spec.query
+    if isinstance(source, RowSource):
+        # 이미 읽어 둔 행을 공급받으므로 타겟과 미리 비교하지 않고 그대로 적재합니다.
+        source_columns = source.columns(query)
+        pre_diff = False
+    else:
+        source_columns = resolve_columns(source, query)
+        # upsert는 이미 있는 행도 갱신해야 하므로 키 존재 여부만 보는 사전 비교를 쓰지 않습니다.
+        # row_filter로 빠지는 행은 SQL 요약에 반영할 수 없어 구간이 일치하지 않으므로 함께 제외합니다.
+        pre_diff = is_pre_diff_enabled() and not upsert and row_filter is None
+        # 같은 서버의 다른 스키마면 행을 가져오지 않고 서버 안에서 INSERT … SELECT로 옮깁니다.
+        plan = None
+        if row_filter is None and is_server_copy_enabled():
+            plan = plan_server_copy(spec, query, source_columns, target.database, upsert=upsert)
+        if plan is not None and same_server(source, target) and can_server_copy(source, target, spec.target):
+            if show_progress:
+                print(f"⚡ {spec.name}: 소스와 타겟이 같은 서버라 INSERT … SELECT로 옮깁니다. (SERVER_COPY=1)")
+                ignored = overridden_settings(pre_diff)
+                if ignored:
+                    print(f"⚠️ {spec.name}: 서버 내 복사에는 적용되지 않는 설정: {', '.join(ignored)}")
+            return server_copy_rows(
+                source, target, plan, query, spec.name,
+                start_after=start_after, end_at=end_at, show_progress=show_progress,
+            )
+    mapper = compile_spec(source, spec, source_columns)
+    transform = mapper if row_filter is None else (lambda rows: row_filter(mapper(rows)))
+    writer = create_table_writer(target, spec.target, spec.columns, upsert=upsert)
+    return copy_rows(
+        source, query, writer, transform, spec.name, source_columns,
+        start_after=start_after, end_at=end_at, show_progress=show_progress, pre_diff=pre_diff,
+        diff_joins=spec.sql_projection("src")[1] if pre_diff else "",
+    )
+
+
+def report_migration(name: str, counts: Dict[str, int]) -> bool:
+    """legacy → renew 마이그레이션 결과를 출력하고 성공 여부를 반환합니다."""
+    if counts.get('failed_batches'):
+        print(f"❌ {name}: 실패한 배치(파티션) {counts['failed_batches']}개가 있습니다. --resume 으로 실패 지점부터 이어서 진행하세요.")
+        return False
+    if counts.get('resumed') and not counts.get('processed'):
+        return True
+    if not counts.get('total'):
+        print(f"⚠️ 이전 {name} 테이블에 데이터가 없습니다.")
+        return True
+    if counts.get('skipped_existing') and not counts.get('processed'):
+        print(f"✅ {name}: {counts['skipped_existing']}개 레코드가 모두 이미 마이그레이션되어 있습니다.")
+        return True
+
+    affected_total = counts.get('affected', 0)
+    if affected_total:
+        print(f"✅ {affected_total}개의 {name} 레코드가 성공적으로 마이그레이션되었습니다.")
+        return True
+    print("영향받은 레코드가 없습니다.")
+    return False
+
+
+def migrate_table(before: DatabaseConnection, after: DatabaseConnection, spec: TableSpec) -> bool:
+    """이전 테이블 데이터를 TableSpec에 따라 새로운 테이블로 마이그레이션합니다."""
+    try:
+        return report_migration(spec.name, migrate_spec(before, after, spec))
+    except Exception as e:
+        print(f"❌ {spec.name} 테이블 마이그레이션 중 오류 발생: {e}")
+        return False
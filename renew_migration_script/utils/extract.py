@@ -0,0 +1,192 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from mysql.connector import errors
+
+from db import DatabaseConnection
+
+
+@dataclass(frozen=True)
+class KeysetQuery:
+    """PK 범위(keyset) 페이지 단위로 읽을 소스 쿼리 정의.
+
+    `WHERE key > :last ORDER BY key LIMIT n` 형태의 짧은 인덱스 쿼리로 나눠 읽기 위해
+    SELECT 절과 FROM 절(JOIN 포함)을 분리해서 보관합니다.
+
+    Attributes:
+        columns: SELECT 절 컬럼 목록.
+        source: FROM 절 (JOIN 포함).
+        key: 페이지 기준 키 컬럼 (인덱스가 있는 PK, 예: attendance.id).
+        key_alias: 결과 행에서 키 값을 꺼낼 컬럼명.
+        where: 항상 적용할 추가 조건(선택).
+        where_params: where 안의 %s 자리에 들어갈 파라미터.
+    """
+
+    columns: str
+    source: str
+    key: str
+    key_alias: str = "id"
+    where: Optional[str] = None
+    where_params: Tuple[Any, ...] = ()
+
+    def _conditions(self, start_after: Any, end_at: Any) -> Tuple[List[str], List[Any]]:
+        conditions: List[str] = []
+        params: List[Any] = []
+        if start_after is not None:
+            conditions.append(f"{self.key} > %s")
+            params.append(start_after)
+        if end_at is not None:
+            conditions.append(f"{self.key} <= %s")
+            params.append(end_at)
+        if self.where:
+            conditions.append(f"({self.where})")
+            params.extend(self.where_params)
+        return conditions, params
+
+    def _ordered_sql(self, select: str, start_after: Any, end_at: Any, limit: int) -> Tuple[str, Tuple[Any, ...]]:
+        conditions, params = self._conditions(start_after, end_at)
+        where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT {select} FROM {self.source}{where_clause} ORDER BY {self.key} LIMIT %s"
+        return sql, tuple(params) + (limit,)
+
+    def page_sql(self, start_after: Any, end_at: Any, page_size: int) -> Tuple[str, Tuple[Any, ...]]:
+        """start_after 다음 키부터 page_size 건을 읽는 쿼리와 파라미터를 만듭니다."""
+        return self._ordered_sql(self.columns, start_after, end_at, page_size)
+
+    def count_sql(self, start_after: Any = None, end_at: Any = None) -> Tuple[str, Tuple[Any, ...]]:
+        """범위 내 전체 행 수를 세는 쿼리와 파라미터를 만듭니다."""
+        conditions, params = self._conditions(start_after, end_at)
+        where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"SELECT COUNT(*) AS cnt FROM {self.source}{where_clause}", tuple(params)
+
+    def range_sql(self, start_after: Any = None, end_at: Any = None) -> Tuple[str, Tuple[Any, ...]]:
+        """범위 내 결과 행 전체를 정렬 없이 읽는 쿼리를 만듭니다. (서버 측 집계의 서브쿼리 용도)"""
+        conditions, params = self._conditions(start_after, end_at)
+        where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"SELECT {self.columns} FROM {self.source}{where_clause}", tuple(params)
+
+    def window_sql(self, start_after: Any, end_at: Any, size: int) -> Tuple[str, Tuple[Any, ...]]:
+        """start_after 다음 size개 키 구간의 요약(키 수, 키 CRC32의 XOR, 마지막 키)을 구하는 쿼리를 만듭니다.
+
+        키 인덱스만 읽으며, 1:N JOIN으로 같은 키가 여러 행이어도 DISTINCT로 키 단위로 세므로
+        한 키의 행들이 두 구간에 나뉘지 않습니다.
+        """
+        inner, params = self._ordered_sql(f"DISTINCT {self.key} AS k", start_after, end_at, size)
+        sql = (
+            "SELECT COUNT(*) AS cnt, COALESCE(BIT_XOR(CRC32(k)), 0) AS key_hash, MAX(k) AS last_key "
+            f"FROM ({inner}) AS window_keys"
+        )
+        return sql, params
+
+    def columns_sql(self) -> Tuple[str, Tuple[Any, ...]]:
+        """결과 컬럼 이름만 확인하기 위한 행 없는(LIMIT 0) 쿼리를 만듭니다."""
+        return self.page_sql(None, None, 0)
+
+    def bounds_sql(self) -> str:
+        """키의 최솟값/최댓값을 조회하는 쿼리를 만듭니다. (파티션 분할용, 파라미터는 where_params)"""
+        where_clause = f" WHERE {self.where}" if self.where else ""
+        return f"SELECT MIN({self.key}) AS min_key, MAX({self.key}) AS max_key FROM {self.source}{where_clause}"
+
+    def key_at_offset_sql(self) -> str:
+        """키 순서로 N번째(OFFSET) 행의 키를 조회하는 쿼리를 만듭니다. (표본 경계 계산용, 파라미터는 where_params + (offset,))"""
+        where_clause = f" WHERE {self.where}" if self.where else ""
+        return f"SELECT {self.key} AS boundary_key FROM {self.source}{where_clause} ORDER BY {self.key} LIMIT 1 OFFSET %s"
+
+
+class RowSource:
+    """DB 연결 대신 KeysetQuery 결과 행을 공급하는 소스(스냅샷 파일, 팬아웃 분배 등)의 공통 인터페이스.
+
+    migrate_spec / copy_rows는 소스가 RowSource면 SQL 대신 아래 메서드로 컬럼/건수/행을 얻습니다.
+    """
+
+    database: str
+
+    def columns(self, query: "KeysetQuery") -> List[str]:
+        """resolve_columns 대응: 결과 컬럼 이름."""
+        raise NotImplementedError
+
+    def count_rows(self, query: "KeysetQuery", start_after: Any = None, end_at: Any = None) -> int:
+        """count_keyset_rows 대응: 구간 안의 행 수."""
+        raise NotImplementedError
+
+    def iter_rows(self, query: "KeysetQuery", start_after: Any = None, end_at: Any = None) -> Iterator[tuple]:
+        """iter_keyset_rows 대응: 구간의 행을 키 순서의 tuple로 반환합니다."""
+        raise NotImplementedError
+
+
+def count_keyset_rows(conn: DatabaseConnection, query: KeysetQuery, start_after: Any = None, end_at: Any = None) -> int:
+    """KeysetQuery 범위의 전체 행 수를 조회합니다. (프로그레스 바 total 용도)"""
+    sql, params = query.count_sql(start_after, end_at)
+    result = conn.execute_query(sql, params)
+    return result[0]["cnt"] if result else 0
+
+
+def resolve_columns(conn: DatabaseConnection, query: KeysetQuery) -> List[str]:
+    """KeysetQuery 결과 컬럼 이름을 SELECT 순서대로 조회합니다. (tuple 행의 위치 계산용)"""
+    sql, params = query.columns_sql()
+    return conn.get_result_columns(sql, params)
+
+
+def _fetch_page(
+    conn: DatabaseConnection,
+    sql: str,
+    params: Tuple[Any, ...],
+    page_size: int,
+    max_retries: int,
+    dictionary: bool = True,
+) -> List[Any]:
+    """내부: 한 페이지를 읽습니다. 연결이 끊기면 재연결 후 해당 페이지만 다시 읽습니다."""
+    for attempt in range(max_retries + 1):
+        try:
+            return list(conn.stream_query(sql, params, fetch_size=page_size, dictionary=dictionary))
+        except (errors.OperationalError, errors.InterfaceError) as e:
+            if attempt == max_retries:
+                raise
+            wait_seconds = min(2 ** attempt, 30)
+            print(f"⚠️ 페이지 조회 중 연결이 끊겼습니다. {wait_seconds}초 후 재연결합니다 ({attempt + 1}/{max_retries}): {e}")
+            time.sleep(wait_seconds)
+            conn.reconnect()
+    return []
+
+
+def iter_keyset_rows(
+    conn: DatabaseConnection,
+    query: KeysetQuery,
+    page_size: int = 1000,
+    start_after: Any = None,
+    end_at: Any = None,
+    max_retries: int = 3,
+    columns: Optional[Sequence[str]] = None,
+) -> Iterator[Any]:
+    """KeysetQuery를 PK 순서의 페이지로 나눠 읽으며 한 행씩 반환하는 제너레이터.
+
+    - 각 페이지는 `key > 마지막 키 ORDER BY key LIMIT page_size` 인 짧은 쿼리입니다.
+    - 터널이 끊겨도 재연결 후 마지막으로 읽은 키부터 한 페이지만 다시 읽습니다.
+    - 1:N JOIN으로 같은 키가 여러 행이면 페이지 경계에서 뒤쪽 중복 행은 건너뜁니다.
+      (타겟 PK 기준으로 어차피 한 행만 적재되므로 결과는 같습니다.)
+
+    Args:
+        conn: 소스 데이터베이스 연결.
+        query: 페이지로 읽을 쿼리 정의.
+        page_size: 페이지당 행 수.
+        start_after: 이 키 다음부터 읽습니다(None이면 처음부터).
+        end_at: 이 키까지(포함) 읽습니다(None이면 끝까지).
+        max_retries: 페이지별 재연결 재시도 횟수.
+        columns: resolve_columns 결과를 넘기면 행을 dict 대신 tuple로 반환합니다.
+
+    Yields:
+        결과 행(dict, columns를 넘긴 경우 SELECT 순서의 tuple).
+    """
+    dictionary = columns is None
+    key_field = query.key_alias if dictionary else list(columns).index(query.key_alias)
+    last_key = start_after
+    while True:
+        sql, params = query.page_sql(last_key, end_at, page_size)
+        page = _fetch_page(conn, sql, params, page_size, max_retries, dictionary)
+        if not page:
+            return
+        yield from page
+        if len(page) < page_size:
+            return
+        last_key = page[-1][key_field]
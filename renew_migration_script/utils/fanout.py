@@ -0,0 +1,173 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Sequence, TypeVar
+
+from db import DatabaseConnection
+from utils.extract import KeysetQuery, RowSource, count_keyset_rows, iter_keyset_rows, resolve_columns
+from utils.progress import chunked
+
+T = TypeVar("T")
+
+# 분배 종료 표식
+_END = object()
+
+
+class _ReadError:
+    """내부: 읽기 스레드에서 발생한 예외를 각 타겟으로 전달하는 래퍼."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def get_fan_out_targets() -> List[str]:
+    """FAN_OUT_TARGETS 환경 변수(쉼표로 구분한 타겟 스키마 목록, 기본 없음)를 읽습니다."""
+    return [schema.strip() for schema in os.getenv("FAN_OUT_TARGETS", "").split(",") if schema.strip()]
+
+
+class _Subscriber(RowSource):
+    """내부: 팬아웃 타겟 하나가 받는 행 스트림. tables/* 함수에는 소스 연결 대신 이 객체가 전달됩니다."""
+
+    def __init__(self, fan_out: "FanOut", queue_size: int):
+        self.fan_out = fan_out
+        self.database = fan_out.source.database
+        self.closed = threading.Event()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+
+    def _check(self, query: KeysetQuery) -> None:
+        if query.source != self.fan_out.query.source or query.where != self.fan_out.query.where:
+            raise ValueError("팬아웃 소스는 분배 중인 쿼리와 같은 쿼리만 읽을 수 있습니다.")
+
+    def columns(self, query: KeysetQuery) -> List[str]:
+        self._check(query)
+        return list(self.fan_out.columns)
+
+    def count_rows(self, query: KeysetQuery, start_after: Any = None, end_at: Any = None) -> int:
+        # 소스는 한 번만 세므로, 재개한 타겟은 이미 적재한 구간까지 포함한 건수를 받습니다.
+        self._check(query)
+        return self.fan_out.total
+
+    def iter_rows(self, query: KeysetQuery, start_after: Any = None, end_at: Any = None) -> Iterator[tuple]:
+        """분배되는 페이지를 받아 (start_after, end_at] 구간의 행만 반환합니다."""
+        self._check(query)
+        self.fan_out.start()
+        key_position = self.fan_out.columns.index(query.key_alias)
+        try:
+            while True:
+                page = self._queue.get()
+                if page is _END:
+                    return
+                if isinstance(page, _ReadError):
+                    raise page.error
+                for row in page:
+                    key = row[key_position]
+                    if (start_after is None or key > start_after) and (end_at is None or key <= end_at):
+                        yield row
+        finally:
+            self.close()
+
+    def put(self, page: Any) -> None:
+        """읽기 스레드에서 호출: 큐가 가득 차면 기다리되(back-pressure), 끝난 타겟은 건너뜁니다."""
+        while not self.closed.is_set():
+            try:
+                self._queue.put(page, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close(self) -> None:
+        """더 받지 않습니다. (적재가 끝났거나 실패한 타겟이 읽기 스레드를 막지 않도록)"""
+        self.closed.set()
+
+
+class FanOut:
+    """소스 쿼리를 한 번만 읽어 여러 타겟에 같은 페이지를 나눠 주는 분배기.
+
+    - 읽기 스레드 하나가 KeysetQuery를 PK 페이지로 읽고, 타겟마다 둔 제한된 큐에 같은 페이지를 넣습니다.
+    - 가장 느린 타겟의 큐가 가득 차면 읽기가 기다리므로 메모리는 타겟 수 × queue_size 페이지 수준입니다.
+    - 끝났거나 실패한 타겟은 건너뛰므로 나머지 타겟은 계속 진행합니다.
+    - 컬럼/건수는 타겟 스레드가 시작되기 전에 한 번만 조회합니다. (소스 연결은 읽기 스레드만 사용)
+    """
+
+    def __init__(
+        self,
+        source: DatabaseConnection,
+        query: KeysetQuery,
+        targets: int,
+        page_size: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self.source = source
+        self.query = query
+        self.page_size = page_size or int(os.getenv("BATCH_SIZE", 1000))
+        self.columns = resolve_columns(source, query)
+        self.total = count_keyset_rows(source, query)
+        size = queue_size or max(1, int(os.getenv("PIPELINE_QUEUE_SIZE", 4)))
+        self.subscribers = [_Subscriber(self, size) for _ in range(targets)]
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """처음 요청한 타겟이 읽기를 시작합니다. (이후 호출은 무시)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._read, name="fan-out-read", daemon=True)
+                self._thread.start()
+
+    def _broadcast(self, page: Any) -> None:
+        for subscriber in self.subscribers:
+            subscriber.put(page)
+
+    def _read(self) -> None:
+        try:
+            rows = iter_keyset_rows(self.source, self.query, page_size=self.page_size, columns=self.columns)
+            for page in chunked(rows, self.page_size):
+                if all(subscriber.closed.is_set() for subscriber in self.subscribers):
+                    return
+                self._broadcast(page)
+            self._broadcast(_END)
+        except BaseException as e:
+            self._broadcast(_ReadError(e))
+
+    def join(self) -> None:
+        """모든 타겟이 끝난 뒤 읽기 스레드를 정리합니다."""
+        for subscriber in self.subscribers:
+            subscriber.close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def fan_out(
+    source: DatabaseConnection,
+    query: KeysetQuery,
+    targets: Sequence[DatabaseConnection],
+    migrate: Callable[[RowSource, DatabaseConnection], T],
+    page_size: Optional[int] = None,
+) -> List[Optional[T]]:
+    """source의 query를 한 번만 읽어 타겟마다 migrate(분배 소스, 타겟)를 동시에 실행합니다.
+
+    migrate는 tables/* 의 prod → dev 함수처럼 소스 연결 자리에 RowSource를 받을 수 있어야 하며,
+    타겟별 고아 행 필터링/체크포인트/적재는 각 타겟 스레드에서 그대로 실행됩니다.
+
+    Returns:
+        타겟 순서대로 migrate 결과. 예외가 난 타겟은 None.
+    """
+    distributor = FanOut(source, query, len(targets), page_size=page_size)
+
+    def run(subscriber: _Subscriber, target: DatabaseConnection) -> Optional[T]:
+        try:
+            return migrate(subscriber, target)
+        except Exception as e:
+            print(f"❌ {target.database}: 팬아웃 적재 중 오류 발생: {e}")
+            return None
+        finally:
+            # 구간이 이미 완료되어 읽지 않은 타겟도 읽기 스레드를 막지 않게 합니다.
+            subscriber.close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="fan-out") as pool:
+            futures = [pool.submit(run, subscriber, target) for subscriber, target in zip(distributor.subscribers, targets)]
+            return [future.result() for future in futures]
+    finally:
+        distributor.join()
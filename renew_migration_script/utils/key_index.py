@@ -0,0 +1,110 @@
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from db import DatabaseConnection
+
+# 비트맵(키 범위 1비트/키)이 정렬 배열(8바이트/키)보다 작아지는 최대 범위 배율
+_BITMAP_SPAN_PER_KEY = 64
+
+
+class KeyIndex:
+    """정수 PK 집합을 작은 메모리로 보관하고 포함 여부를 빠르게 확인합니다.
+
+    - 키가 촘촘하면(범위 ≤ 키 수 × 64) 최솟값 기준 비트맵(bytearray)
+    - 듬성듬성하면 정렬된 array('q') + 이진 탐색
+    Python set(int 객체 + 해시 슬롯, 키당 약 60~90바이트)과 달리 키 밀도에 따라
+    키당 1비트~8바이트만 사용하며, 프로세스로 넘길 때도 그대로 작게 pickle 됩니다.
+    """
+
+    def __init__(self, keys: Iterable[int], presorted: bool = False):
+        # presorted: 이미 중복 없이 오름차순인 키(ORDER BY PK 결과)면 정렬을 생략합니다.
+        sorted_keys = array("q", keys) if presorted else array("q", sorted(set(keys)))
+        self.size = len(sorted_keys)
+        self.min_key = sorted_keys[0] if self.size else 0
+        self.max_key = sorted_keys[-1] if self.size else -1
+        span = self.max_key - self.min_key + 1
+
+        self._bitmap: Optional[bytearray] = None
+        self._sorted: Optional[array] = None
+        if self.size and span <= self.size * _BITMAP_SPAN_PER_KEY:
+            bitmap = bytearray((span + 7) // 8)
+            base = self.min_key
+            for key in sorted_keys:
+                offset = key - base
+                bitmap[offset >> 3] |= 1 << (offset & 7)
+            self._bitmap = bitmap
+        else:
+            self._sorted = sorted_keys
+
+    @property
+    def kind(self) -> str:
+        return "비트맵" if self._bitmap is not None else "정렬 배열"
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, key: Any) -> bool:
+        if key is None or key < self.min_key or key > self.max_key:
+            return False
+        if self._bitmap is not None:
+            offset = key - self.min_key
+            return bool(self._bitmap[offset >> 3] & (1 << (offset & 7)))
+        position = bisect_left(self._sorted, key)
+        return position < self.size and self._sorted[position] == key
+
+    def contains_many(self, keys: List[Any]) -> List[bool]:
+        """배치의 키 목록에 대한 포함 여부를 한 번에 계산합니다.
+
+        정렬 배열인 경우 배치 키를 정렬해 앞에서 찾은 위치부터 이어서 탐색하므로
+        배치가 PK 순서로 읽혀 키가 모여 있을수록 탐색 범위가 줄어듭니다.
+        """
+        if self._bitmap is not None:
+            bitmap, base, high = self._bitmap, self.min_key, self.max_key
+            return [
+                key is not None and base <= key <= high and bool(bitmap[(key - base) >> 3] & (1 << ((key - base) & 7)))
+                for key in keys
+            ]
+
+        found: Dict[Any, bool] = {}
+        sorted_keys, size, lo = self._sorted, self.size, 0
+        for key in sorted(k for k in set(keys) if k is not None):
+            lo = bisect_left(sorted_keys, key, lo)
+            found[key] = lo < size and sorted_keys[lo] == key
+        return [found.get(key, False) for key in keys]
+
+    def memory_bytes(self) -> int:
+        """키 저장에 쓰는 바이트 수."""
+        if self._bitmap is not None:
+            return len(self._bitmap)
+        return self._sorted.itemsize * len(self._sorted)
+
+    @classmethod
+    def load(cls, conn: DatabaseConnection, table: str, key: str = "id", fetch_size: int = 10000) -> "KeyIndex":
+        """테이블의 키 컬럼을 스트리밍으로 읽어 인덱스를 만듭니다."""
+        rows = conn.stream_query(f"SELECT {key} AS k FROM {table} ORDER BY {key}", fetch_size=fetch_size)
+        return cls(array("q", (row["k"] for row in rows)), presorted=True)
+
+
+# 실행 중 한 번만 읽도록 (스키마, 테이블, 키)별로 보관하는 캐시
+_INDEX_CACHE: Dict[Tuple[str, str, str], KeyIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_key_index(conn: DatabaseConnection, table: str, key: str = "id") -> KeyIndex:
+    """(스키마, 테이블)의 KeyIndex를 반환합니다. 이번 실행에서 처음 요청될 때만 DB에서 읽습니다."""
+    cache_key = (conn.database, table, key)
+    with _INDEX_LOCK:
+        index = _INDEX_CACHE.get(cache_key)
+        if index is None:
+            index = KeyIndex.load(conn, table, key)
+            _INDEX_CACHE[cache_key] = index
+            print(f"🗂️ {conn.database}.{table} 키 {len(index)}개 로드 ({index.kind}, {index.memory_bytes() / 1024:.1f}KB)")
+        return index
+
+
+def invalidate_key_index(conn: DatabaseConnection, table: str, key: str = "id") -> None:
+    """테이블에 행을 적재한 뒤 호출해 다음 요청 때 다시 읽게 합니다."""
+    with _INDEX_LOCK:
+        _INDEX_CACHE.pop((conn.database, table, key), None)
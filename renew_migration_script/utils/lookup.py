@@ -0,0 +1,43 @@
+import threading
+from typing import Any, Dict, Sequence, Tuple, Union
+
+from db import DatabaseConnection
+from utils.extract import RowSource
+from utils.spec import CompiledTransform, Lookup, TableSpec
+
+# 실행 중 한 번만 읽도록 (스키마, 테이블, 키, 값)별로 보관하는 캐시
+_LOOKUP_CACHE: Dict[Tuple[str, str, str, str], Dict[Any, Any]] = {}
+_LOOKUP_LOCK = threading.Lock()
+
+
+def get_lookup(conn: DatabaseConnection, lookup: Lookup) -> Dict[Any, Any]:
+    """코드 테이블의 {키: 값} dict를 반환합니다. 이번 실행에서 처음 요청될 때만 DB에서 읽습니다."""
+    cache_key = (conn.database, lookup.table, lookup.key, lookup.value)
+    with _LOOKUP_LOCK:
+        values = _LOOKUP_CACHE.get(cache_key)
+        if values is None:
+            rows = conn.execute_query(f"SELECT {lookup.key} AS k, {lookup.value} AS v FROM {lookup.table}")
+            if rows is None:
+                raise RuntimeError(f"{conn.database}.{lookup.table} 코드 테이블 조회 실패")
+            values = {row["k"]: row["v"] for row in rows}
+            _LOOKUP_CACHE[cache_key] = values
+            print(f"🗂️ {conn.database}.{lookup.table} 코드 {len(values)}개 로드 ({lookup.key} → {lookup.value})")
+        return values
+
+
+def compile_spec(
+    source: Union[DatabaseConnection, RowSource],
+    spec: TableSpec,
+    source_columns: Sequence[str],
+) -> CompiledTransform:
+    """spec의 코드 테이블 조회 값을 source에서 읽어(캐시) 배치 변환 함수를 만듭니다.
+
+    Raises:
+        ValueError: 조회가 필요한 spec을 DB가 아닌 소스(스냅샷 등)로 실행하려는 경우.
+    """
+    if not spec.lookups:
+        return spec.compile(source_columns)
+    if isinstance(source, RowSource):
+        raise ValueError(f"{spec.name}: 코드 테이블 조회가 필요한 테이블은 DB 소스에서만 옮길 수 있습니다.")
+    lookup_values = {column: get_lookup(source, lookup) for column, lookup in spec.lookups.items()}
+    return spec.compile(source_columns, lookup_values)
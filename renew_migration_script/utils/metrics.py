@@ -0,0 +1,210 @@
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from utils.checkpoint import RUN_ID_ENV
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+# 배치가 거치는 스테이지 (읽기 → 변환 → INSERT 전송 → 커밋)
+STAGES = ("fetch", "transform", "insert", "commit")
+
+# 출력용 스테이지 이름
+_STAGE_LABELS = {"fetch": "읽기", "transform": "변환", "insert": "적재", "commit": "커밋"}
+
+
+def _percentile(sorted_values: List[float], ratio: float) -> float:
+    """내부: 정렬된 값에서 nearest-rank 백분위수."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(0, math.ceil(ratio * len(sorted_values)) - 1)]
+
+
+def format_seconds(seconds: float) -> str:
+    """초를 H:MM:SS 형식으로 표시합니다."""
+    seconds = int(max(seconds, 0))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+class StageMetrics:
+    """스테이지 하나의 배치별 소요 시간과 누적 행/바이트."""
+
+    def __init__(self):
+        self.seconds: List[float] = []
+        self.rows = 0
+        self.bytes = 0
+
+    def add(self, seconds: float, rows: int = 0, bytes_count: int = 0) -> None:
+        self.seconds.append(seconds)
+        self.rows += rows
+        self.bytes += bytes_count
+
+    def summary(self) -> Dict[str, Any]:
+        total = sum(self.seconds)
+        ordered = sorted(self.seconds)
+        return {
+            "batches": len(self.seconds),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "seconds": round(total, 6),
+            "rows_per_sec": round(self.rows / total, 1) if total else None,
+            "bytes_per_sec": round(self.bytes / total, 1) if total and self.bytes else None,
+            "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+        }
+
+
+class TableMetrics:
+    """테이블(또는 키 구간) 하나를 옮기는 동안 스테이지별 배치 시간을 기록합니다.
+
+    읽기/변환은 파이프라인 스레드에서, 적재/커밋은 호출한 스레드에서 기록하므로 잠금으로 보호합니다.
+    스테이지가 겹쳐 실행되므로 누적 시간이 가장 긴 스테이지가 병목입니다.
+    """
+
+    def __init__(self, name: str, start_after: Any = None, end_at: Any = None):
+        self.name = name
+        self.key_range = (start_after, end_at)
+        self.total = 0
+        self.processed = 0
+        self.status = "running"
+        self.stages: Dict[str, StageMetrics] = {stage: StageMetrics() for stage in STAGES}
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, rows: int = 0, bytes_count: int = 0) -> None:
+        with self._lock:
+            self.stages[stage].add(seconds, rows, bytes_count)
+
+    def timed_batches(self, batches: Iterable[List[T]]) -> Iterator[List[T]]:
+        """배치 이터러블을 감싸 다음 배치를 받아오는 시간(소스 조회 포함)을 fetch로 기록합니다."""
+        iterator = iter(batches)
+        while True:
+            started = time.perf_counter()
+            batch = next(iterator, None)
+            if batch is None:
+                return
+            self.record("fetch", time.perf_counter() - started, len(batch))
+            yield batch
+
+    def timed_transform(self, transform: Callable[[List[T]], List[U]]) -> Callable[[List[T]], List[U]]:
+        """배치 변환 함수를 감싸 소요 시간을 transform으로 기록합니다."""
+        def timed(rows: List[T]) -> List[U]:
+            started = time.perf_counter()
+            result = transform(rows)
+            self.record("transform", time.perf_counter() - started, len(rows))
+            return result
+        return timed
+
+    @property
+    def elapsed(self) -> float:
+        return (self._finished or time.perf_counter()) - self._started
+
+    def eta(self) -> Optional[float]:
+        """지금까지의 처리 속도로 계산한 남은 시간(초)."""
+        if not self.processed or not self.total:
+            return None
+        return self.elapsed / self.processed * max(self.total - self.processed, 0)
+
+    def progress_detail(self) -> str:
+        """프로그레스 바 뒤에 붙일 처리 속도/ETA 문자열."""
+        rate = self.processed / self.elapsed if self.elapsed else 0
+        eta = self.eta()
+        return f"{rate:,.0f}행/s ETA {format_seconds(eta) if eta is not None else '-'}"
+
+    def finish(self, status: str = "completed") -> None:
+        self._finished = time.perf_counter()
+        self.status = status
+
+    def bottleneck(self) -> Optional[str]:
+        totals = {stage: sum(metrics.seconds) for stage, metrics in self.stages.items() if metrics.seconds}
+        return max(totals, key=totals.get) if totals else None
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON 리포트용 요약."""
+        start_after, end_at = self.key_range
+        return {
+            "name": self.name,
+            "key_range": [start_after, end_at],
+            "status": self.status,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "elapsed_seconds": round(self.elapsed, 3),
+            "total_rows": self.total,
+            "processed_rows": self.processed,
+            "rows_per_sec": round(self.processed / self.elapsed, 1) if self.elapsed else None,
+            "bottleneck": self.bottleneck(),
+            "stages": {stage: metrics.summary() for stage, metrics in self.stages.items()},
+        }
+
+    def print_report(self) -> None:
+        """스테이지별 처리량/지연 시간을 한 줄씩 출력합니다."""
+        print(f"⏱️ {self.name}: {self.processed}행 / {self.elapsed:.1f}초, 병목 {_STAGE_LABELS.get(self.bottleneck(), '-')}")
+        for stage, metrics in self.stages.items():
+            if not metrics.seconds:
+                continue
+            summary = metrics.summary()
+            throughput = f"{summary['rows_per_sec']:,.0f}행/s" if summary["rows_per_sec"] else "-"
+            if summary["bytes_per_sec"]:
+                throughput += f", {summary['bytes_per_sec'] / (1024 * 1024):.2f}MB/s"
+            print(
+                f"   {_STAGE_LABELS[stage]}: {summary['seconds']:.2f}초 ({throughput}) "
+                f"p50 {summary['p50_ms']:.1f}ms / p95 {summary['p95_ms']:.1f}ms"
+            )
+
+
+# 이번 실행에서 끝난 테이블/구간 요약 (run 리포트로 모아 기록)
+_RUN_TABLES: List[Dict[str, Any]] = []
+_RUN_LOCK = threading.Lock()
+
+
+def register_table_metrics(summaries: Iterable[Dict[str, Any]]) -> None:
+    """테이블 요약을 run 리포트에 추가합니다. (파티션 워커 프로세스가 돌려준 요약도 여기로 모읍니다.)"""
+    with _RUN_LOCK:
+        _RUN_TABLES.extend(summaries)
+
+
+def drain_table_metrics() -> List[Dict[str, Any]]:
+    """지금까지 모은 테이블 요약을 꺼내고 비웁니다."""
+    with _RUN_LOCK:
+        summaries = list(_RUN_TABLES)
+        _RUN_TABLES.clear()
+    return summaries
+
+
+def write_run_report(label: str) -> Optional[str]:
+    """이번 실행의 테이블별 요약과 합계를 RUN_REPORT_DIR(기본 reports)에 JSON 파일로 기록합니다.
+
+    Returns:
+        기록한 파일 경로. 기록할 내용이 없거나 실패하면 None.
+    """
+    tables = drain_table_metrics()
+    if not tables:
+        return None
+    run_id = os.getenv(RUN_ID_ENV) or datetime.now().strftime("%Y%m%d%H%M%S")
+    report = {
+        "run_id": run_id,
+        "label": label,
+        "written_at": datetime.now().isoformat(timespec="seconds"),
+        "total_rows": sum(table["processed_rows"] for table in tables),
+        "stage_seconds": {
+            stage: round(sum(table["stages"][stage]["seconds"] for table in tables), 3) for stage in STAGES
+        },
+        "tables": tables,
+    }
+    report_dir = os.getenv("RUN_REPORT_DIR", "reports")
+    path = os.path.join(report_dir, f"{label}_{run_id}.json")
+    try:
+        os.makedirs(report_dir, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+    except OSError as e:
+        print(f"❌ 실행 리포트 기록 실패: {e}")
+        return None
+    print(f"📝 실행 리포트: {path}")
+    return path
@@ -0,0 +1,155 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from db import DatabaseConnection, create_database_connection
+from utils.checkpoint import current_run_id, get_checkpoint_store
+from utils.extract import KeysetQuery, count_keyset_rows
+from utils.metrics import drain_table_metrics, register_table_metrics
+from utils.watermark import merge_counts
+
+# (start_after, end_at] 형태의 키 범위. None은 열린 끝을 뜻합니다.
+KeyRange = Tuple[Optional[Any], Optional[Any]]
+
+# (source, target, start_after, end_at, *args, show_progress=...) -> 건수 집계
+RangeMigration = Callable[..., Dict[str, int]]
+
+
+def _minmax_boundaries(conn: DatabaseConnection, query: KeysetQuery, parts: int) -> List[Any]:
+    """내부: MIN/MAX 사이를 같은 폭으로 나눈 경계 키 목록을 계산합니다."""
+    result = conn.execute_query(query.bounds_sql(), query.where_params)
+    if not result or result[0]["min_key"] is None:
+        return []
+    min_key, max_key = int(result[0]["min_key"]), int(result[0]["max_key"])
+    step = max(1, -(-(max_key - min_key + 1) // parts))
+    return [min_key - 1 + step * i for i in range(1, parts) if min_key - 1 + step * i < max_key]
+
+
+def _sampled_boundaries(conn: DatabaseConnection, query: KeysetQuery, parts: int) -> List[Any]:
+    """내부: 행 수가 같도록 키 순서상 N등분 지점의 키를 경계로 사용합니다. (id가 듬성듬성한 경우)"""
+    total = count_keyset_rows(conn, query)
+    boundaries: List[Any] = []
+    for i in range(1, parts):
+        result = conn.execute_query(query.key_at_offset_sql(), query.where_params + (total * i // parts,))
+        if result and (not boundaries or result[0]["boundary_key"] != boundaries[-1]):
+            boundaries.append(result[0]["boundary_key"])
+    return boundaries
+
+
+def plan_key_ranges(conn: DatabaseConnection, query: KeysetQuery, parts: int, sampled: bool = False) -> List[KeyRange]:
+    """테이블의 키 구간을 parts개의 (start_after, end_at] 범위로 나눕니다.
+
+    Args:
+        conn: 소스 데이터베이스 연결.
+        query: 분할할 쿼리 정의.
+        parts: 나눌 구간 수.
+        sampled: True면 행 수 기준 표본 경계, False면 MIN/MAX 균등 분할.
+
+    Returns:
+        첫 구간은 start_after=None, 마지막 구간은 end_at=None 인 범위 목록. 데이터가 없으면 빈 목록.
+    """
+    if parts <= 1:
+        return [(None, None)]
+    if sampled:
+        boundaries = _sampled_boundaries(conn, query, parts)
+    else:
+        boundaries = _minmax_boundaries(conn, query, parts)
+    edges: List[Optional[Any]] = [None] + boundaries + [None]
+    return [(edges[i], edges[i + 1]) for i in range(len(edges) - 1)]
+
+
+def _resumable_key_ranges(
+    name: str,
+    source: DatabaseConnection,
+    target: DatabaseConnection,
+    query: KeysetQuery,
+    parts: int,
+    sampled: bool,
+) -> List[KeyRange]:
+    """내부: 현재 실행에서 name 작업에 이미 나눈 구간이 있으면 그대로, 없으면 새로 나눠 기록합니다.
+
+    구간 체크포인트는 (start_after, end_at)로 찾으므로, 재개할 때 소스가 늘었거나 PARTITION_WORKERS가
+    바뀌어 경계가 달라지면 모든 구간이 처음부터 다시 시작됩니다. 그래서 첫 실행의 경계를 실행 ID로 남겨 둡니다.
+    """
+    store = get_checkpoint_store(target.database)
+    run_id = current_run_id()
+    saved = store.load_ranges(run_id, name)
+    if saved is not None:
+        note = f" (PARTITION_WORKERS={parts} 대신 기록된 {len(saved)}개 구간)" if len(saved) != parts else ""
+        print(f"🧩 실행 {run_id}에서 나눈 구간을 그대로 사용합니다{note}")
+        return saved
+    key_ranges = plan_key_ranges(source, query, parts, sampled=sampled)
+    store.save_ranges(run_id, name, key_ranges)
+    return key_ranges
+
+
+def _run_partition_job(job: Tuple[RangeMigration, str, str, bool, KeyRange, tuple]) -> Tuple[Dict[str, int], List[dict]]:
+    """내부: 워커 프로세스에서 자기 전용 연결을 열어 한 구간을 마이그레이션합니다.
+
+    구간의 스테이지 계측 요약은 워커 프로세스에 쌓이므로 건수 집계와 함께 돌려줍니다.
+    """
+    migrate_range, source_schema, target_schema, bulk_load, (start_after, end_at), args = job
+    source = create_database_connection(source_schema)
+    target = create_database_connection(target_schema, bulk_load=bulk_load)
+    try:
+        if not source.connect() or not target.connect():
+            raise ConnectionError(f"파티션 ({start_after}, {end_at}] 연결 실패")
+        counts = migrate_range(source, target, start_after, end_at, *args, show_progress=False)
+        print(f"🧩 파티션 ({start_after}, {end_at}] 완료: {counts.get('processed', 0)}행 처리")
+        return counts, drain_table_metrics()
+    finally:
+        source.disconnect()
+        target.disconnect()
+
+
+def get_partition_workers() -> int:
+    """PARTITION_WORKERS 환경 변수(기본 1: 분할하지 않음)를 읽습니다."""
+    return max(1, int(os.getenv("PARTITION_WORKERS", 1)))
+
+
+def run_partitioned(
+    migrate_range: RangeMigration,
+    source: DatabaseConnection,
+    target: DatabaseConnection,
+    query: KeysetQuery,
+    workers: int,
+    *args: Any,
+) -> Dict[str, Any]:
+    """테이블 키 구간을 나눠 구간마다 별도 프로세스에서 추출→변환→적재를 실행합니다.
+
+    - 각 워커 프로세스는 source/target 스키마에 자기 연결을 새로 엽니다.
+    - 구간별 건수 집계(processed, affected, skipped_* 등)를 합쳐 하나의 결과로 반환합니다. (utils.watermark.merge_counts)
+    - 실패한 구간은 failed_batches로 집계하고, 끝난 구간의 집계/계측은 그대로 합칩니다.
+    - PARTITION_BOUNDARY=sample 이면 행 수 기준 경계를 사용합니다.
+    - 나눈 구간은 실행 ID별로 기록해 --resume 시 같은 구간(과 구간 체크포인트)을 이어서 사용합니다.
+
+    Args:
+        migrate_range: 모듈 최상위에 정의된 구간 마이그레이션 함수(프로세스로 전달 가능해야 함).
+        source: 경계 계산에 사용할 소스 연결. 스키마 이름은 워커 연결 생성에도 사용됩니다.
+        target: 타겟 연결. 스키마 이름과 대량 적재 프로필 사용 여부가 워커로 전달됩니다.
+        query: 분할 기준 키를 가진 소스 쿼리 정의.
+        workers: 구간(=프로세스) 수.
+        *args: migrate_range에 추가로 전달할 인자(pickle 가능해야 함).
+    """
+    sampled = os.getenv("PARTITION_BOUNDARY", "minmax") == "sample"
+    key_ranges = _resumable_key_ranges(migrate_range.__name__, source, target, query, workers, sampled)
+    print(f"🧩 {len(key_ranges)}개 구간을 {len(key_ranges)}개 프로세스로 나눠 처리합니다: {key_ranges}")
+
+    jobs = [(migrate_range, source.database, target.database, target.bulk_load, key_range, args) for key_range in key_ranges]
+    merged: Dict[str, Any] = {'failed_batches': 0}
+    # 스레드 스케줄러 안에서도 안전하도록 fork 대신 spawn으로 워커를 만듭니다.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(jobs), mp_context=context) as pool:
+        futures = [(job[4], pool.submit(_run_partition_job, job)) for job in jobs]
+        for (start_after, end_at), future in futures:
+            try:
+                counts, metrics = future.result()
+            except Exception as e:
+                # 구간 체크포인트는 실패 직전 위치에 남아 있으므로 --resume 으로 이 구간만 이어서 진행할 수 있습니다.
+                print(f"❌ 파티션 ({start_after}, {end_at}] 실패: {e}")
+                merged['failed_batches'] += 1
+                continue
+            merge_counts(merged, counts)
+            register_table_metrics(metrics)
+    return merged
@@ -0,0 +1,109 @@
+import os
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+# 스테이지 종료/오류 전달용 표식
+_END = object()
+
+
+class _StageError:
+    """내부: 백그라운드 스테이지에서 발생한 예외를 소비자 스레드로 전달하는 래퍼."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _put(q: queue.Queue, item: object, stop: threading.Event) -> bool:
+    """내부: 큐가 가득 차면 기다리되(back-pressure), 중단 요청 시 포기합니다."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _read_stage(batches: Iterable[List[T]], out_q: queue.Queue, stop: threading.Event) -> None:
+    """내부: 소스에서 배치를 읽어 큐에 넣습니다."""
+    try:
+        for batch in batches:
+            if not _put(out_q, batch, stop):
+                return
+        _put(out_q, _END, stop)
+    except BaseException as e:
+        _put(out_q, _StageError(e), stop)
+
+
+def _transform_stage(transform: Callable[[List[T]], List[U]], in_q: queue.Queue, out_q: queue.Queue, stop: threading.Event) -> None:
+    """내부: 읽은 배치를 변환해 (원본 배치, 변환 결과)로 다음 큐에 넣습니다."""
+    while not stop.is_set():
+        try:
+            item = in_q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _END or isinstance(item, _StageError):
+            _put(out_q, item, stop)
+            return
+        try:
+            result = (item, transform(item))
+        except BaseException as e:
+            _put(out_q, _StageError(e), stop)
+            return
+        if not _put(out_q, result, stop):
+            return
+
+
+def get_queue_size() -> int:
+    """PIPELINE_QUEUE_SIZE 환경 변수(기본 4)를 읽습니다."""
+    return max(1, int(os.getenv("PIPELINE_QUEUE_SIZE", 4)))
+
+
+def pipelined(
+    batches: Iterable[List[T]],
+    transform: Callable[[List[T]], List[U]],
+    queue_size: int | None = None,
+) -> Iterator[Tuple[List[T], List[U]]]:
+    """읽기 → 변환 → 쓰기를 겹쳐서 실행하는 파이프라인 제너레이터.
+
+    - 읽기 스레드가 batches를 소비해 제한된 크기의 큐를 채웁니다.
+    - 변환 스레드가 transform(TableSpec 변환 등)을 적용합니다.
+    - 호출한 쪽(쓰기 단계)이 변환된 배치를 꺼내 타겟에 적재하는 동안 다음 배치를 미리 읽습니다.
+    - 큐가 가득 차면 앞 단계가 기다리므로(back-pressure) 메모리는 queue_size 배치 수준으로 유지됩니다.
+    - 앞 단계의 예외는 호출한 쪽에서 다시 발생합니다.
+
+    Args:
+        batches: 소스 배치 이터러블(읽기 스레드에서만 소비되므로 소스 연결을 다른 곳에서 쓰면 안 됩니다).
+        transform: 배치 단위 변환 함수.
+        queue_size: 스테이지 사이 큐 크기(None이면 PIPELINE_QUEUE_SIZE).
+
+    Yields:
+        (원본 배치, 변환된 배치). 원본 배치는 행 수 집계와 체크포인트 키 계산에 사용합니다.
+    """
+    size = queue_size or get_queue_size()
+    stop = threading.Event()
+    read_q: queue.Queue = queue.Queue(maxsize=size)
+    out_q: queue.Queue = queue.Queue(maxsize=size)
+    threads = [
+        threading.Thread(target=_read_stage, args=(batches, read_q, stop), name="pipeline-read", daemon=True),
+        threading.Thread(target=_transform_stage, args=(transform, read_q, out_q, stop), name="pipeline-transform", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = out_q.get()
+            if item is _END:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -1,13 +1,17 @@
+from itertools import islice
 from typing import Iterable, Iterator, List, TypeVar
 
 T = TypeVar("T")
 
 
-def chunked(items: List[T], chunk_size: int) -> Iterator[List[T]]:
-    """리스트를 고정 크기 청크로 분할하는 제너레이터.
+def chunked(items: Iterable[T], chunk_size: int) -> Iterator[List[T]]:
+    """리스트/이터러블을 고정 크기 청크로 분할하는 제너레이터.
+
+    - 리스트는 슬라이싱으로 분할합니다.
+    - 제너레이터 등 이터러블은 chunk_size 만큼씩만 소비하므로 스트리밍 입력에도 사용할 수 있습니다.
 
     Args:
-        items: 분할할 리스트.
+        items: 분할할 리스트 또는 이터러블.
         chunk_size: 각 청크의 크기(양수).
 
     Yields:
@@ -15,8 +19,16 @@ def chunked(items: List[T], chunk_size: int) -> Iterator[List[T]]:
     """
     if chunk_size <= 0:
         raise ValueError("chunk_size must be positive")
-    for start in range(0, len(items), chunk_size):
-        yield items[start : start + chunk_size]
+    if isinstance(items, list):
+        for start in range(0, len(items), chunk_size):
+            yield items[start : start + chunk_size]
+        return
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
 
 
 def _render_progress_bar(progress_ratio: float, width: int = 40) -> str:
@@ -32,7 +44,7 @@ def _render_progress_bar(progress_ratio: float, width: int = 40) -> str:
     return f"[{bar}] {clamped*100:6.2f}%"
 
 
-def print_progress(current: int, total: int, prefix: str | None = None) -> None:
+def print_progress(current: int, total: int, prefix: str | None = None, detail: str | None = None) -> None:
     """현재/전체를 기준으로 콘솔에 단일 라인 프로그레스 바를 출력합니다.
 
     - 같은 라인을 갱신하며, 완료 시 개행합니다.
@@ -42,10 +54,13 @@ def print_progress(current: int, total: int, prefix: str | None = None) -> None:
         current: 현재 처리된 건수.
         total: 전체 대상 건수(0이면 0%로 처리).
         prefix: 라인 앞에 붙일 태그(테이블명 등).
+        detail: 바 뒤에 붙일 설명(처리 속도/ETA 등).
     """
     ratio = 0.0 if total <= 0 else min(max(current / total, 0.0), 1.0)
     bar = _render_progress_bar(ratio)
     label = f"{prefix} {bar}" if prefix else bar
+    if detail:
+        label = f"{label} {detail}"
     end_char = "\n" if current >= total else "\r"
     print(label, end=end_char, flush=True)
 
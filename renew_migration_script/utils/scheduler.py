@@ -0,0 +1,103 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from db import ConnectionPool, DatabaseConnection
+
+
+@dataclass(frozen=True)
+class MigrationTask:
+    """테이블 단위 마이그레이션 작업과 선행 작업(FK 대상 테이블) 선언.
+
+    Attributes:
+        name: 작업 이름(테이블명).
+        run: (source, target) 연결을 받아 성공 여부를 반환하는 마이그레이션 함수.
+        depends_on: 먼저 끝나야 하는 작업 이름 목록.
+    """
+
+    name: str
+    run: Callable[[DatabaseConnection, DatabaseConnection], bool]
+    depends_on: Tuple[str, ...] = ()
+
+
+def _validate_graph(tasks: Sequence[MigrationTask]) -> None:
+    """내부: 이름 중복, 알 수 없는 선행 작업, 순환 의존을 검사합니다."""
+    names = [task.name for task in tasks]
+    if len(names) != len(set(names)):
+        raise ValueError(f"중복된 작업 이름이 있습니다: {names}")
+    for task in tasks:
+        unknown = [dep for dep in task.depends_on if dep not in names]
+        if unknown:
+            raise ValueError(f"{task.name} 작업의 선행 작업을 찾을 수 없습니다: {unknown}")
+
+    pending = {task.name: len(task.depends_on) for task in tasks}
+    ready = [name for name, count in pending.items() if count == 0]
+    visited = 0
+    while ready:
+        name = ready.pop()
+        visited += 1
+        for task in tasks:
+            if name in task.depends_on:
+                pending[task.name] -= 1
+                if pending[task.name] == 0:
+                    ready.append(task.name)
+    if visited != len(tasks):
+        raise ValueError("작업 의존 관계에 순환이 있습니다.")
+
+
+def _run_task(task: MigrationTask, source_pool: ConnectionPool, target_pool: ConnectionPool) -> bool:
+    """내부: 풀에서 워커 전용 source/target 연결을 빌려 작업 하나를 실행합니다."""
+    try:
+        with source_pool.connection() as source, target_pool.connection() as target:
+            return bool(task.run(source, target))
+    except Exception as e:
+        print(f"❌ {task.name} 작업 중 오류 발생: {e}")
+        return False
+
+
+def run_task_graph(
+    tasks: Sequence[MigrationTask],
+    source_pool: ConnectionPool,
+    target_pool: ConnectionPool,
+    max_workers: int = 4,
+) -> Dict[str, bool]:
+    """선행 작업이 끝난 작업부터 워커 풀에서 동시에 실행합니다.
+
+    - 서로 의존하지 않는 테이블은 병렬로 진행되어 전체 시간이 임계 경로 수준으로 줄어듭니다.
+    - 각 작업은 풀에서 빌린 자기만의 source/target 연결을 사용하고, 끝나면 반납해 다음 작업이 재사용합니다.
+    - 작업이 False를 반환해도(재실행 시 영향 행 0건 등) 후속 작업은 그대로 진행합니다.
+
+    Args:
+        tasks: 실행할 작업 목록.
+        source_pool: 소스 스키마 커넥션 풀.
+        target_pool: 타겟 스키마 커넥션 풀.
+        max_workers: 동시에 실행할 최대 작업 수.
+
+    Returns:
+        작업 이름별 성공 여부(입력 순서 유지).
+    """
+    _validate_graph(tasks)
+    by_name = {task.name: task for task in tasks}
+    pending = {task.name: len(task.depends_on) for task in tasks}
+    results: Dict[str, bool] = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="migration") as pool:
+        running: Dict[Future, MigrationTask] = {}
+        ready: List[MigrationTask] = [task for task in tasks if not task.depends_on]
+        while ready or running:
+            for task in ready:
+                print(f"▶️ {task.name} 작업을 시작합니다.")
+                running[pool.submit(_run_task, task, source_pool, target_pool)] = task
+            ready = []
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished = running.pop(future)
+                results[finished.name] = future.result()
+                for name, task in by_name.items():
+                    if finished.name in task.depends_on:
+                        pending[name] -= 1
+                        if pending[name] == 0:
+                            ready.append(task)
+
+    return {task.name: results[task.name] for task in tasks}
@@ -0,0 +1,233 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from mysql.connector import Error
+
+from db import DatabaseConnection
+from utils.async_db import get_async_in_flight
+from utils.checkpoint import open_checkpoint
+from utils.extract import KeysetQuery, count_keyset_rows
+from utils.metrics import TableMetrics, register_table_metrics
+from utils.progress import print_progress
+from utils.spec import TableSpec
+
+
+def is_server_copy_enabled() -> bool:
+    """SERVER_COPY 환경 변수(기본 0 = 항상 클라이언트 경유, 1 = 같은 서버면 INSERT … SELECT)를 읽습니다."""
+    return os.getenv("SERVER_COPY", "0") == "1"
+
+
+def overridden_settings(pre_diff: bool) -> List[str]:
+    """서버 내 복사에서는 적용되지 않는, 지금 켜져 있는 클라이언트 적재 설정 목록."""
+    settings: List[str] = []
+    if os.getenv("LOAD_MODE", "insert") == "infile":
+        settings.append("LOAD_MODE=infile")
+    if int(os.getenv("COMMIT_BATCHES", 1)) != 1 or float(os.getenv("COMMIT_SECONDS", 0)) > 0:
+        settings.append("COMMIT_BATCHES/COMMIT_SECONDS (구간마다 커밋)")
+    if get_async_in_flight() > 1:
+        settings.append(f"ASYNC_IN_FLIGHT={get_async_in_flight()}")
+    if pre_diff:
+        settings.append("PRE_DIFF")
+    if os.getenv("BATCH_ADAPTIVE", "1") != "0":
+        settings.append("BATCH_ADAPTIVE (구간 크기는 SERVER_COPY_CHUNK)")
+    return settings
+
+
+def get_server_copy_chunk() -> int:
+    """SERVER_COPY_CHUNK 환경 변수(INSERT … SELECT 한 번에 옮길 키 수, 기본 50000)를 읽습니다."""
+    return max(1, int(os.getenv("SERVER_COPY_CHUNK", 50000)))
+
+
+def _quote(identifier: str) -> str:
+    return f"`{identifier.replace('`', '``')}`"
+
+
+def same_server(source: DatabaseConnection, target: DatabaseConnection) -> bool:
+    """두 연결이 같은 MySQL 서버(server_uuid)에 붙어 있는지 확인합니다. (터널/호스트 이름이 달라도 판별)"""
+    sql = "SELECT @@server_uuid AS server_uuid"
+    source_result = source.execute_query(sql)
+    target_result = target.execute_query(sql)
+    if not source_result or not target_result:
+        return False
+    return source_result[0]["server_uuid"] == target_result[0]["server_uuid"]
+
+
+@dataclass(frozen=True)
+class ServerCopyPlan:
+    """TableSpec을 서버 안에서 실행할 INSERT … SELECT 문으로 옮긴 결과.
+
+    Attributes:
+        prefix: `INSERT INTO 타겟 (...) SELECT ... FROM (` 까지.
+        select_params: SELECT 목록의 파라미터(고정값, 변환 식).
+        suffix: `) AS src JOIN ... ORDER BY ... ON DUPLICATE KEY UPDATE ...`.
+    """
+
+    prefix: str
+    select_params: Tuple[Any, ...]
+    suffix: str
+
+    def chunk_sql(self, query: KeysetQuery, start_after: Any, end_at: Any) -> Tuple[str, Tuple[Any, ...]]:
+        """(start_after, end_at] 키 구간을 옮기는 INSERT … SELECT 문과 파라미터."""
+        inner, params = query.range_sql(start_after, end_at)
+        return f"{self.prefix}{inner}{self.suffix}", self.select_params + params
+
+
+def plan_server_copy(
+    spec: TableSpec,
+    query: KeysetQuery,
+    source_columns: Sequence[str],
+    target_schema: str,
+    upsert: bool = False,
+) -> Optional[ServerCopyPlan]:
+    """spec의 변환을 SQL 식으로 옮깁니다. (TableSpec.sql_projection: 고정값은 파라미터, 코드 테이블 조회는
+    INNER JOIN, converter는 sql()이 있는 경우(ValueMap, sql_equivalent)만 CASE/함수 식)
+
+    파이썬으로만 할 수 있는 converter가 하나라도 있으면 None(클라이언트 경유 적재)을 반환합니다.
+    """
+    positions = set(source_columns)
+    if query.key_alias not in positions:
+        return None
+    for column in spec.columns:
+        if column not in spec.constants and spec.renames.get(column, column) not in positions:
+            return None
+    projection, joins = spec.sql_projection("src")
+    if any(projected is None for projected in projection):
+        return None
+    expressions = [expression for expression, _ in projection]
+    params = [param for _, column_params in projection for param in column_params]
+
+    target = f"{_quote(target_schema)}.{_quote(spec.target)}"
+    if upsert:
+        updates = ", ".join(
+            f"{target}.{_quote(column)} = VALUES({_quote(column)})" for column in spec.columns if column != "id"
+        )
+    else:
+        # 소스 결과에도 id가 있으므로 타겟 컬럼임을 명시합니다. (MultiRowInserter의 id=id와 같은 의미)
+        updates = f"{target}.{_quote('id')} = {target}.{_quote('id')}"
+    prefix = (
+        f"INSERT INTO {target} ({', '.join(_quote(column) for column in spec.columns)}) "
+        f"SELECT {', '.join(expressions)} FROM ("
+    )
+    suffix = f") AS src{joins} ORDER BY src.{_quote(query.key_alias)} ON DUPLICATE KEY UPDATE {updates}"
+    return ServerCopyPlan(prefix, tuple(params), suffix)
+
+
+def can_server_copy(source: DatabaseConnection, target: DatabaseConnection, table: str) -> bool:
+    """소스 연결에서 타겟 스키마 테이블에 접근할 수 있는지 확인합니다. (권한이 없으면 클라이언트 경유)
+
+    권한이 없는 것은 예상된 경우이므로 execute_query의 실패 출력 대신 안내 한 줄만 남깁니다.
+    """
+    cursor = source.connection.cursor()
+    try:
+        cursor.execute(f"SELECT 1 FROM {_quote(target.database)}.{_quote(table)} LIMIT 0")
+        cursor.fetchall()
+        return True
+    except Error as e:
+        print(f"ℹ️ {table}: 소스 계정으로 {target.database} 스키마에 접근할 수 없어 클라이언트 경유로 적재합니다. ({e.msg})")
+        return False
+    finally:
+        cursor.close()
+
+
+def server_copy_rows(
+    source: DatabaseConnection,
+    target: DatabaseConnection,
+    plan: ServerCopyPlan,
+    query: KeysetQuery,
+    name: str,
+    start_after: Any = None,
+    end_at: Any = None,
+    show_progress: bool = True,
+    chunk: Optional[int] = None,
+) -> Dict[str, int]:
+    """같은 서버의 두 스키마 사이에서 행을 클라이언트로 가져오지 않고 INSERT … SELECT로 옮깁니다.
+
+    - 키 인덱스로 다음 chunk개 키의 마지막 키를 구해 (이전 키, 마지막 키] 구간씩 실행하고 커밋합니다.
+    - 체크포인트/계측/건수 집계는 copy_rows와 같은 이름과 형식을 사용하므로 재개와 리포트가 그대로 동작합니다.
+    - 문장은 소스 연결에서 실행합니다. 타겟이 대량 적재 세션이면 그동안 소스 세션에도 같은 설정을 적용합니다.
+
+    Returns:
+        copy_rows와 같은 {'total', 'processed', 'affected', 'inserted', 'failed_batches', 'resumed', 'skipped_existing'}.
+    """
+    checkpoint = open_checkpoint(target, name, start_after, end_at)
+    counts = {
+        'total': 0, 'processed': 0, 'affected': 0, 'inserted': 0,
+        'failed_batches': 0, 'resumed': 0, 'skipped_existing': 0,
+    }
+    if checkpoint.completed:
+        print(f"⏭️ {name}: 실행 {checkpoint.run_id}에서 이미 완료된 구간이라 건너뜁니다.")
+        counts['resumed'] = 1
+        return counts
+    if checkpoint.high_water is not None:
+        print(f"⏩ {name}: 체크포인트 키 {checkpoint.high_water} 이후부터 이어서 진행합니다.")
+        start_after = checkpoint.high_water
+        counts['resumed'] = 1
+
+    total = count_keyset_rows(source, query, start_after, end_at)
+    counts['total'] = total
+    if not total:
+        checkpoint.complete()
+        return counts
+
+    chunk = chunk or get_server_copy_chunk()
+    metrics = TableMetrics(name, start_after, end_at)
+    metrics.total = total
+    restore_bulk_load = target.bulk_load and not source.bulk_load
+    if restore_bulk_load:
+        source.set_bulk_load(True)
+    chunks = 0
+    try:
+        position = start_after
+        while True:
+            started = time.perf_counter()
+            sql, params = query.window_sql(position, end_at, chunk)
+            window = source.execute_query(sql, params)
+            metrics.record("fetch", time.perf_counter() - started)
+            if window is None:
+                raise RuntimeError(f"{name}: 키 구간 조회 실패")
+            if not window[0]["cnt"]:
+                break
+            rows, last_key = window[0]["cnt"], window[0]["last_key"]
+
+            sql, params = plan.chunk_sql(query, position, last_key)
+            started = time.perf_counter()
+            affected, bytes_sent = source.execute_statements([(sql, params)])
+            elapsed = time.perf_counter() - started
+            commit_seconds = source.last_commit_seconds if affected is not None else 0.0
+            metrics.record("insert", max(elapsed - commit_seconds, 0.0), rows, bytes_sent)
+            chunks += 1
+            if affected is None:
+                counts['failed_batches'] += 1
+                checkpoint.freeze()
+            else:
+                metrics.record("commit", commit_seconds, rows)
+                counts['affected'] += affected
+                # 구간의 소스 키 수에는 JOIN으로 빠진 행과 이미 있던 행도 들어 있으므로 영향받은 행 수를 셉니다.
+                counts['inserted'] += affected
+                checkpoint.advance(last_key)
+
+            counts['processed'] += rows
+            metrics.processed = counts['processed']
+            if show_progress:
+                print_progress(counts['processed'], total, prefix=name, detail=metrics.progress_detail())
+            position = last_key
+    except Exception:
+        checkpoint.freeze()
+        metrics.finish("failed")
+        register_table_metrics([metrics.summary()])
+        raise
+    finally:
+        if restore_bulk_load:
+            source.set_bulk_load(False)
+
+    checkpoint.complete()
+    metrics.finish("failed" if counts['failed_batches'] else "completed")
+    register_table_metrics([metrics.summary()])
+    if show_progress:
+        if counts['processed'] < total:
+            print_progress(total, total, prefix=name)
+        print(f"⚡ {name}: 서버 내 INSERT … SELECT {chunks}회 (구간당 최대 {chunk}키), 영향 {counts['affected']}행")
+        metrics.print_report()
+    return counts
@@ -0,0 +1,286 @@
+import base64
+import json
+import mmap
+import os
+import struct
+import zlib
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from db import DatabaseConnection
+from utils.extract import KeysetQuery, RowSource, count_keyset_rows, iter_keyset_rows, resolve_columns
+from utils.pipeline import pipelined
+from utils.progress import chunked, print_progress
+
+# 스냅샷 파일 식별자 (형식이 바뀌면 버전을 올립니다)
+MAGIC = b"MIGSNAP2"
+
+# 파일 끝 8바이트: 목차(footer) 위치
+_FOOTER_POINTER = struct.Struct("<Q")
+# 헤더 길이
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+def get_snapshot_dir() -> str:
+    """SNAPSHOT_DIR 환경 변수(기본 snapshots)를 읽습니다."""
+    return os.getenv("SNAPSHOT_DIR", "snapshots")
+
+
+def latest_snapshot_path() -> Optional[str]:
+    """SNAPSHOT_DIR에서 가장 최근에 만든 스냅샷 파일 경로. 없으면 None."""
+    snapshot_dir = get_snapshot_dir()
+    if not os.path.isdir(snapshot_dir):
+        return None
+    paths = [os.path.join(snapshot_dir, name) for name in os.listdir(snapshot_dir) if name.endswith(".msnap")]
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+# 컬럼 형식 태그 → (값 → JSON 값, JSON 값 → 값). int/float/str 컬럼은 JSON 그대로 두고 태그는 None입니다.
+_COLUMN_CODECS: Dict[str, Tuple[Callable[[Any], Any], Callable[[Any], Any]]] = {
+    "datetime": (datetime.isoformat, datetime.fromisoformat),
+    "date": (date.isoformat, date.fromisoformat),
+    "time": (lambda value: value // timedelta(microseconds=1), lambda value: timedelta(microseconds=value)),
+    "decimal": (str, Decimal),
+    "bytes": (lambda value: base64.b64encode(value).decode("ascii"), base64.b64decode),
+}
+# 파이썬 형식 → 태그 (하위 형식을 먼저 확인합니다: datetime은 date의 하위 형식)
+_TYPE_TAGS: Tuple[Tuple[Any, Optional[str]], ...] = (
+    (bool, None),
+    (datetime, "datetime"),
+    (date, "date"),
+    (timedelta, "time"),
+    (Decimal, "decimal"),
+    ((bytes, bytearray), "bytes"),
+    ((int, float, str), None),
+)
+
+
+def _column_tag(values: Sequence[Any]) -> Optional[str]:
+    """내부: 컬럼 값들의 형식 태그. NULL은 무시하고, 한 컬럼에 형식이 섞여 있거나 모르는 형식이면 ValueError."""
+    tags = set()
+    for value_type in set(map(type, values)) - {type(None)}:
+        for types, tag in _TYPE_TAGS:
+            if issubclass(value_type, types):
+                tags.add(tag)
+                break
+        else:
+            raise ValueError(f"스냅샷에 기록할 수 없는 값 형식입니다: {value_type.__name__}")
+    if len(tags) > 1:
+        raise ValueError(f"한 컬럼에 여러 값 형식이 섞여 있습니다: {', '.join(sorted(map(str, tags)))}")
+    return tags.pop() if tags else None
+
+
+def _encode_batch(rows: List[tuple], level: int) -> bytes:
+    """내부: 행 배치를 컬럼 단위 JSON으로 바꿔(같은 컬럼 값끼리 모아 압축률을 높임) zlib으로 압축합니다.
+
+    배치는 [[태그, [값, ...]], ...] (컬럼 순서) 이고, 날짜/시간/Decimal/bytes 컬럼은 태그와 함께
+    문자열(ISO 8601, 10진수, base64)이나 정수(TIME의 마이크로초)로 기록합니다. NULL은 null입니다.
+    """
+    columns = []
+    for values in zip(*rows):
+        tag = _column_tag(values)
+        if tag is not None:
+            encode = _COLUMN_CODECS[tag][0]
+            values = [None if value is None else encode(value) for value in values]
+        columns.append([tag, list(values)])
+    return zlib.compress(json.dumps(columns, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), level)
+
+
+def _decode_batch(payload: bytes) -> List[tuple]:
+    """내부: _encode_batch로 기록한 배치를 행 tuple 목록으로 되돌립니다."""
+    columns = []
+    for tag, values in json.loads(zlib.decompress(payload)):
+        if tag is not None:
+            decode = _COLUMN_CODECS[tag][1]
+            values = [None if value is None else decode(value) for value in values]
+        columns.append(values)
+    return list(zip(*columns))
+
+
+def export_snapshot(
+    conn: DatabaseConnection,
+    path: str,
+    tables: Sequence[Tuple[str, KeysetQuery]],
+    batch_rows: Optional[int] = None,
+    level: Optional[int] = None,
+) -> Dict[str, int]:
+    """소스 테이블들을 PK 순서로 한 번씩 읽어 압축된 레코드 배치 스냅샷 파일로 기록합니다.
+
+    파일 구조: MAGIC | 헤더(JSON: 소스 스키마, 생성 시각) | 압축 배치들 | 목차(JSON) | 목차 위치(8바이트)
+    배치는 컬럼 단위 JSON(형식 태그 포함, _encode_batch)이라 읽을 때 코드를 실행하지 않습니다.
+    목차에는 테이블별 결과 컬럼과 배치별 (위치, 길이, 행 수, 첫 키, 마지막 키)가 들어 있어
+    가져올 때 필요한 구간의 배치만 바로 찾아 읽을 수 있습니다.
+    읽기/압축/쓰기는 pipelined로 겹쳐 실행하고, 파일은 다 쓴 뒤에 이름을 바꿔 완성본만 남깁니다.
+
+    Args:
+        conn: 소스 연결.
+        path: 만들 스냅샷 파일 경로.
+        tables: (스냅샷 테이블 이름, 소스 KeysetQuery) 목록.
+        batch_rows: 배치당 행 수 (None이면 SNAPSHOT_BATCH_ROWS, 기본 10000).
+        level: zlib 압축 수준 (None이면 SNAPSHOT_COMPRESS_LEVEL, 기본 6).
+
+    Returns:
+        테이블별 기록한 행 수.
+    """
+    batch_rows = batch_rows or int(os.getenv("SNAPSHOT_BATCH_ROWS", 10000))
+    level = int(os.getenv("SNAPSHOT_COMPRESS_LEVEL", 6)) if level is None else level
+    header = json.dumps({
+        "source_schema": conn.database,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }).encode("utf-8")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    counts: Dict[str, int] = {}
+    footer: List[Dict[str, Any]] = []
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+            for name, query in tables:
+                columns = resolve_columns(conn, query)
+                key_position = columns.index(query.key_alias)
+                total = count_keyset_rows(conn, query)
+                rows = iter_keyset_rows(conn, query, page_size=batch_rows, columns=columns)
+                entry = {
+                    "name": name,
+                    "source": _normalize(query.source),
+                    "key_alias": query.key_alias,
+                    "columns": columns,
+                    "rows": 0,
+                    "batches": [],
+                }
+                for batch, payload in pipelined(chunked(rows, batch_rows), lambda b: _encode_batch(b, level)):
+                    entry["batches"].append(
+                        [f.tell(), len(payload), len(batch), batch[0][key_position], batch[-1][key_position]]
+                    )
+                    f.write(payload)
+                    entry["rows"] += len(batch)
+                    print_progress(entry["rows"], total, prefix=f"📤 {name}")
+                if not entry["rows"]:
+                    print(f"ℹ️ {name}: 내보낼 데이터가 없습니다.")
+                footer.append(entry)
+                counts[name] = entry["rows"]
+            footer_offset = f.tell()
+            f.write(json.dumps({"tables": footer}, ensure_ascii=False, default=str).encode("utf-8"))
+            f.write(_FOOTER_POINTER.pack(footer_offset))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"💾 스냅샷 기록 완료: {path} ({sum(counts.values())}행, {size_mb:.2f}MB)")
+    return counts
+
+
+class SnapshotSource(RowSource):
+    """스냅샷 파일을 소스 연결 대신 쓰기 위한 읽기 전용 소스.
+
+    - 파일을 메모리 맵으로 열고, 목차로 테이블/구간에 해당하는 배치만 골라 압축을 풉니다.
+    - 테이블은 KeysetQuery의 FROM 절로 찾으므로 tables/* 의 소스 쿼리와 TableSpec을 그대로 씁니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"빈 스냅샷 파일입니다: {path}")
+        try:
+            self.header, self.tables = self._read_index()
+        except Exception:
+            self.close()
+            raise
+        # key_index 캐시 등에서 연결처럼 스키마 이름으로 구분할 수 있게 합니다.
+        self.database = f"snapshot:{self.header.get('source_schema')}"
+
+    def _read_index(self) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        data = self._mmap
+        if data[:len(MAGIC)] != MAGIC:
+            if data[:len(MAGIC) - 1] == MAGIC[:-1]:
+                raise ValueError(f"이전 버전 스냅샷 파일이라 읽을 수 없습니다. 다시 내보내 주세요: {self.path}")
+            raise ValueError(f"스냅샷 파일 형식이 아닙니다: {self.path}")
+        (header_length,) = _HEADER_LENGTH.unpack_from(data, len(MAGIC))
+        header_start = len(MAGIC) + _HEADER_LENGTH.size
+        header = json.loads(data[header_start:header_start + header_length])
+        (footer_offset,) = _FOOTER_POINTER.unpack_from(data, len(data) - _FOOTER_POINTER.size)
+        footer = json.loads(data[footer_offset:len(data) - _FOOTER_POINTER.size])
+        return header, {table["source"]: table for table in footer["tables"]}
+
+    def _table(self, query: KeysetQuery) -> Dict[str, Any]:
+        if query.where:
+            raise ValueError("스냅샷에서는 조건이 없는 전체 테이블 쿼리만 읽을 수 있습니다.")
+        table = self.tables.get(_normalize(query.source))
+        if table is None:
+            raise ValueError(f"스냅샷에 {_normalize(query.source)} 테이블이 없습니다. ({', '.join(self.tables)})")
+        return table
+
+    def _decode(self, offset: int, length: int) -> List[tuple]:
+        with memoryview(self._mmap)[offset:offset + length] as view:
+            return _decode_batch(view)
+
+    @staticmethod
+    def _select(table: Dict[str, Any], start_after: Any, end_at: Any) -> Iterator[Tuple[list, bool]]:
+        """내부: (start_after, end_at] 구간에 걸친 배치 목차와, 구간 경계에 걸쳐 행 단위로 걸러야 하는지 여부."""
+        for batch in table["batches"]:
+            first_key, last_key = batch[3], batch[4]
+            if start_after is not None and last_key <= start_after:
+                continue
+            if end_at is not None and first_key > end_at:
+                return
+            partial = (start_after is not None and first_key <= start_after) or (end_at is not None and last_key > end_at)
+            yield batch, partial
+
+    def _rows(self, table: Dict[str, Any], batch: list, partial: bool, start_after: Any, end_at: Any) -> List[tuple]:
+        """내부: 배치 하나의 압축을 풀고, 구간 경계에 걸친 배치면 구간 안의 행만 남깁니다."""
+        rows = self._decode(batch[0], batch[1])
+        if not partial:
+            return rows
+        key_position = table["columns"].index(table["key_alias"])
+        return [
+            row for row in rows
+            if (start_after is None or row[key_position] > start_after)
+            and (end_at is None or row[key_position] <= end_at)
+        ]
+
+    def columns(self, query: KeysetQuery) -> List[str]:
+        return list(self._table(query)["columns"])
+
+    def count_rows(self, query: KeysetQuery, start_after: Any = None, end_at: Any = None) -> int:
+        """구간 전체가 들어가는 배치는 압축을 풀지 않고 목차의 행 수를 씁니다."""
+        table = self._table(query)
+        if start_after is None and end_at is None:
+            return table["rows"]
+        total = 0
+        for batch, partial in self._select(table, start_after, end_at):
+            total += len(self._rows(table, batch, partial, start_after, end_at)) if partial else batch[2]
+        return total
+
+    def iter_rows(self, query: KeysetQuery, start_after: Any = None, end_at: Any = None) -> Iterator[tuple]:
+        table = self._table(query)
+        for batch, partial in self._select(table, start_after, end_at):
+            yield from self._rows(table, batch, partial, start_after, end_at)
+
+    def describe(self) -> str:
+        tables = ", ".join(f"{table['name']} {table['rows']}행" for table in self.tables.values())
+        return f"{self.header.get('source_schema')} @ {self.header.get('created_at')} ({tables})"
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "SnapshotSource":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
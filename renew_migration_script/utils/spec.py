@@ -0,0 +1,217 @@
+from dataclasses import dataclass, field
+from itertools import compress, repeat
+from operator import and_, itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from utils.extract import KeysetQuery
+
+
+@dataclass(frozen=True)
+class Lookup:
+    """작은 코드(차원) 테이블의 key → value 조회 선언. (소스 JOIN 대신 변환 단계에서 dict로 조회)
+
+    Attributes:
+        table: 소스 스키마의 코드 테이블 이름.
+        key: 조회 키 컬럼 (소스 행의 외래 키 값과 비교).
+        value: 가져올 값 컬럼.
+    """
+
+    table: str
+    key: str = "id"
+    value: str = "name"
+
+
+class ValueMap:
+    """값 → 값 변환표 converter. 매핑에 없는 값은 default로 바꿉니다.
+
+    파이썬 변환으로 호출할 수 있고, sql()로 같은 결과의 CASE 식도 만들 수 있어
+    같은 서버 INSERT … SELECT 경로(utils.server_copy)에서도 그대로 쓰입니다.
+    """
+
+    def __init__(self, mapping: Mapping[Any, Any], default: Any = None):
+        self.mapping = dict(mapping)
+        self.default = default
+
+    def __call__(self, value: Any) -> Any:
+        return self.mapping.get(value, self.default)
+
+    def sql(self, expression: str) -> Tuple[str, List[Any]]:
+        """같은 변환을 하는 CASE 식과 파라미터. 문자열은 파이썬처럼 대소문자를 구분해(BINARY) 비교합니다."""
+        whens: List[str] = []
+        params: List[Any] = []
+        for key, value in self.mapping.items():
+            operand = f"BINARY {expression}" if isinstance(key, str) else expression
+            whens.append(f"WHEN {operand} = %s THEN %s")
+            params.extend((key, value))
+        params.append(self.default)
+        return f"CASE {' '.join(whens)} ELSE %s END", params
+
+
+def sql_equivalent(template: str, *params: Any) -> Callable[[Callable[[Any], Any]], Callable[[Any], Any]]:
+    """converter 함수에 같은 결과를 내는 SQL 식을 붙이는 데코레이터.
+
+    template의 {}에는 소스 값 식이 들어가고, %s 자리에는 params가 순서대로 들어갑니다.
+    예) @sql_equivalent("REPLACE({}, %s, '')", '코람데오_')
+    """
+    def decorate(func: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        func.sql = lambda expression: (template.format(expression), list(params))
+        return func
+    return decorate
+
+
+# 컴파일된 배치 변환: 소스 tuple 행 목록 → 타겟 columns 순서의 tuple 행 목록
+CompiledTransform = Callable[[List[tuple]], List[tuple]]
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """한 테이블 마이그레이션의 선언적 정의.
+
+    타겟 컬럼마다 값을 어디서 가져올지 선언하면, compile()이 소스 결과 컬럼 위치에 맞춘
+    위치 기반(tuple → tuple) 배치 변환 함수를 한 번 만들어 둡니다.
+    행마다 dict를 만들거나 이름으로 파라미터를 찾지 않습니다.
+
+    Attributes:
+        name: 작업/진행 표시 이름.
+        query: 소스 KeysetQuery.
+        target: 타겟 테이블 이름.
+        columns: 타겟 컬럼(INSERT 순서).
+        renames: 타겟 컬럼 → 소스 컬럼 (이름이 다른 경우만, 나머지는 같은 이름을 사용).
+        constants: 타겟 컬럼 → 고정값 (예: is_deleted=0).
+        converters: 타겟 컬럼 → 소스 값 변환 함수 (예: name_converter). lookups와 함께 쓰면 조회한 값에 적용합니다.
+        lookups: 타겟 컬럼 → 코드 테이블 조회 (소스 값을 키로 조회, INNER JOIN처럼 키가 없는 행은 제외).
+    """
+
+    name: str
+    query: KeysetQuery
+    target: str
+    columns: Tuple[str, ...]
+    renames: Mapping[str, str] = field(default_factory=dict)
+    constants: Mapping[str, Any] = field(default_factory=dict)
+    converters: Mapping[str, Callable[[Any], Any]] = field(default_factory=dict)
+    lookups: Mapping[str, Lookup] = field(default_factory=dict)
+
+    def position(self, column: str) -> int:
+        """변환 결과 tuple에서 타겟 컬럼의 위치."""
+        return self.columns.index(column)
+
+    def sql_projection(self, source_alias: str) -> Tuple[List[Optional[Tuple[str, List[Any]]]], str]:
+        """타겟 컬럼마다 변환 결과와 같은 값을 내는 SQL 식과 파라미터, 그리고 코드 테이블 JOIN 절.
+
+        소스 쿼리 결과를 source_alias로 감싼 쿼리 기준이며, 고정값은 파라미터, lookups는 INNER JOIN
+        (compile과 같이 키가 없는 행은 제외), converter는 sql()(ValueMap, sql_equivalent)로 옮깁니다.
+        SQL로 옮길 수 없는 컬럼은 None입니다. (JOIN은 그래도 붙이므로 행 집합은 변환 결과와 같습니다)
+        """
+        projection: List[Optional[Tuple[str, List[Any]]]] = []
+        joins: List[str] = []
+        for column in self.columns:
+            if column in self.constants:
+                projection.append(("%s", [self.constants[column]]))
+                continue
+            expression = f"{source_alias}.`{self.renames.get(column, column)}`"
+            if column in self.lookups:
+                lookup = self.lookups[column]
+                alias = f"lk{len(joins)}"
+                joins.append(f" INNER JOIN `{lookup.table}` AS {alias} ON {alias}.`{lookup.key}` = {expression}")
+                expression = f"{alias}.`{lookup.value}`"
+            params: List[Any] = []
+            if column in self.converters:
+                to_sql = getattr(self.converters[column], "sql", None)
+                if to_sql is None:
+                    projection.append(None)
+                    continue
+                expression, params = to_sql(expression)
+            projection.append((expression, params))
+        return projection, "".join(joins)
+
+    def compile(
+        self,
+        source_columns: Sequence[str],
+        lookup_values: Optional[Mapping[str, Mapping[Any, Any]]] = None,
+    ) -> CompiledTransform:
+        """소스 결과 컬럼 순서에 맞춘 배치 변환 함수를 만듭니다.
+
+        소스 값은 operator.itemgetter로 타겟 순서대로 한 번에 꺼내고, 조회/변환이 필요한 위치만
+        미리 묶어 둔 함수로 바꾼 뒤 고정값을 끼워 넣습니다. 변환할 값이 없으면 itemgetter 결과를 그대로 씁니다.
+
+        Args:
+            source_columns: 소스 결과 컬럼 이름(SELECT 순서).
+            lookup_values: lookups 컬럼별로 미리 읽어 둔 {키: 값} dict (utils.lookup.compile_spec이 채움).
+
+        Raises:
+            ValueError: 필요한 소스 컬럼이 쿼리 결과에 없거나 조회 값이 주어지지 않은 경우.
+        """
+        positions: Dict[str, int] = {name: i for i, name in enumerate(source_columns)}
+        picked: List[int] = []
+        # 꺼낸 값 위치 → 변환 함수(조회 dict의 __getitem__ 다음 converter 순서) / 조회 dict (키가 없으면 행 제외)
+        conversions: List[Tuple[int, Callable[[Any], Any]]] = []
+        filters: List[Tuple[int, Mapping[Any, Any]]] = []
+        # 타겟 위치 → 고정값 (위치 오름차순)
+        constants: List[Tuple[int, Any]] = []
+        for index, column in enumerate(self.columns):
+            if column in self.constants:
+                constants.append((index, self.constants[column]))
+                continue
+            source_column = self.renames.get(column, column)
+            if source_column not in positions:
+                raise ValueError(f"{self.name}: 소스 결과에 {source_column} 컬럼이 없습니다. ({', '.join(source_columns)})")
+            slot = len(picked)
+            picked.append(positions[source_column])
+            if column in self.lookups:
+                if not lookup_values or column not in lookup_values:
+                    raise ValueError(f"{self.name}: {column} 컬럼의 {self.lookups[column].table} 조회 값이 없습니다.")
+                values = lookup_values[column]
+                filters.append((slot, values))
+                conversions.append((slot, values.__getitem__))
+            if column in self.converters:
+                conversions.append((slot, self.converters[column]))
+        return _positional_transform(picked, conversions, filters, constants)
+
+
+def _positional_transform(
+    picked: List[int],
+    conversions: List[Tuple[int, Callable[[Any], Any]]],
+    filters: List[Tuple[int, Mapping[Any, Any]]],
+    constants: List[Tuple[int, Any]],
+) -> CompiledTransform:
+    """내부: TableSpec.compile이 정리한 위치 정보로 배치 변환 함수를 만듭니다.
+
+    변환이 필요하면 배치를 컬럼 단위로 뒤집어(zip) 컬럼마다 map으로 한 번에 바꾸고 다시 행으로 묶습니다.
+    행마다 파이썬 반복을 돌지 않으므로 값 변환 함수 호출 외에는 C 수준에서 처리됩니다.
+    """
+    if not conversions and not filters and not constants:
+        if len(picked) == 1:
+            only = picked[0]
+            return lambda rows: [(row[only],) for row in rows]
+        pick = itemgetter(*picked)
+        return lambda rows: [pick(row) for row in rows]
+
+    width = len(picked) + len(constants)
+    # 타겟 위치 → 꺼낸 소스 컬럼 순번 (고정값 위치는 제외)
+    slots: Dict[int, int] = {}
+    constant_at = dict(constants)
+    for index in range(width):
+        if index not in constant_at:
+            slots[index] = len(slots)
+
+    def transform(rows: List[tuple]) -> List[tuple]:
+        if not rows:
+            return []
+        source = list(zip(*rows))
+        columns: List[Iterable[Any]] = [source[position] for position in picked]
+        if filters:
+            keep: Iterable[bool] = map(filters[0][1].__contains__, columns[filters[0][0]])
+            for slot, table in filters[1:]:
+                keep = map(and_, keep, map(table.__contains__, columns[slot]))
+            keep = list(keep)
+            columns = [list(compress(column, keep)) for column in columns]
+        count = len(columns[0]) if columns else len(rows)
+        for slot, convert in conversions:
+            columns[slot] = map(convert, columns[slot])
+        ordered = [
+            repeat(constant_at[index], count) if index in constant_at else columns[slots[index]]
+            for index in range(width)
+        ]
+        return list(zip(*ordered))
+
+    return transform
@@ -0,0 +1,105 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from db import (
+    TRANSPORT_PROFILES,
+    TransportProfile,
+    create_database_connection,
+    get_transport_profile,
+    has_c_extension,
+    is_c_extension_required,
+)
+from utils.bulk_insert import MultiRowInserter
+from utils.progress import chunked
+
+# 측정용 임시 테이블 (세션 전용이라 연결을 닫으면 사라집니다)
+PROBE_TABLE = "_transport_probe"
+PROBE_COLUMNS = ("id", "name", "description", "created_at")
+PROBE_DDL = (
+    f"CREATE TEMPORARY TABLE {PROBE_TABLE} ("
+    "id INT PRIMARY KEY, name VARCHAR(100), description VARCHAR(255), created_at DATETIME)"
+)
+
+
+def get_probe_rows() -> int:
+    """TRANSPORT_PROBE_ROWS 환경 변수(프로필마다 적재하고 다시 읽을 행 수, 기본 5000)를 읽습니다."""
+    return max(1, int(os.getenv("TRANSPORT_PROBE_ROWS", 5000)))
+
+
+def _probe_rows(count: int) -> List[tuple]:
+    """내부: 실제 테이블처럼 값이 반복되는 측정용 행. (압축 효과가 실제 데이터와 비슷하게 나도록)"""
+    started = datetime(2024, 1, 1)
+    return [
+        (i, f"청년부 {i % 40}순", f"수요청년예배 출석 기록 {i % 7}", started + timedelta(minutes=i))
+        for i in range(1, count + 1)
+    ]
+
+
+def candidate_profiles() -> List[TransportProfile]:
+    """측정할 프로필. C 확장이 없거나 강제된 경우 pure는 default와 같거나 쓸 수 없으므로 뺍니다."""
+    skip_pure = is_c_extension_required() or not has_c_extension()
+    return [profile for profile in TRANSPORT_PROFILES.values() if not (skip_pure and profile.use_pure)]
+
+
+def probe_profile(schema: str, profile: TransportProfile, rows: List[tuple], batch_size: int) -> Optional[float]:
+    """profile로 새 연결을 열어 임시 테이블에 rows를 적재하고 다시 모두 읽는 데 걸린 시간(초).
+
+    연결 수립 시간은 빼고 측정합니다. 연결/임시 테이블 생성/적재 중 하나라도 실패하면 None.
+    """
+    conn = create_database_connection(schema, transport=profile)
+    if not conn.connect():
+        return None
+    try:
+        if not conn.execute_command(PROBE_DDL):
+            return None
+        writer = MultiRowInserter(conn, PROBE_TABLE, PROBE_COLUMNS, on_duplicate=None)
+        started = time.perf_counter()
+        for batch in chunked(rows, batch_size):
+            if writer.write(batch).affected is None:
+                return None
+        fetched = sum(1 for _ in conn.stream_query(f"SELECT * FROM {PROBE_TABLE} ORDER BY id", dictionary=False))
+        elapsed = time.perf_counter() - started
+        return elapsed if fetched == len(rows) else None
+    except Exception as e:
+        print(f"⚠️ 전송 프로필 {profile.name} 측정 실패: {e}")
+        return None
+    finally:
+        conn.disconnect()
+
+
+def select_transport_profile(schema: str) -> TransportProfile:
+    """사용할 전송 프로필을 정하고 로그로 남깁니다.
+
+    TRANSPORT_PROFILE=auto면 후보 프로필마다 같은 양을 적재/조회해 보고 가장 빠른 프로필을 고릅니다.
+    고른 이름을 TRANSPORT_PROFILE 환경 변수에 기록하므로 이후 연결(풀, 비동기 연결, 파티션 워커 프로세스)이
+    다시 측정하지 않고 같은 프로필을 씁니다.
+
+    Args:
+        schema: 측정 연결을 열 스키마. (임시 테이블만 만들므로 데이터는 바뀌지 않습니다)
+    """
+    if os.getenv("TRANSPORT_PROFILE", "default") != "auto":
+        profile = get_transport_profile()
+        print(f"🔌 전송 프로필: {profile.name}")
+        return profile
+
+    rows = _probe_rows(get_probe_rows())
+    batch_size = int(os.getenv("BATCH_SIZE", 1000))
+    print(f"\n🔬 전송 프로필 측정 중... ({len(rows)}행 적재 + 조회, {schema} 임시 테이블)")
+    results: Dict[str, float] = {}
+    for profile in candidate_profiles():
+        seconds = probe_profile(schema, profile, rows, batch_size)
+        if seconds is not None:
+            results[profile.name] = seconds
+
+    if not results:
+        print("⚠️ 전송 프로필 측정에 모두 실패해 default 프로필을 사용합니다.")
+        chosen = TRANSPORT_PROFILES["default"]
+    else:
+        chosen = TRANSPORT_PROFILES[min(results, key=results.get)]
+        summary = ", ".join(f"{name} {seconds:.2f}초" for name, seconds in results.items())
+        print(f"🔬 측정 결과: {summary}")
+    os.environ["TRANSPORT_PROFILE"] = chosen.name
+    print(f"🔌 전송 프로필: {chosen.name} (자동 선택)")
+    return chosen
@@ -0,0 +1,315 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from db import ConnectionPool, DatabaseConnection
+from utils.extract import KeysetQuery, iter_keyset_rows, resolve_columns
+from utils.lookup import compile_spec
+from utils.spec import TableSpec
+
+# 키 구간: (start_after, end_at] - end_at이 None이면 끝까지
+KeyRange = Tuple[Any, Any]
+
+# 행 단위 불일치 예시를 최대 몇 개까지 보여줄지
+_SAMPLE_LIMIT = 10
+
+
+@dataclass
+class VerifyResult:
+    """테이블 하나의 체크섬 검증 결과.
+
+    Attributes:
+        name: 검증 이름(TableSpec.name).
+        chunks: 비교한 구간 수.
+        mismatched_chunks: 체크섬이 달랐던 구간 수.
+        missing: 소스에만 있는 키 수.
+        extra: 타겟에만 있는 키 수.
+        different: 양쪽에 있지만 값이 다른 키 수.
+        duplicated: 소스 결과에서 같은 키가 여러 행인 경우(1:N JOIN)의 중복 행 수.
+        skipped_columns: 구간 체크섬에서 빠진 컬럼(SQL로 옮길 수 없는 변환 컬럼).
+        samples: 불일치 예시 문자열.
+    """
+
+    name: str
+    chunks: int = 0
+    mismatched_chunks: int = 0
+    missing: int = 0
+    extra: int = 0
+    different: int = 0
+    duplicated: int = 0
+    skipped_columns: Tuple[str, ...] = ()
+    samples: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing or self.extra or self.different)
+
+    def sample(self, message: str) -> None:
+        if len(self.samples) < _SAMPLE_LIMIT:
+            self.samples.append(message)
+
+
+def get_verify_chunk_size() -> int:
+    """VERIFY_CHUNK_SIZE 환경 변수(기본 10000): 체크섬을 비교할 구간 크기(행)."""
+    return max(1, int(os.getenv("VERIFY_CHUNK_SIZE", 10000)))
+
+
+def get_verify_row_compare() -> int:
+    """VERIFY_ROW_COMPARE 환경 변수(기본 1000): 불일치 구간이 이 행 수 이하가 되면 행 단위로 비교합니다."""
+    return max(1, int(os.getenv("VERIFY_ROW_COMPARE", 1000)))
+
+
+def _checksum_sql(
+    query: KeysetQuery,
+    expressions: Sequence[str],
+    start_after: Any,
+    end_at: Any,
+    joins: str = "",
+) -> Tuple[str, Tuple[Any, ...]]:
+    """내부: 구간 결과를 서브쿼리로 감싸 행 수와 행별 CRC32 합계를 구하는 쿼리.
+
+    행 순서와 무관하도록 CRC32를 더하고(SUM), 타입 차이는 CHAR로 맞춰 비교합니다.
+    joins는 소스 쪽 코드 테이블 조회(INNER JOIN) 절입니다.
+    """
+    inner, params = query.range_sql(start_after, end_at)
+    row_sql = f"CONCAT_WS('#', {', '.join(expressions)})"
+    sql = f"SELECT COUNT(*) AS cnt, COALESCE(SUM(CRC32({row_sql})), 0) AS crc FROM ({inner}) AS chunk_rows{joins}"
+    return sql, params
+
+
+class _Side:
+    """내부: 한쪽(소스 또는 타겟)의 매핑된 투영과 체크섬 쿼리."""
+
+    def __init__(
+        self,
+        conn: DatabaseConnection,
+        query: KeysetQuery,
+        expressions: List[str],
+        params: Tuple[Any, ...],
+        joins: str = "",
+    ):
+        self.conn = conn
+        self.query = query
+        self.expressions = expressions
+        self.params = params
+        self.joins = joins
+
+    def checksum(self, start_after: Any, end_at: Any) -> Tuple[int, int]:
+        sql, params = _checksum_sql(self.query, self.expressions, start_after, end_at, self.joins)
+        result = self.conn.execute_query(sql, self.params + params)
+        if not result:
+            raise RuntimeError(f"{self.conn.database} 체크섬 조회 실패")
+        return result[0]["cnt"], int(result[0]["crc"])
+
+    def checksums(self, ranges: Sequence[KeyRange]) -> List[Tuple[int, int]]:
+        return [self.checksum(start_after, end_at) for start_after, end_at in ranges]
+
+
+def _value_sql(expression: str) -> str:
+    return f"IFNULL(CAST({expression} AS CHAR), 'NULL')"
+
+
+def _build_sides(
+    source: DatabaseConnection,
+    target: DatabaseConnection,
+    spec: TableSpec,
+) -> Tuple[_Side, _Side, Tuple[str, ...]]:
+    """내부: 소스 쿼리 결과를 타겟 컬럼으로 매핑한 투영과 타겟 테이블 투영을 만듭니다.
+
+    - 소스 쪽은 TableSpec.sql_projection으로 renames/constants/converter(ValueMap 등)와
+      코드 테이블 조회(INNER JOIN)까지 SQL로 계산합니다.
+    - SQL로 옮길 수 없는 컬럼만 구간 체크섬에서 빼고 행 비교에서 봅니다.
+    """
+    key = spec.query.key_alias
+    target_query = KeysetQuery(
+        columns=", ".join(f"`{column}`" for column in spec.columns),
+        source=f"`{spec.target}`",
+        key=f"`{key}`",
+        key_alias=key,
+    )
+    source_expressions: List[str] = []
+    source_params: List[Any] = []
+    target_expressions: List[str] = []
+    skipped: List[str] = []
+    projection, joins = spec.sql_projection("chunk_rows")
+    for column, projected in zip(spec.columns, projection):
+        if projected is None:
+            skipped.append(column)
+            continue
+        expression, params = projected
+        source_expressions.append(_value_sql(expression))
+        source_params.extend(params)
+        target_expressions.append(_value_sql(f"`{column}`"))
+    source_side = _Side(source, spec.query, source_expressions, tuple(source_params), joins)
+    target_side = _Side(target, target_query, target_expressions, ())
+    return source_side, target_side, tuple(skipped)
+
+
+def _chunk_ranges(conn: DatabaseConnection, query: KeysetQuery, start_after: Any, end_at: Any, size: int) -> List[KeyRange]:
+    """내부: 소스 키 인덱스만 읽어 size키 단위 구간 경계를 만듭니다."""
+    ranges: List[KeyRange] = []
+    last_key = start_after
+    while True:
+        sql, params = query.window_sql(last_key, end_at, size)
+        result = conn.execute_query(sql, params)
+        if not result:
+            raise RuntimeError(f"{conn.database} 구간 경계 조회 실패")
+        if not result[0]["cnt"]:
+            return ranges
+        ranges.append((last_key, result[0]["last_key"]))
+        last_key = result[0]["last_key"]
+
+
+def _normalize(row: Sequence[Any]) -> Tuple[Optional[str], ...]:
+    return tuple(None if value is None else str(value) for value in row)
+
+
+def _compare_rows(
+    source_side: _Side,
+    target_side: _Side,
+    spec: TableSpec,
+    source_columns: Sequence[str],
+    start_after: Any,
+    end_at: Any,
+    result: VerifyResult,
+) -> None:
+    """내부: 구간의 소스 행을 spec으로 변환해 타겟 행과 키별로 비교합니다. (변환 함수 컬럼 포함)"""
+    key = spec.query.key_alias
+    key_position = spec.position(key)
+    transform = compile_spec(source_side.conn, spec, source_columns)
+
+    expected: Dict[Any, tuple] = {}
+    source_rows = list(iter_keyset_rows(
+        source_side.conn, spec.query, start_after=start_after, end_at=end_at, columns=source_columns,
+    ))
+    for row in transform(source_rows):
+        if row[key_position] in expected:
+            # 타겟에는 먼저 읽힌 행만 적재되므로(id=id) 첫 행을 기준으로 비교합니다.
+            result.duplicated += 1
+            continue
+        expected[row[key_position]] = _normalize(row)
+
+    actual: Dict[Any, tuple] = {}
+    for row in iter_keyset_rows(
+        target_side.conn, target_side.query, start_after=start_after, end_at=end_at, columns=spec.columns,
+    ):
+        actual[row[key_position]] = _normalize(row)
+
+    for key_value, row in expected.items():
+        target_row = actual.pop(key_value, None)
+        if target_row is None:
+            result.missing += 1
+            result.sample(f"{key}={key_value}: 타겟에 없음")
+        elif target_row != row:
+            result.different += 1
+            columns = [column for column, a, b in zip(spec.columns, row, target_row) if a != b]
+            result.sample(f"{key}={key_value}: 값 다름 ({', '.join(columns)})")
+    for key_value in actual:
+        result.extra += 1
+        result.sample(f"{key}={key_value}: 소스에 없음")
+
+
+def _drill_down(
+    source_side: _Side,
+    target_side: _Side,
+    spec: TableSpec,
+    source_columns: Sequence[str],
+    key_range: KeyRange,
+    rows: int,
+    result: VerifyResult,
+) -> None:
+    """내부: 불일치 구간을 더 작은 구간으로 나눠 다시 체크섬을 비교하고, 충분히 작아지면 행 단위로 비교합니다."""
+    row_limit = get_verify_row_compare()
+    start_after, end_at = key_range
+    # 끝이 열린 구간(타겟 꼬리)이나 작은 구간은 바로 행 비교
+    if end_at is None or rows <= row_limit:
+        _compare_rows(source_side, target_side, spec, source_columns, start_after, end_at, result)
+        return
+    size = max(rows // 10, row_limit)
+    for sub_range in _chunk_ranges(source_side.conn, spec.query, start_after, end_at, size):
+        source_sum = source_side.checksum(*sub_range)
+        if source_sum != target_side.checksum(*sub_range):
+            _drill_down(source_side, target_side, spec, source_columns, sub_range, source_sum[0], result)
+
+
+def verify_spec(
+    source: DatabaseConnection,
+    target: DatabaseConnection,
+    spec: TableSpec,
+    chunk_size: Optional[int] = None,
+) -> VerifyResult:
+    """pt-table-checksum 방식으로 TableSpec의 소스(매핑된 투영)와 타겟 테이블을 비교합니다.
+
+    1. 소스 키 인덱스로 chunk_size행 단위 구간 경계를 나눕니다.
+    2. 구간마다 (행 수, CRC32 합계)를 소스/타겟 서버에서 동시에 계산합니다. (행 데이터는 전송하지 않음)
+    3. 체크섬이 다른 구간만 잘게 나눠 다시 비교하고, 작아지면 행 단위로 어떤 키가 다른지 찾습니다.
+    마지막 소스 키 이후의 타겟 행(소스에 없는 행)도 확인합니다.
+    """
+    chunk_size = chunk_size or get_verify_chunk_size()
+    source_side, target_side, skipped = _build_sides(source, target, spec)
+    result = VerifyResult(name=spec.name, skipped_columns=skipped)
+
+    ranges = _chunk_ranges(source, spec.query, None, None, chunk_size)
+    ranges.append((ranges[-1][1] if ranges else None, None))
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"verify-{spec.name}") as executor:
+        source_future = executor.submit(source_side.checksums, ranges[:-1])
+        target_future = executor.submit(target_side.checksums, ranges)
+        source_sums = source_future.result() + [(0, 0)]
+        target_sums = target_future.result()
+
+    source_columns = resolve_columns(source, spec.query)
+    result.chunks = len(ranges)
+    for key_range, source_sum, target_sum in zip(ranges, source_sums, target_sums):
+        if source_sum != target_sum:
+            result.mismatched_chunks += 1
+            _drill_down(source_side, target_side, spec, source_columns, key_range, source_sum[0], result)
+    return result
+
+
+def print_verify_result(result: VerifyResult) -> bool:
+    """검증 결과를 출력하고 불일치가 없으면 True를 반환합니다."""
+    if result.ok:
+        print(f"✅ {result.name}: {result.chunks}개 구간 체크섬 일치")
+    else:
+        print(
+            f"❌ {result.name}: {result.chunks}개 구간 중 {result.mismatched_chunks}개 불일치 "
+            f"(타겟 누락 {result.missing}, 타겟에만 있음 {result.extra}, 값 다름 {result.different})"
+        )
+        for sample in result.samples:
+            print(f"   - {sample}")
+    if result.duplicated:
+        print(f"   ℹ️ 소스 결과에 같은 키의 중복 행 {result.duplicated}개 (타겟에는 첫 행만 적재)")
+    if result.skipped_columns:
+        print(f"   ⚠️ SQL로 옮길 수 없는 변환 컬럼 {', '.join(result.skipped_columns)}은(는) 불일치 구간의 행 비교에서만 확인했습니다.")
+    return result.ok
+
+
+def _verify_task(source_pool: ConnectionPool, target_pool: ConnectionPool, spec: TableSpec) -> Optional[VerifyResult]:
+    try:
+        with source_pool.connection() as source, target_pool.connection() as target:
+            return verify_spec(source, target, spec)
+    except Exception as e:
+        print(f"❌ {spec.name} 검증 중 오류 발생: {e}")
+        return None
+
+
+def verify_tables(
+    source_pool: ConnectionPool,
+    target_pool: ConnectionPool,
+    specs: Sequence[TableSpec],
+    max_workers: int = 4,
+) -> bool:
+    """여러 테이블을 동시에 검증하고 결과를 출력합니다. 모두 일치하면 True를 반환합니다."""
+    print(f"\n🔍 {len(specs)}개 테이블 체크섬 검증을 시작합니다... (구간 {get_verify_chunk_size()}행)")
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="verify") as executor:
+        futures = [executor.submit(_verify_task, source_pool, target_pool, spec) for spec in specs]
+        results = [future.result() for future in futures]
+
+    success = True
+    for spec, result in zip(specs, results):
+        if result is None:
+            success = False
+        elif not print_verify_result(result):
+            success = False
+    return success
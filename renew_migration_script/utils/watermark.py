@@ -0,0 +1,201 @@
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from db import DatabaseConnection
+from utils.extract import KeysetQuery
+from utils.progress import chunked
+
+# 타겟 스키마에 만드는 증분 동기화 워터마크 관리 테이블
+WATERMARK_TABLE = "migration_watermark"
+# 참조 대상이 없어 스킵한 행의 키 (다음 동기화에서 워터마크와 상관없이 다시 읽음)
+PENDING_TABLE = "migration_watermark_pending"
+
+# 건수 집계 dict에 함께 담는 값 (적재할 행의 최대 updated_at / 스킵한 행의 키 목록)
+WRITTEN_UNTIL = "written_until"
+SKIPPED_KEYS = "skipped_keys"
+
+
+class WatermarkStore:
+    """테이블별로 마지막으로 동기화한 updated_at 값과 다시 읽어야 할(스킵한) 키를 타겟 스키마에 기록합니다."""
+
+    def __init__(self, conn: DatabaseConnection):
+        self.conn = conn
+        self.available = conn.execute_command(
+            f"""
+            CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+              name VARCHAR(64) NOT NULL PRIMARY KEY,
+              synced_until DATETIME(6) NOT NULL,
+              updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+            """
+        ) and conn.execute_command(
+            f"""
+            CREATE TABLE IF NOT EXISTS {PENDING_TABLE} (
+              name VARCHAR(64) NOT NULL,
+              row_key BIGINT NOT NULL,
+              PRIMARY KEY (name, row_key)
+            )
+            """
+        )
+        if not self.available:
+            print(f"⚠️ {WATERMARK_TABLE} 테이블을 만들 수 없어 전체 동기화로 진행합니다.")
+
+    def load(self, name: str) -> Optional[Any]:
+        if not self.available:
+            return None
+        result = self.conn.execute_query(f"SELECT synced_until FROM {WATERMARK_TABLE} WHERE name = %s", (name,))
+        return result[0]["synced_until"] if result else None
+
+    def save(self, name: str, synced_until: Any) -> None:
+        if not self.available:
+            return
+        self.conn.execute_command(
+            f"""
+            INSERT INTO {WATERMARK_TABLE} (name, synced_until) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE synced_until = VALUES(synced_until)
+            """,
+            (name, synced_until),
+        )
+
+    def load_pending(self, name: str) -> List[Any]:
+        if not self.available:
+            return []
+        result = self.conn.execute_query(f"SELECT row_key FROM {PENDING_TABLE} WHERE name = %s ORDER BY row_key", (name,))
+        return [row["row_key"] for row in result or []]
+
+    def save_pending(self, name: str, keys: Sequence[Any]) -> None:
+        """name의 스킵한 키 목록을 keys로 바꿉니다. (한 트랜잭션)"""
+        if not self.available:
+            return
+        statements: List[Tuple[str, Sequence[Any]]] = [(f"DELETE FROM {PENDING_TABLE} WHERE name = %s", (name,))]
+        unique = sorted(set(keys))
+        for chunk in chunked(unique, 1000):
+            values = ", ".join(["(%s, %s)"] * len(chunk))
+            statements.append((
+                f"INSERT INTO {PENDING_TABLE} (name, row_key) VALUES {values}",
+                tuple(value for key in chunk for value in (name, key)),
+            ))
+        self.conn.execute_statements(statements)
+
+
+class DeltaTracker:
+    """증분 동기화에서 적재할 행의 최대 updated_at과 스킵한 행의 키를 모읍니다.
+
+    row_filter 안에서 배치마다 observe를 호출하고, 끝나면 counts()를 건수 집계에 더해 DeltaSync.commit에 넘깁니다.
+    """
+
+    def __init__(self, position: int, key_position: int):
+        self.position = position
+        self.key_position = key_position
+        self.written_until: Optional[Any] = None
+        self.skipped_keys: List[Any] = []
+
+    def observe(self, kept: List[tuple], skipped: List[tuple]) -> None:
+        """kept: 적재할 행, skipped: 참조 대상이 없어 스킵한 행 (변환된 tuple)."""
+        values = [row[self.position] for row in kept if row[self.position] is not None]
+        if values:
+            latest = max(values)
+            if self.written_until is None or latest > self.written_until:
+                self.written_until = latest
+        self.skipped_keys.extend(row[self.key_position] for row in skipped)
+
+    def counts(self) -> Dict[str, Any]:
+        counts: Dict[str, Any] = {SKIPPED_KEYS: list(self.skipped_keys)}
+        if self.written_until is not None:
+            counts[WRITTEN_UNTIL] = self.written_until
+        return counts
+
+
+def merge_counts(merged: Dict[str, Any], counts: Dict[str, Any]) -> None:
+    """구간별 건수 집계를 합칩니다. 건수와 스킵한 키 목록은 더하고, updated_at 경계는 최댓값을 남깁니다."""
+    for key, value in counts.items():
+        if key not in merged:
+            merged[key] = value
+        elif key == WRITTEN_UNTIL:
+            merged[key] = max(merged[key], value)
+        else:
+            merged[key] += value
+
+
+@dataclass
+class DeltaSync:
+    """한 테이블의 증분 동기화 계획.
+
+    Attributes:
+        name: 워터마크 이름(테이블명).
+        query: 변경분만 읽도록 조건을 더한 소스 쿼리.
+        since: 이전 워터마크(None이면 첫 동기화라 전체를 읽음).
+        until: 동기화 시작 시점의 소스 MAX(updated_at). 워터마크는 이 값을 넘지 않습니다.
+        pending: 이전 동기화에서 스킵해 이번에 updated_at과 상관없이 다시 읽는 키.
+    """
+
+    store: WatermarkStore
+    name: str
+    query: KeysetQuery
+    since: Optional[Any]
+    until: Optional[Any]
+    pending: List[Any] = field(default_factory=list)
+
+    def commit(self, counts: Dict[str, Any]) -> None:
+        """동기화 결과(건수 집계)를 보고 워터마크를 올립니다.
+
+        - 실패한 배치가 있으면 워터마크도 스킵한 키 목록도 바꾸지 않습니다. (다음 동기화에서 같은 변경분을 다시 읽음)
+        - 실제로 적재한 행의 최대 updated_at까지만 올리고, until(시작 시점 MAX)은 넘지 않습니다.
+        - 참조 대상이 없어 스킵한 행은 워터마크를 붙잡지 않고 키만 기록해, 다음 동기화에서 그 키만 다시 읽습니다.
+          (이번에 다시 읽은 pending 키 중 적재된 키는 목록에서 빠집니다)
+        """
+        if counts.get('failed_batches'):
+            print(f"⚠️ {self.name}: 실패한 배치가 있어 워터마크를 올리지 않습니다.")
+            return
+        skipped_keys = counts.get(SKIPPED_KEYS, [])
+        if skipped_keys or self.pending:
+            self.store.save_pending(self.name, skipped_keys)
+            if skipped_keys:
+                print(f"📌 {self.name}: 참조 대상이 없어 스킵한 {len(set(skipped_keys))}건은 다음 동기화에서 다시 확인합니다.")
+        synced_until = counts.get(WRITTEN_UNTIL)
+        if synced_until is None:
+            return
+        if self.until is not None:
+            synced_until = min(synced_until, self.until)
+        if self.since is not None and synced_until <= self.since:
+            return
+        self.store.save(self.name, synced_until)
+        print(f"🌊 {self.name}: 워터마크를 {synced_until}까지 올렸습니다.")
+
+
+def plan_delta(
+    source: DatabaseConnection,
+    target: DatabaseConnection,
+    name: str,
+    query: KeysetQuery,
+    column: str = "updated_at",
+) -> DeltaSync:
+    """이전 워터마크 이후 변경된(updated_at >= since) 행과 이전에 스킵한 키의 행만 읽는 증분 동기화 계획을 만듭니다.
+
+    - 경계 시각과 같은 updated_at 행도 다시 읽어(>=) 같은 초에 바뀐 행을 놓치지 않습니다.
+      (upsert라 다시 적용해도 결과가 같습니다.)
+    - until은 읽기 전에 조회하므로 동기화 도중 바뀐 행은 다음 동기화에서도 다시 읽힙니다.
+    - 변경은 updated_at으로만 찾으므로 소스가 is_deleted 변경(soft delete)을 포함한 모든 수정에서
+      updated_at을 갱신해야 합니다. (ON UPDATE CURRENT_TIMESTAMP 또는 애플리케이션에서 갱신)
+    """
+    store = WatermarkStore(target)
+    since = store.load(name)
+    pending = store.load_pending(name)
+    result = source.execute_query(f"SELECT MAX({column}) AS max_value FROM {query.source}")
+    until = result[0]["max_value"] if result else None
+
+    if since is None:
+        print(f"🌊 {name}: 이전 워터마크가 없어 전체를 동기화합니다.")
+        return DeltaSync(store, name, query, None, until, pending)
+
+    where, params = f"{column} >= %s", (since,)
+    if pending:
+        print(f"🌊 {name}: {since} 이후 변경분과 이전에 스킵한 {len(pending)}건을 동기화합니다.")
+        where = f"({where} OR {query.key} IN ({', '.join(['%s'] * len(pending))}))"
+        params += tuple(pending)
+    else:
+        print(f"🌊 {name}: {since} 이후 변경분만 동기화합니다.")
+    if query.where:
+        where = f"({query.where}) AND {where}"
+    delta_query = replace(query, where=where, where_params=query.where_params + params)
+    return DeltaSync(store, name, delta_query, since, until, pending)